@@ -2,6 +2,7 @@
 Application configuration using Pydantic settings.
 Loads environment variables from .env file.
 """
+from functools import cached_property, lru_cache
 from pydantic_settings import BaseSettings
 from typing import List
 
@@ -25,6 +26,7 @@ class Settings(BaseSettings):
     secret_key: str  # Required — no default; set SECRET_KEY in environment
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 10080  # 7 days
+    bcrypt_rounds: int = 12  # bcrypt work factor; each extra round doubles hash/verify cost
 
     # Server
     host: str = "0.0.0.0"
@@ -45,7 +47,7 @@ class Settings(BaseSettings):
     # Comma-separated list of admin emails (JWT-based admin access)
     admin_emails: str = "hirematrix.ai@gmail.com,saree.ali28@gmail.com,faizkh14@gmail.com"
 
-    @property
+    @cached_property
     def admin_emails_list(self) -> List[str]:
         return [e.strip().lower() for e in self.admin_emails.split(",")]
 
@@ -62,6 +64,9 @@ class Settings(BaseSettings):
     gmail_user: str = ""            # e.g. hirematrix.ai@gmail.com
     gmail_app_password: str = ""    # Gmail App Password (not your regular password)
 
+    # Notification emails (reminders / job alerts)
+    smtp_pool_size: int = 5         # SMTP connections kept open for parallel sends
+
     # LinkedIn OAuth 2.0
     linkedin_client_id: str = ""
     linkedin_client_secret: str = ""
@@ -71,7 +76,7 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = False
 
-    @property
+    @cached_property
     def cors_origins_list(self) -> List[str]:
         """Parse CORS origins from comma-separated string."""
         return [origin.strip() for origin in self.cors_origins.split(",")]
@@ -83,5 +88,11 @@ class Settings(BaseSettings):
         return "https://api-m.sandbox.paypal.com"
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build Settings once; .env and environment are parsed on first call only."""
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
@@ -2,19 +2,58 @@
 Database configuration and session management.
 Provides dependency injection for database sessions in FastAPI routes.
 """
-from sqlalchemy import create_engine, text
+import json
+import logging
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
 from app.config import settings
 from app.models import Base
 
+logger = logging.getLogger(__name__)
+
+
+# Parse the URL once and branch on the backend name rather than substring
+# matching (a Postgres database or host named "sqlite..." would misfire).
+_database_url = make_url(settings.database_url)
+_is_sqlite = _database_url.get_backend_name() == "sqlite"
+
+# Pool sizing: pool_size + max_overflow must cover
+#   uvicorn workers x concurrent requests holding a DB session,
+# otherwise requests queue on the pool and time out after pool_timeout.
+# pool_pre_ping drops connections the server closed while idle, and
+# pool_recycle retires them before managed Postgres idle timeouts hit.
+if _is_sqlite:
+    _engine_kwargs = {"connect_args": {"check_same_thread": False}}
+else:
+    _engine_kwargs = {
+        "pool_size": 20,
+        "max_overflow": 40,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    }
 
 # Create database engine
 engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
-    echo=False  # Set to True for SQL query logging during development
+    _database_url,
+    echo=False,  # Set to True for SQL query logging during development
+    **_engine_kwargs,
 )
 
+
+if _is_sqlite:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """WAL lets readers proceed while a writer holds the lock."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -24,9 +63,24 @@ def init_db():
     Initialize the database by creating all tables.
     Called on application startup.
     """
-    Base.metadata.create_all(bind=engine)
+    missing = _missing_tables()
+    if missing:
+        Base.metadata.create_all(bind=engine)
+        logger.info("Created %d missing database tables", len(missing))
+    else:
+        logger.info("All database tables already exist; skipped create_all")
     _run_migrations()
-    print("✓ Database tables created successfully")
+
+
+def _missing_tables() -> set:
+    """
+    Model tables not yet present in the database.
+
+    One catalog query, instead of the per-table existence probe create_all
+    issues, so already-migrated workers boot without touching each table.
+    """
+    existing = set(inspect(engine).get_table_names())
+    return set(Base.metadata.tables) - existing
 
 
 def _run_migrations():
@@ -35,7 +89,7 @@ def _run_migrations():
     Each ALTER TABLE / CREATE TABLE is wrapped in its own transaction so a
     'column already exists' error never rolls back unrelated changes.
     """
-    is_sqlite = "sqlite" in settings.database_url
+    is_sqlite = _is_sqlite
 
     with engine.connect() as conn:
         # ── users table ───────────────────────────────────────────────────────
@@ -56,25 +110,86 @@ def _run_migrations():
             try:
                 conn.execute(text(f"ALTER TABLE users ADD COLUMN {col} {col_type}"))
                 conn.commit()
-                print(f"✓ Migration: added users.{col}")
+                logger.info(f"Migration: added users.{col}")
             except Exception:
                 conn.rollback()
 
+        # users.skills used to be a comma-separated string; it is now a JSON list
+        try:
+            if is_sqlite:
+                rows = conn.execute(text(
+                    "SELECT id, skills FROM users WHERE skills IS NOT NULL AND skills NOT LIKE '[%'"
+                )).fetchall()
+                for user_id, skills in rows:
+                    items = [s.strip() for s in skills.split(",") if s.strip()]
+                    conn.execute(
+                        text("UPDATE users SET skills = :skills WHERE id = :id"),
+                        {"skills": json.dumps(items) if items else None, "id": user_id},
+                    )
+                if rows:
+                    logger.info(f"Migration: converted skills to JSON for {len(rows)} users")
+            else:
+                data_type = conn.execute(text(
+                    "SELECT data_type FROM information_schema.columns "
+                    "WHERE table_name = 'users' AND column_name = 'skills'"
+                )).scalar()
+                if data_type and data_type != "jsonb":
+                    conn.execute(text(
+                        "ALTER TABLE users ALTER COLUMN skills TYPE JSONB USING CASE "
+                        "WHEN btrim(skills) = '' THEN NULL "
+                        "ELSE to_jsonb(regexp_split_to_array(btrim(skills), '\\s*,\\s*')) END"
+                    ))
+                    logger.info("Migration: converted users.skills to JSONB")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.warning(f"users.skills migration skipped: {e}")
+
         # ── jobs table ────────────────────────────────────────────────────────
         try:
             conn.execute(text("ALTER TABLE jobs ADD COLUMN ingest_job_id INTEGER REFERENCES ingest_jobs(id)"))
             conn.commit()
-            print("✓ Migration: added jobs.ingest_job_id")
+            logger.info("Migration: added jobs.ingest_job_id")
         except Exception:
             conn.rollback()
 
         try:
             conn.execute(text("ALTER TABLE jobs ADD COLUMN opening_sentence TEXT"))
             conn.commit()
-            print("✓ Migration: added jobs.opening_sentence")
+            logger.info("Migration: added jobs.opening_sentence")
         except Exception:
             conn.rollback()
 
+        # ── job_alerts table ──────────────────────────────────────────────────
+        # is_active used to be an INTEGER 0/1 flag. SQLite stores booleans as
+        # 0/1 already; Postgres needs the column converted to BOOLEAN.
+        if not is_sqlite:
+            try:
+                conn.execute(text(
+                    "ALTER TABLE job_alerts ALTER COLUMN is_active TYPE BOOLEAN "
+                    "USING is_active <> 0"
+                ))
+                conn.commit()
+                logger.info("Migration: converted job_alerts.is_active to BOOLEAN")
+            except Exception:
+                conn.rollback()
+
+        # ── composite indexes ─────────────────────────────────────────────────
+        # create_all only adds indexes together with new tables.
+        for index_name, table, columns in [
+            ("ix_jobs_status_user", "jobs", "status, user_id"),
+            ("ix_jobs_user_status_created", "jobs", "user_id, status, created_at"),
+            ("ix_jobs_user_match_score", "jobs", "user_id, match_score"),
+            ("ix_jobs_user_applied", "jobs", "user_id, applied_date"),
+            ("ix_job_alerts_user_active", "job_alerts", "user_id, is_active"),
+        ]:
+            try:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({columns})"))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.warning(f"{index_name} migration skipped: {e}")
+
         # ── user_job_feed_status table ────────────────────────────────────────
         # SQLAlchemy's create_all already handles this for fresh DBs via models.py,
         # but we guard here for pre-existing databases that pre-date this table.
@@ -109,10 +224,10 @@ def _run_migrations():
                     )
                 """))
             conn.commit()
-            print("✓ Migration: ensured source_configs table exists")
+            logger.info("Migration: ensured source_configs table exists")
         except Exception as e:
             conn.rollback()
-            print(f"  (source_configs migration skipped: {e})")
+            logger.warning(f"source_configs migration skipped: {e}")
 
         # Seed default source rows (LinkedIn enabled, Drushim + TechMap disabled)
         _seed_source_configs(conn, is_sqlite)
@@ -146,10 +261,10 @@ def _run_migrations():
                     )
                 """))
             conn.commit()
-            print("✓ Migration: ensured fetch_logs table exists")
+            logger.info("Migration: ensured fetch_logs table exists")
         except Exception as e:
             conn.rollback()
-            print(f"  (fetch_logs migration skipped: {e})")
+            logger.warning(f"fetch_logs migration skipped: {e}")
 
         # ── user_job_feed_status table ────────────────────────────────────────
         # SQLAlchemy's create_all already handles this for fresh DBs via models.py,
@@ -178,10 +293,10 @@ def _run_migrations():
                     )
                 """))
             conn.commit()
-            print("✓ Migration: ensured user_job_feed_status table exists")
+            logger.info("Migration: ensured user_job_feed_status table exists")
         except Exception as e:
             conn.rollback()
-            print(f"  (user_job_feed_status migration skipped: {e})")
+            logger.warning(f"user_job_feed_status migration skipped: {e}")
 
 
 def _seed_source_configs(conn, is_sqlite: bool):
@@ -206,10 +321,10 @@ def _seed_source_configs(conn, is_sqlite: bool):
                     {"s": source, "e": enabled, "h": hour, "m": minute, "n": notes},
                 )
                 conn.commit()
-                print(f"✓ Seeded source_configs: {source} (enabled={enabled})")
+                logger.info(f"Seeded source_configs: {source} (enabled={enabled})")
         except Exception as ex:
             conn.rollback()
-            print(f"  (seed source_configs {source} skipped: {ex})")
+            logger.warning(f"seed source_configs {source} skipped: {ex}")
 
 
 def get_db():
@@ -3,6 +3,7 @@ JobMate AI Backend - FastAPI Application
 Main entry point for the FastAPI application.
 """
 import asyncio
+import logging
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -16,12 +17,14 @@ from app.limiter import limiter
 from app.routers import users, jobs, resume, notifications, alerts, analytics, billing, admin
 from app.routers import linkedin_auth
 
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan: init DB, start background scheduler, clean up on exit."""
     import asyncio, concurrent.futures
-    print("Starting JobMate AI Backend...")
+    logger.info("Starting JobMate AI Backend...")
     loop = asyncio.get_event_loop()
     try:
         # Run sync DB init in a thread so it cannot block the event loop
@@ -29,13 +32,13 @@ async def lifespan(app: FastAPI):
             loop.run_in_executor(None, init_db),
             timeout=30,
         )
-        print("Database initialized")
+        logger.info("Database initialized")
     except asyncio.TimeoutError:
-        print("WARNING: Database init timed out — continuing without full migration")
+        logger.warning("Database init timed out — continuing without full migration")
     except Exception as e:
-        print(f"WARNING: Database init error: {e} — continuing")
-    print(f"Server running on http://{settings.host}:{settings.port}")
-    print(f"API docs available at http://localhost:{settings.port}/docs")
+        logger.warning(f"Database init error: {e} — continuing")
+    logger.info(f"Server running on http://{settings.host}:{settings.port}")
+    logger.info(f"API docs available at http://localhost:{settings.port}/docs")
 
     from app.services.scrape_scheduler import run_scheduler
     scheduler_task = asyncio.create_task(run_scheduler())
@@ -47,7 +50,7 @@ async def lifespan(app: FastAPI):
         await scheduler_task
     except asyncio.CancelledError:
         pass
-    print("Shutting down JobMate AI Backend...")
+    logger.info("Shutting down JobMate AI Backend...")
 
 
 # Create FastAPI application
@@ -2,7 +2,8 @@
 SQLAlchemy database models for JobMate AI.
 Defines User and Job tables with relationships.
 """
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Enum, LargeBinary, Boolean
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Enum, LargeBinary, Boolean, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -46,8 +47,11 @@ class User(Base):
     target_role = Column(String(255), nullable=True)
     years_of_experience = Column(Integer, nullable=True)
     
-    # Store skills as comma-separated string (or JSON in production)
-    skills = Column(Text, nullable=True)  # e.g., "Python,React,SQL"
+    # JSON list of skill names (JSONB on Postgres); NULL when the user has none
+    skills = Column(
+        JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql"),
+        nullable=True,
+    )  # e.g., ["Python", "React", "SQL"]
     
     location_preference = Column(String(255), nullable=True)
     min_salary_preference = Column(Integer, nullable=True)   # monthly ILS
@@ -111,17 +115,14 @@ class User(Base):
     @property
     def skills_list(self):
         """Return skills as a list."""
-        if not self.skills:
-            return []
-        return [s.strip() for s in self.skills.split(",") if s.strip()]
+        return self.skills or []
     
     @skills_list.setter
     def skills_list(self, value):
-        """Set skills from a list."""
-        if isinstance(value, list):
-            self.skills = ",".join(value)
-        else:
-            self.skills = value
+        """Set skills from a list (a comma-separated string is split)."""
+        if isinstance(value, str):
+            value = [s.strip() for s in value.split(",") if s.strip()]
+        self.skills = value or None
 
 
 class Job(Base):
@@ -171,6 +172,15 @@ class Job(Base):
     user = relationship("User", back_populates="jobs")
     ingest_job = relationship("IngestJob", foreign_keys=[ingest_job_id])
 
+    __table_args__ = (
+        Index("ix_jobs_status_user", "status", "user_id"),
+        # Per-user listing/analytics: status GROUP BY and filter, then created_at
+        # ordering (scanned backwards for DESC) straight from the index.
+        Index("ix_jobs_user_status_created", "user_id", "status", "created_at"),
+        Index("ix_jobs_user_match_score", "user_id", "match_score"),
+        Index("ix_jobs_user_applied", "user_id", "applied_date"),
+    )
+
     def __repr__(self):
         return f"<Job(id={self.id}, title='{self.title}', company='{self.company}', status='{self.status}')>"
 
@@ -188,7 +198,7 @@ class JobAlert(Base):
     min_match_score = Column(Integer, default=70, nullable=False)  # Only alert if match >= this
     
     # Notification settings
-    is_active = Column(Integer, default=1, nullable=False)  # 1=active, 0=paused
+    is_active = Column(Boolean, default=True, nullable=False)
     frequency = Column(
         Enum(AlertFrequency),
         default=AlertFrequency.DAILY,
@@ -204,6 +214,11 @@ class JobAlert(Base):
     
     # Relationship to user
     user = relationship("User", back_populates="job_alerts")
+
+    # check_all_alerts filters on (user_id, is_active)
+    __table_args__ = (
+        Index("ix_job_alerts_user_active", "user_id", "is_active"),
+    )
     
     def __repr__(self):
         return f"<JobAlert(id={self.id}, keywords='{self.keywords}', active={self.is_active})>"
@@ -72,9 +72,7 @@ def admin_stats(db: Session = Depends(get_db), _: User = Depends(verify_admin)):
         monthly_signups.append({"month": m_start.strftime("%b"), "signups": _signup_by_ym.get(m_start.strftime("%Y-%m"), 0)})
 
     # Users with completed profiles
-    with_skills = db.query(func.count(User.id)).filter(
-        User.skills.isnot(None), User.skills != ""
-    ).scalar() or 0
+    with_skills = db.query(func.count(User.id)).filter(User.skills.isnot(None)).scalar() or 0
     with_role = db.query(func.count(User.id)).filter(
         User.target_role.isnot(None), User.target_role != ""
     ).scalar() or 0
@@ -123,7 +121,7 @@ def admin_stats(db: Session = Depends(get_db), _: User = Depends(verify_admin)):
 
     # ── Alerts ───────────────────────────────────────────────────────────────
     total_alerts = db.query(func.count(JobAlert.id)).scalar() or 0
-    active_alerts = db.query(func.count(JobAlert.id)).filter(JobAlert.is_active == 1).scalar() or 0
+    active_alerts = db.query(func.count(JobAlert.id)).filter(JobAlert.is_active == True).scalar() or 0  # noqa: E712
 
     # ── Ingest jobs ──────────────────────────────────────────────────────────
     total_ingest_jobs = db.query(func.count(IngestJob.id)).scalar() or 0
@@ -959,7 +957,7 @@ def get_user_analytics(
 
     # ── Profile completion after registration (from User table) ───────────
     with_role = db.query(func.count(User.id)).filter(User.target_role.isnot(None), User.target_role != "").scalar() or 0
-    with_skills = db.query(func.count(User.id)).filter(User.skills.isnot(None), User.skills != "").scalar() or 0
+    with_skills = db.query(func.count(User.id)).filter(User.skills.isnot(None)).scalar() or 0
     with_resume = db.query(func.count(User.id)).filter(User.resume_content.isnot(None)).scalar() or 0
     profile_completion = {
         "total_users": total_users,
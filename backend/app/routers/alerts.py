@@ -1,24 +1,92 @@
 """
 Job Alerts API Router
 Handles CRUD operations for job alerts and background checking.
+
+Handlers are plain ``def`` so FastAPI runs the blocking ORM work in its
+threadpool instead of on the event loop.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy import func, insert, or_, select, update
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, timedelta
 
 from app.database import get_db
-from app.models import JobAlert, User, Job
+from app.models import AlertFrequency, JobAlert, User, Job
 from app.schemas import JobAlertCreate, JobAlertUpdate, JobAlertResponse
 from app.routers.users import get_current_user
-from app.services.notifications import EmailNotificationService
+from app.services.notifications import email_service
 from app.services.ai import calculate_match_score
 
 router = APIRouter(prefix="/api/alerts", tags=["Job Alerts"])
 
+# Cap on matches counted per alert in check_all_alerts
+MAX_MATCHES_PER_ALERT = 100
+# Rows fetched per round trip when streaming jobs for a manual check
+JOB_STREAM_CHUNK_SIZE = 500
+ALERT_PREVIEW_SIZE = 5  # jobs returned by a manual check
+
+
+def _keyword_filter(keywords: List[str]):
+    """
+    SQL clause matching jobs whose title or description contains any keyword
+    (case-insensitive), so matching runs in the database instead of Python.
+    """
+    clauses = []
+    for keyword in keywords:
+        escaped = keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        clauses.append(Job.title.ilike(pattern, escape="\\"))
+        clauses.append(Job.description.ilike(pattern, escape="\\"))
+    return or_(*clauses)
+
+
+_FREQUENCY_WINDOWS = {
+    AlertFrequency.DAILY: timedelta(days=1),
+    AlertFrequency.WEEKLY: timedelta(days=7),
+}
+
+
+def _is_due(alert: JobAlert, now: datetime) -> bool:
+    """Whether an alert's frequency window has elapsed since its last check."""
+    if alert.frequency == AlertFrequency.IMMEDIATE:
+        return True
+    window = _FREQUENCY_WINDOWS.get(alert.frequency)
+    if window is None:
+        return False
+    return not alert.last_checked or (now - alert.last_checked) >= window
+
+
+def _count_keyword_matches(db: Session, alerts: List[JobAlert], exclude_user_id: int) -> dict:
+    """
+    Count keyword-matching jobs for every alert in a single round trip.
+
+    Each alert becomes one capped COUNT scalar subquery; they are selected
+    side by side so the database returns all counts in one row.
+    Returns {alert_id: match_count}.
+    """
+    counted = [alert for alert in alerts if alert.keywords_list]
+    if not counted:
+        return {}
+    
+    columns = []
+    for alert in counted:
+        matching_ids = (
+            select(Job.id)
+            .where(Job.user_id != exclude_user_id, _keyword_filter(alert.keywords_list))
+            .limit(MAX_MATCHES_PER_ALERT)
+            .subquery()
+        )
+        columns.append(
+            select(func.count()).select_from(matching_ids).scalar_subquery().label(f"alert_{alert.id}")
+        )
+    
+    row = db.execute(select(*columns)).one()
+    return {alert.id: count for alert, count in zip(counted, row)}
+
 
 @router.post("", response_model=JobAlertResponse, status_code=status.HTTP_201_CREATED)
-async def create_job_alert(
+def create_job_alert(
     alert: JobAlertCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -27,49 +95,39 @@ async def create_job_alert(
     Create a new job alert for the current user.
     User will receive notifications when jobs matching criteria are found.
     """
-    # Create new alert
-    db_alert = JobAlert(
-        user_id=current_user.id,
-        keywords=alert.keywords,
-        location=alert.location,
-        min_match_score=alert.min_match_score,
-        frequency=alert.frequency,
-        is_active=1
-    )
-    
-    db.add(db_alert)
+    # INSERT ... RETURNING hands back the stored row (ids, defaults) in the
+    # same round trip; serialize before commit so nothing gets re-fetched.
+    db_alert = db.execute(
+        insert(JobAlert)
+        .values(
+            user_id=current_user.id,
+            keywords=alert.keywords,
+            location=alert.location,
+            min_match_score=alert.min_match_score,
+            frequency=alert.frequency,
+            is_active=True,
+        )
+        .returning(JobAlert)
+    ).scalar_one()
+    response = JobAlertResponse.model_validate(db_alert)
     db.commit()
-    db.refresh(db_alert)
-    
-    # Convert is_active to boolean for response
-    response_data = JobAlertResponse.model_validate(db_alert)
-    response_data.is_active = bool(db_alert.is_active)
     
-    return response_data
+    return response
 
 
 @router.get("", response_model=List[JobAlertResponse])
-async def get_job_alerts(
+def get_job_alerts(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get all job alerts for the current user.
     """
-    alerts = db.query(JobAlert).filter(JobAlert.user_id == current_user.id).all()
-    
-    # Convert is_active to boolean for each alert
-    result = []
-    for alert in alerts:
-        response = JobAlertResponse.model_validate(alert)
-        response.is_active = bool(alert.is_active)
-        result.append(response)
-    
-    return result
+    return db.query(JobAlert).filter(JobAlert.user_id == current_user.id).all()
 
 
 @router.get("/{alert_id}", response_model=JobAlertResponse)
-async def get_job_alert(
+def get_job_alert(
     alert_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -85,14 +143,11 @@ async def get_job_alert(
     if not alert:
         raise HTTPException(status_code=404, detail="Job alert not found")
     
-    response = JobAlertResponse.model_validate(alert)
-    response.is_active = bool(alert.is_active)
-    
-    return response
+    return alert
 
 
 @router.put("/{alert_id}", response_model=JobAlertResponse)
-async def update_job_alert(
+def update_job_alert(
     alert_id: int,
     alert_update: JobAlertUpdate,
     current_user: User = Depends(get_current_user),
@@ -101,35 +156,27 @@ async def update_job_alert(
     """
     Update a job alert.
     """
-    db_alert = db.query(JobAlert).filter(
-        JobAlert.id == alert_id,
-        JobAlert.user_id == current_user.id
-    ).first()
-    
-    if not db_alert:
-        raise HTTPException(status_code=404, detail="Job alert not found")
-    
-    # Update fields
     update_data = alert_update.model_dump(exclude_unset=True)
     
-    # Convert is_active boolean to integer for database
-    if "is_active" in update_data:
-        update_data["is_active"] = 1 if update_data["is_active"] else 0
+    # Ownership check, update and re-read in a single UPDATE ... RETURNING
+    db_alert = db.execute(
+        update(JobAlert)
+        .where(JobAlert.id == alert_id, JobAlert.user_id == current_user.id)
+        .values(**update_data)
+        .returning(JobAlert)
+    ).scalar_one_or_none()
     
-    for field, value in update_data.items():
-        setattr(db_alert, field, value)
-    
-    db.commit()
-    db.refresh(db_alert)
+    if not db_alert:
+        raise HTTPException(status_code=404, detail="Job alert not found")
     
     response = JobAlertResponse.model_validate(db_alert)
-    response.is_active = bool(db_alert.is_active)
+    db.commit()
     
     return response
 
 
 @router.delete("/{alert_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_job_alert(
+def delete_job_alert(
     alert_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -152,7 +199,7 @@ async def delete_job_alert(
 
 
 @router.post("/{alert_id}/check", response_model=dict)
-async def check_alert_now(
+def check_alert_now(
     alert_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -171,34 +218,40 @@ async def check_alert_now(
     
     # Find matching jobs (simple keyword matching for now)
     keywords = alert.keywords_list
-    all_jobs = db.query(Job).filter(Job.user_id != current_user.id).all()  # Jobs from other users (simulated job board)
-    
+    matching_count = 0
     matching_jobs = []
-    for job in all_jobs:
-        # Check if any keyword matches job title or description
-        job_text = f"{job.title} {job.description}".lower()
-        if any(keyword.lower() in job_text for keyword in keywords):
-            # Check match score if we have user skills
+    if keywords:
+        # Only the columns the response needs — skips cover_letter & co.
+        # Streamed in chunks so a large job board never sits in memory at once.
+        stmt = select(Job.id, Job.title, Job.company, Job.description).where(
+            Job.user_id != current_user.id,  # Jobs from other users (simulated job board)
+            _keyword_filter(keywords),
+        ).execution_options(yield_per=JOB_STREAM_CHUNK_SIZE)
+        
+        for chunk in db.execute(stmt).partitions():
             if current_user.skills:
-                match_result = await calculate_match_score(
-                    user_skills=current_user.skills_list,
-                    job_description=job.description,
-                    job_title=job.title
-                )
-                
-                if match_result["match_score"] >= alert.min_match_score:
-                    matching_jobs.append({
-                        "id": job.id,
-                        "title": job.title,
-                        "company": job.company,
-                        "match_score": match_result["match_score"]
-                    })
+                # Scored one job at a time so the threshold sees the same score
+                # /match-score reports, whatever else is in the chunk
+                skills = current_user.skills_list
+                target_role = current_user.target_role or ""
+                chunk_matches = []
+                for job in chunk:
+                    score, _, _ = calculate_match_score(
+                        skills, target_role, job.title, job.description or ""
+                    )
+                    if score >= alert.min_match_score:
+                        chunk_matches.append((job, score))
             else:
+                chunk_matches = [(job, None) for job in chunk]
+            
+            matching_count += len(chunk_matches)
+            # Only the first few are returned, so keep at most that many around
+            for job, score in chunk_matches[:ALERT_PREVIEW_SIZE - len(matching_jobs)]:
                 matching_jobs.append({
                     "id": job.id,
                     "title": job.title,
                     "company": job.company,
-                    "match_score": None
+                    "match_score": score,
                 })
     
     # Update last_checked
@@ -209,13 +262,14 @@ async def check_alert_now(
         "alert_id": alert_id,
         "keywords": keywords,
         "min_match_score": alert.min_match_score,
-        "matching_jobs_found": len(matching_jobs),
-        "jobs": matching_jobs[:5]  # Return top 5
+        "matching_jobs_found": matching_count,
+        "jobs": matching_jobs  # First few matches only
     }
 
 
 @router.post("/check-all", response_model=dict)
-async def check_all_alerts(
+def check_all_alerts(
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -225,66 +279,66 @@ async def check_all_alerts(
     """
     alerts = db.query(JobAlert).filter(
         JobAlert.user_id == current_user.id,
-        JobAlert.is_active == 1
+        JobAlert.is_active == True  # noqa: E712
     ).all()
     
     if not alerts:
         return {"message": "No active alerts to check"}
     
+    now = datetime.utcnow()
+    due_alerts = [alert for alert in alerts if _is_due(alert, now)]
+    
+    # Simplified matching (in production, integrate with real job board API)
+    match_counts = _count_keyword_matches(db, due_alerts, current_user.id)
+    
     total_matches = 0
     checked_alerts = []
+    checked_ids = []
+    notified_ids = []
+    sends = []
     
-    for alert in alerts:
-        # Check if we should notify based on frequency
-        should_check = False
-        
-        if alert.frequency == "immediate":
-            should_check = True
-        elif alert.frequency == "daily":
-            if not alert.last_checked or \
-               (datetime.utcnow() - alert.last_checked) >= timedelta(days=1):
-                should_check = True
-        elif alert.frequency == "weekly":
-            if not alert.last_checked or \
-               (datetime.utcnow() - alert.last_checked) >= timedelta(days=7):
-                should_check = True
+    for alert in due_alerts:
+        matches = match_counts.get(alert.id, 0)
+        total_matches += matches
+        checked_ids.append(alert.id)
         
-        if should_check:
-            # Simplified matching (in production, integrate with real job board API)
-            keywords = alert.keywords_list
-            all_jobs = db.query(Job).filter(Job.user_id != current_user.id).limit(100).all()
+        if matches > 0:
+            notified_ids.append(alert.id)
             
-            matches = 0
-            for job in all_jobs:
-                job_text = f"{job.title} {job.description}".lower()
-                if any(keyword.lower() in job_text for keyword in keywords):
-                    matches += 1
-            
-            total_matches += matches
-            alert.last_checked = datetime.utcnow()
-            
-            if matches > 0:
-                alert.last_notified = datetime.utcnow()
-                
-                # Send email notification
-                email_service = EmailNotificationService()
-                try:
-                    email_service.send_job_alert(
-                        user_email=current_user.email,
-                        user_name=current_user.full_name or current_user.email,
-                        keywords=alert.keywords,
-                        matches_found=matches,
-                        alert_url=f"http://localhost:5173/jobs"  # Update with your frontend URL
-                    )
-                except Exception as e:
-                    print(f"Failed to send email: {e}")
-            
-            checked_alerts.append({
-                "alert_id": alert.id,
-                "keywords": alert.keywords,
-                "matches": matches
-            })
+            sends.append((email_service.send_job_alert, dict(
+                user_email=current_user.email,
+                user_name=current_user.full_name or current_user.email,
+                keywords=alert.keywords,
+                matches_found=matches,
+                alert_url=f"http://localhost:5173/jobs"  # Update with your frontend URL
+            )))
+        
+        checked_alerts.append({
+            "alert_id": alert.id,
+            "keywords": alert.keywords,
+            "matches": matches
+        })
+    
+    # Send email notifications in parallel after the response is returned
+    if sends:
+        background_tasks.add_task(email_service.send_concurrently, sends)
     
+    # Stamp all checked / notified alerts with one UPDATE each rather than
+    # letting the flush emit a separate UPDATE per mutated row.
+    if checked_ids:
+        db.execute(
+            update(JobAlert)
+            .where(JobAlert.id.in_(checked_ids))
+            .values(last_checked=now),
+            execution_options={"synchronize_session": False},
+        )
+    if notified_ids:
+        db.execute(
+            update(JobAlert)
+            .where(JobAlert.id.in_(notified_ids))
+            .values(last_notified=now),
+            execution_options={"synchronize_session": False},
+        )
     db.commit()
     
     return {
@@ -4,34 +4,114 @@ Provides analytics and insights on job applications.
 """
 import json
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from sqlalchemy import Integer, and_, case, cast, extract, func
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from collections import defaultdict
 
 from app.database import get_db
 from app.models import User, Job, Application, JobStatus, UserEvent
 from app.schemas import AnalyticsDashboard, ApplicationStats, MonthlyTrend
 from app.routers.users import get_current_user
+from app.services.cache import ANALYTICS_CACHE_TTL, get_cache, make_analytics_cache_key
 
-router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
+# Dashboard payloads are the largest JSON bodies we return; orjson encodes them
+# several times faster than the stdlib encoder.
+router = APIRouter(prefix="/api/analytics", tags=["Analytics"], default_response_class=ORJSONResponse)
+
+
+# Match-score histogram buckets, in display order
+_SCORE_BUCKETS = ("0-20", "21-40", "41-60", "61-80", "81-100")
+
+# Status values resolved once rather than re-enumerating JobStatus per request
+_STATUSES = tuple(status.value for status in JobStatus)
+# Funnel stages: a job counts toward every stage it has reached
+_PIPELINE_APPLIED = ("applied", "interview", "offer")
+_PIPELINE_INTERVIEW = ("interview", "offer")
+
+
+def _month_key(db: Session, column):
+    """SQL expression formatting a datetime column as 'YYYY-MM'."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m", column)
+    return func.to_char(column, "YYYY-MM")
+
+
+def _days_between(db: Session, start, end):
+    """
+    SQL expressions for the gap between two datetime columns:
+    (fractional days, whole days). Whole days match timedelta.days only
+    where the gap is non-negative, so callers must filter on that first.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        days = func.julianday(end) - func.julianday(start)
+        return days, cast(days, Integer)
+    days = extract("epoch", end - start) / 86400
+    return days, func.floor(days)
+
+
+def _status_counts(db: Session, user_id: int):
+    """Total job count and per-status counts (known statuses only) in one GROUP BY."""
+    rows = db.query(Job.status, func.count(Job.id)).filter(
+        Job.user_id == user_id
+    ).group_by(Job.status).all()
+    
+    counts = dict(rows)
+    total = sum(counts.values())
+    by_status = {status: counts[status] for status in _STATUSES if counts.get(status)}
+    return total, by_status
+
+
+def _monthly_trends(db: Session, user_id: int, months: int) -> List[MonthlyTrend]:
+    """Per-month application/outcome counts for the latest `months` months, oldest first."""
+    month = _month_key(db, Job.created_at).label("month")
+    rows = db.query(
+        month,
+        func.count(Job.id),
+        func.sum(case((Job.status == "interview", 1), else_=0)),
+        func.sum(case((Job.status == "offer", 1), else_=0)),
+        func.sum(case((Job.status == "rejected", 1), else_=0)),
+    ).filter(
+        Job.user_id == user_id
+    ).group_by(month).order_by(month.desc()).limit(max(months, 0)).all()
+    
+    return [
+        MonthlyTrend(
+            month=month_key,
+            applications=applications,
+            interviews=interviews,
+            offers=offers,
+            rejections=rejections
+        )
+        for month_key, applications, interviews, offers, rejections in reversed(rows)
+    ]
 
 
 @router.get("/dashboard", response_model=AnalyticsDashboard)
-async def get_analytics_dashboard(
+def get_analytics_dashboard(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get comprehensive analytics dashboard for the current user.
     Includes stats, trends, and insights.
+    
+    Every aggregate is computed by the database; only the grouped rows
+    come back, never the user's jobs themselves.
     """
-    # Get all jobs for user
-    jobs = db.query(Job).filter(Job.user_id == current_user.id).all()
+    cache_key = make_analytics_cache_key(current_user.id, "dashboard")
+    cache = get_cache()
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    user_filter = Job.user_id == current_user.id
+    total_apps, by_status = _status_counts(db, current_user.id)
     
-    if not jobs:
+    if not total_apps:
         # Return empty dashboard
         return AnalyticsDashboard(
             stats=ApplicationStats(
@@ -48,45 +128,22 @@ async def get_analytics_dashboard(
             status_funnel={}
         )
     
-    # Calculate application stats
-    total_apps = len(jobs)
-    by_status = {}
-    
-    for status in JobStatus:
-        count = sum(1 for job in jobs if job.status == status.value)
-        if count > 0:
-            by_status[status.value] = count
-    
     # Calculate success rate (offers / total applications)
     offers = by_status.get("offer", 0)
     success_rate = (offers / total_apps * 100) if total_apps > 0 else 0.0
     
-    # Calculate average match score
-    match_scores = [job.match_score for job in jobs if job.match_score is not None]
-    avg_match_score = sum(match_scores) / len(match_scores) if match_scores else None
-    
-    # Calculate time metrics (simplified - using created_at differences)
-    interviews = [job for job in jobs if job.status in ["interview", "offer"]]
-    avg_time_to_interview = None
-    if interviews:
-        times = []
-        for job in interviews:
-            if job.applied_date and job.interview_date:
-                days = (job.interview_date - job.applied_date).days
-                if days >= 0:
-                    times.append(days)
-        avg_time_to_interview = sum(times) / len(times) if times else None
-    
-    offer_jobs = [job for job in jobs if job.status == "offer"]
-    avg_time_to_offer = None
-    if offer_jobs:
-        times = []
-        for job in offer_jobs:
-            if job.applied_date and job.updated_at:
-                days = (job.updated_at - job.applied_date).days
-                if days >= 0:
-                    times.append(days)
-        avg_time_to_offer = sum(times) / len(times) if times else None
+    # Average match score and time metrics (in whole days, as timedelta.days)
+    interview_days, interview_whole_days = _days_between(db, Job.applied_date, Job.interview_date)
+    offer_days, offer_whole_days = _days_between(db, Job.applied_date, Job.updated_at)
+    avg_match_score, avg_time_to_interview, avg_time_to_offer = db.query(
+        func.avg(Job.match_score),
+        func.avg(case(
+            (and_(Job.status.in_(_PIPELINE_INTERVIEW), interview_days >= 0), interview_whole_days),
+        )),
+        func.avg(case(
+            (and_(Job.status == "offer", offer_days >= 0), offer_whole_days),
+        )),
+    ).filter(user_filter).one()
     
     stats = ApplicationStats(
         total_applications=total_apps,
@@ -98,75 +155,37 @@ async def get_analytics_dashboard(
     )
     
     # Calculate monthly trends (last 6 months)
-    monthly_data = defaultdict(lambda: {
-        "applications": 0,
-        "interviews": 0,
-        "offers": 0,
-        "rejections": 0
-    })
-    
-    for job in jobs:
-        month_key = job.created_at.strftime("%Y-%m")
-        monthly_data[month_key]["applications"] += 1
-        
-        if job.status == "interview":
-            monthly_data[month_key]["interviews"] += 1
-        elif job.status == "offer":
-            monthly_data[month_key]["offers"] += 1
-        elif job.status == "rejected":
-            monthly_data[month_key]["rejections"] += 1
-    
-    # Sort by month and create trend objects
-    monthly_trends = []
-    for month in sorted(monthly_data.keys(), reverse=True)[:6]:
-        data = monthly_data[month]
-        monthly_trends.append(MonthlyTrend(
-            month=month,
-            applications=data["applications"],
-            interviews=data["interviews"],
-            offers=data["offers"],
-            rejections=data["rejections"]
-        ))
-    
-    monthly_trends.reverse()  # Oldest to newest
+    monthly_trends = _monthly_trends(db, current_user.id, 6)
     
     # Match score distribution
-    match_score_dist = {
-        "0-20": 0,
-        "21-40": 0,
-        "41-60": 0,
-        "61-80": 0,
-        "81-100": 0
-    }
-    
-    for job in jobs:
-        if job.match_score is not None:
-            score = job.match_score
-            if score <= 20:
-                match_score_dist["0-20"] += 1
-            elif score <= 40:
-                match_score_dist["21-40"] += 1
-            elif score <= 60:
-                match_score_dist["41-60"] += 1
-            elif score <= 80:
-                match_score_dist["61-80"] += 1
-            else:
-                match_score_dist["81-100"] += 1
+    bucket = case(
+        (Job.match_score <= 20, "0-20"),
+        (Job.match_score <= 40, "21-40"),
+        (Job.match_score <= 60, "41-60"),
+        (Job.match_score <= 80, "61-80"),
+        else_="81-100",
+    ).label("bucket")
+    bucket_counts = dict(
+        db.query(bucket, func.count(Job.id)).filter(
+            user_filter,
+            Job.match_score.isnot(None),
+        ).group_by(bucket).all()
+    )
+    match_score_dist = {name: bucket_counts.get(name, 0) for name in _SCORE_BUCKETS}
     
     # Top companies
-    company_counts = defaultdict(int)
-    for job in jobs:
-        company_counts[job.company] += 1
-    
+    company_count = func.count(Job.id).label("count")
     top_companies = [
         {"company": company, "count": count}
-        for company, count in sorted(company_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+        for company, count in db.query(Job.company, company_count).filter(
+            user_filter
+        ).group_by(Job.company).order_by(company_count.desc()).limit(5).all()
     ]
     
     # Status funnel (conversion rates)
     saved = by_status.get("saved", 0)
-    applied = by_status.get("applied", 0) + by_status.get("interview", 0) + by_status.get("offer", 0)
-    interview = by_status.get("interview", 0) + by_status.get("offer", 0)
+    applied = sum(by_status.get(status, 0) for status in _PIPELINE_APPLIED)
+    interview = sum(by_status.get(status, 0) for status in _PIPELINE_INTERVIEW)
     offer = by_status.get("offer", 0)
     
     status_funnel = {
@@ -179,40 +198,41 @@ async def get_analytics_dashboard(
         "interview_to_offer_rate": round(offer / interview * 100, 1) if interview > 0 else 0
     }
     
-    return AnalyticsDashboard(
+    dashboard = AnalyticsDashboard(
         stats=stats,
         monthly_trends=monthly_trends,
         match_score_distribution=match_score_dist,
         top_companies=top_companies,
         status_funnel=status_funnel
     )
+    cache.set(cache_key, jsonable_encoder(dashboard), ttl=ANALYTICS_CACHE_TTL)
+    return dashboard
 
 
 @router.get("/stats", response_model=ApplicationStats)
-async def get_application_stats(
+def get_application_stats(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get basic application statistics.
     """
-    jobs = db.query(Job).filter(Job.user_id == current_user.id).all()
-    
-    total_apps = len(jobs)
-    by_status = {}
+    cache_key = make_analytics_cache_key(current_user.id, "stats")
+    cache = get_cache()
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
     
-    for status in JobStatus:
-        count = sum(1 for job in jobs if job.status == status.value)
-        if count > 0:
-            by_status[status.value] = count
+    total_apps, by_status = _status_counts(db, current_user.id)
     
     offers = by_status.get("offer", 0)
     success_rate = (offers / total_apps * 100) if total_apps > 0 else 0.0
     
-    match_scores = [job.match_score for job in jobs if job.match_score is not None]
-    avg_match_score = sum(match_scores) / len(match_scores) if match_scores else None
+    avg_match_score = db.query(func.avg(Job.match_score)).filter(
+        Job.user_id == current_user.id
+    ).scalar()
     
-    return ApplicationStats(
+    stats = ApplicationStats(
         total_applications=total_apps,
         by_status=by_status,
         success_rate=round(success_rate, 2),
@@ -220,10 +240,12 @@ async def get_application_stats(
         avg_time_to_interview=None,
         avg_time_to_offer=None
     )
+    cache.set(cache_key, jsonable_encoder(stats), ttl=ANALYTICS_CACHE_TTL)
+    return stats
 
 
 @router.get("/trends/monthly", response_model=List[MonthlyTrend])
-async def get_monthly_trends(
+def get_monthly_trends(
     months: int = 6,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -234,52 +256,34 @@ async def get_monthly_trends(
     Args:
         months: Number of months to include (default: 6)
     """
-    jobs = db.query(Job).filter(Job.user_id == current_user.id).all()
-    
-    monthly_data = defaultdict(lambda: {
-        "applications": 0,
-        "interviews": 0,
-        "offers": 0,
-        "rejections": 0
-    })
-    
-    for job in jobs:
-        month_key = job.created_at.strftime("%Y-%m")
-        monthly_data[month_key]["applications"] += 1
-        
-        if job.status == "interview":
-            monthly_data[month_key]["interviews"] += 1
-        elif job.status == "offer":
-            monthly_data[month_key]["offers"] += 1
-        elif job.status == "rejected":
-            monthly_data[month_key]["rejections"] += 1
-    
-    trends = []
-    for month in sorted(monthly_data.keys(), reverse=True)[:months]:
-        data = monthly_data[month]
-        trends.append(MonthlyTrend(
-            month=month,
-            applications=data["applications"],
-            interviews=data["interviews"],
-            offers=data["offers"],
-            rejections=data["rejections"]
-        ))
-    
-    trends.reverse()
+    cache_key = make_analytics_cache_key(current_user.id, f"trends:{months}")
+    cache = get_cache()
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    trends = _monthly_trends(db, current_user.id, months)
+    cache.set(cache_key, jsonable_encoder(trends), ttl=ANALYTICS_CACHE_TTL)
     return trends
 
 
 @router.get("/insights", response_model=Dict)
-async def get_insights(
+def get_insights(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get AI-powered insights and recommendations based on application data.
     """
-    jobs = db.query(Job).filter(Job.user_id == current_user.id).all()
+    cache_key = make_analytics_cache_key(current_user.id, "insights")
+    cache = get_cache()
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    total, by_status = _status_counts(db, current_user.id)
     
-    if not jobs:
+    if not total:
         return {
             "insights": [],
             "recommendations": ["Start adding jobs to track your applications!"]
@@ -288,10 +292,14 @@ async def get_insights(
     insights = []
     recommendations = []
     
+    recent_cutoff = datetime.utcnow() - timedelta(days=14)
+    avg_score, recent_apps = db.query(
+        func.avg(Job.match_score),
+        func.count(case((Job.applied_date > recent_cutoff, Job.id))),
+    ).filter(Job.user_id == current_user.id).one()
+    
     # Analyze match scores
-    match_scores = [job.match_score for job in jobs if job.match_score is not None]
-    if match_scores:
-        avg_score = sum(match_scores) / len(match_scores)
+    if avg_score is not None:
         if avg_score < 60:
             insights.append(f"Your average match score is {avg_score:.1f}%. Consider targeting jobs that better match your skills.")
             recommendations.append("Focus on jobs with 70%+ match scores for better success rates.")
@@ -299,11 +307,6 @@ async def get_insights(
             insights.append(f"Great job! Your average match score is {avg_score:.1f}%.")
     
     # Analyze application status distribution
-    by_status = {}
-    for status in JobStatus:
-        count = sum(1 for job in jobs if job.status == status.value)
-        by_status[status.value] = count
-    
     saved = by_status.get("saved", 0)
     applied = by_status.get("applied", 0)
     
@@ -312,16 +315,12 @@ async def get_insights(
         recommendations.append("Convert more saved jobs into applications to increase your chances!")
     
     # Analyze time gaps
-    recent_apps = [job for job in jobs if job.applied_date and 
-                   (datetime.utcnow() - job.applied_date).days < 14]
-    
-    if len(recent_apps) == 0 and len(jobs) > 0:
+    if recent_apps == 0:
         insights.append("No applications submitted in the last 2 weeks.")
         recommendations.append("Stay active! Apply to at least 2-3 jobs per week.")
     
     # Success rate analysis
     offers = by_status.get("offer", 0)
-    total = len(jobs)
     success_rate = (offers / total * 100) if total > 0 else 0
     
     if success_rate > 5:
@@ -336,10 +335,12 @@ async def get_insights(
         insights.append(f"You have {interviews} interviews but no offers yet.")
         recommendations.append("Practice interview skills and use our interview preparation feature!")
     
-    return {
+    result = {
         "insights": insights if insights else ["Keep tracking applications to get personalized insights!"],
         "recommendations": recommendations if recommendations else ["You're doing great! Keep applying and stay consistent."]
     }
+    cache.set(cache_key, result, ttl=ANALYTICS_CACHE_TTL)
+    return result
 
 
 # ── User behavior event tracking ─────────────────────────────────────────────
@@ -352,7 +353,7 @@ class EventPayload(BaseModel):
 
 
 @router.post("/event", status_code=201)
-async def track_event(
+def track_event(
     payload: EventPayload,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
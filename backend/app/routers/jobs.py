@@ -3,19 +3,25 @@ Job API router.
 Handles job CRUD operations, match scoring, and cover letter generation.
 """
 import asyncio
+import hashlib
+import json
 import logging
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session, raiseload
 from typing import List, Optional
 
 from app.database import get_db
 from app.models import User, Job, JobStatus
 from app.models import IngestJob, UserJobFeedStatus
-from app.schemas import JobCreate, JobUpdate, JobResponse, MatchScoreResponse, CoverLetterResponse
+from app.schemas import JobCreate, JobUpdate, JobResponse, MatchScoreResponse, CoverLetterResponse, CoverLetterBatchRequest
 from app.schemas import FeedJobResponse, StatusUpdateRequest
-from app.services.ai import calculate_match_score, generate_cover_letter, generate_opening_sentence
-from app.routers.users import get_current_user, make_usage_gate
+from app.services.ai import COVER_LETTER_DESCRIPTION_CHARS, calculate_match_score, calculate_match_scores_batch, generate_cover_letter, generate_cover_letter_stream, generate_cover_letters_batch, generate_opening_sentence
+from app.routers.users import FREE_DAILY_LIMIT, get_current_user, make_usage_gate, quota_charge_within_limit
+from app.services.cache import get_cache, invalidate_analytics_cache
 
 _gate_cover_letter       = make_usage_gate("cover_letter")
 _gate_interview          = make_usage_gate("interview_questions")
@@ -28,7 +34,7 @@ router = APIRouter(prefix="/api", tags=["jobs"])
 _bearer = HTTPBearer(auto_error=False)
 
 
-async def get_current_user_optional(
+def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
     db: Session = Depends(get_db),
 ) -> Optional[User]:
@@ -56,6 +62,50 @@ def _require_job_ownership(job: Job, current_user: User) -> None:
         )
 
 
+
+def _get_owned_job(db: Session, job_id: int, current_user: User) -> Job:
+    """
+    Load a tracked job, raising 404 if missing and 403 if not owned.
+
+    Relationships are raiseload'ed: every handler here works from the job's own
+    columns plus current_user, so any lazy load would be an accidental N+1.
+    """
+    job = db.query(Job).options(raiseload("*")).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
+    _require_job_ownership(job, current_user)
+    return job
+
+# Match scores are a pure function of the profile and job text, so they can
+# be shared by anyone scoring the same content.
+MATCH_SCORE_CACHE_TTL = 24 * 3600
+
+
+def _cached_match_score(user: User, job: Job):
+    """calculate_match_score for user/job, memoized by a hash of its inputs."""
+    inputs = [user.skills_list, user.target_role or "", job.title, job.description]
+    digest = hashlib.sha256(json.dumps(inputs).encode()).hexdigest()
+    cache_key = f"ai:match:{digest}"
+    cache = get_cache()
+    # 24h entries only go to Redis; the in-memory fallback has no size bound
+    use_cache = cache.redis_client is not None
+
+    cached = cache.get(cache_key) if use_cache else None
+    if cached is not None:
+        score, matched_skills, missing_skills = cached
+        return score, matched_skills, missing_skills
+
+    result = calculate_match_score(
+        user_skills=user.skills_list,
+        target_role=user.target_role or "",
+        job_title=job.title,
+        job_description=job.description
+    )
+    if use_cache:
+        cache.set(cache_key, list(result), ttl=MATCH_SCORE_CACHE_TTL)
+    return result
+
+
 @router.get("/jobs", response_model=List[FeedJobResponse])
 def list_feed_jobs(
     status: Optional[str] = None,
@@ -224,6 +274,7 @@ def create_job(
     db.add(db_job)
     db.commit()
     db.refresh(db_job)
+    invalidate_analytics_cache(user_id)
 
     # Generate bilingual opening sentence in the background
     background_tasks.add_task(
@@ -282,6 +333,52 @@ def list_user_jobs(
     return [dict(zip(cols, r)) for r in rows]
 
 
+@router.post("/users/{user_id}/jobs/rescore", response_model=List[MatchScoreResponse])
+def rescore_user_jobs(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Recalculate and store match scores for all of a user's tracked jobs.
+
+    Scores every job in one TF-IDF vectorizer pass and writes them back with a
+    single bulk UPDATE, instead of one /match call per job.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to rescore jobs for this user",
+        )
+
+    jobs = db.query(Job.id, Job.title, Job.description).filter(Job.user_id == user_id).all()
+    if not jobs:
+        return []
+
+    results = calculate_match_scores_batch(
+        current_user.skills_list,
+        current_user.target_role or "",
+        [{"title": job.title, "description": job.description} for job in jobs],
+    )
+
+    db.execute(
+        update(Job),
+        [{"id": job.id, "match_score": score} for job, (score, _, _) in zip(jobs, results)],
+    )
+    db.commit()
+    invalidate_analytics_cache(user_id)
+
+    return [
+        MatchScoreResponse(
+            job_id=job.id,
+            match_score=score,
+            matched_skills=matched_skills,
+            missing_skills=missing_skills
+        )
+        for job, (score, matched_skills, missing_skills) in zip(jobs, results)
+    ]
+
+
 @router.get("/jobs/top-matches")
 async def get_top_matching_jobs(
     user_id: int = Query(..., description="User ID"),
@@ -557,10 +654,7 @@ def get_job(
     current_user: User = Depends(get_current_user),
 ):
     """Get a single tracked job by ID (owner only)."""
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
-    _require_job_ownership(job, current_user)
+    job = _get_owned_job(db, job_id, current_user)
     return job
 
 
@@ -572,17 +666,27 @@ def update_job(
     current_user: User = Depends(get_current_user),
 ):
     """Update a job's details or status (owner only)."""
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
-    _require_job_ownership(job, current_user)
-
-    for field, value in job_data.model_dump(exclude_unset=True).items():
-        setattr(job, field, value)
-
+    update_data = job_data.model_dump(exclude_unset=True)
+    if not update_data:
+        return _get_owned_job(db, job_id, current_user)
+
+    # UPDATE ... RETURNING reads the new row back in the same round trip; the
+    # owner filter doubles as the authorization check.
+    job = db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.user_id == current_user.id)
+        .values(**update_data)
+        .returning(Job)
+    ).scalar_one_or_none()
+    if job is None:
+        # Nothing matched: raise 404 for a missing job, 403 for someone else's
+        _get_owned_job(db, job_id, current_user)
+
+    # Serialize before commit so the expired instance isn't reloaded
+    response = JobResponse.model_validate(job)
     db.commit()
-    db.refresh(job)
-    return job
+    invalidate_analytics_cache(current_user.id)
+    return response
 
 
 @router.delete("/jobs/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -592,12 +696,10 @@ def delete_job(
     current_user: User = Depends(get_current_user),
 ):
     """Delete a tracked job (owner only)."""
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
-    _require_job_ownership(job, current_user)
+    job = _get_owned_job(db, job_id, current_user)
     db.delete(job)
     db.commit()
+    invalidate_analytics_cache(current_user.id)
     return None
 
 
@@ -616,27 +718,20 @@ def compute_match_score(
 
     Returns a score from 0-100 and lists of matched/missing skills.
     """
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
-    _require_job_ownership(job, current_user)
+    job = _get_owned_job(db, job_id, current_user)
     user = current_user
     
-    # Calculate match score
-    score, matched_skills, missing_skills = calculate_match_score(
-        user_skills=user.skills_list,
-        target_role=user.target_role or "",
-        job_title=job.title,
-        job_description=job.description
-    )
+    # Calculate match score (memoized on profile + job content)
+    score, matched_skills, missing_skills = _cached_match_score(user, job)
     
     # Update job with score
     job.match_score = score
     db.commit()
-    db.refresh(job)
+    invalidate_analytics_cache(current_user.id)
     
+    # Built from local values: touching the committed (expired) job would reload it
     return MatchScoreResponse(
-        job_id=job.id,
+        job_id=job_id,
         match_score=score,
         matched_skills=matched_skills,
         missing_skills=missing_skills
@@ -658,10 +753,7 @@ async def generate_job_cover_letter(
     
     The cover letter is stored in the database and returned.
     """
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
-    _require_job_ownership(job, current_user)
+    job = _get_owned_job(db, job_id, current_user)
     user = current_user
 
     # Generate cover letter
@@ -683,14 +775,135 @@ async def generate_job_cover_letter(
     # Store cover letter
     job.cover_letter = cover_letter
     db.commit()
-    db.refresh(job)
     
     return CoverLetterResponse(
-        job_id=job.id,
+        job_id=job_id,
         cover_letter=cover_letter
     )
 
 
+def _save_cover_letter(bind, job_id: int, cover_letter: str) -> None:
+    """Store a generated cover letter on a job using a short-lived session."""
+    with Session(bind) as save_db:
+        save_db.execute(update(Job).where(Job.id == job_id).values(cover_letter=cover_letter))
+        save_db.commit()
+
+
+@router.post("/jobs/{job_id}/cover-letter/stream")
+async def stream_job_cover_letter(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(_gate_cover_letter),
+):
+    """
+    Generate a cover letter for a job and stream it as Server-Sent Events.
+    
+    Each `data:` event holds a JSON-encoded text fragment; a final `done` event
+    follows once the letter is complete. The full letter is then stored on the
+    job, the same as with the non-streaming endpoint.
+    
+    If OpenAI fails after fragments were already sent, the stream ends with an
+    `error` event instead. That use is still charged, but the partial letter is
+    not stored, so the job keeps its previous cover letter.
+    """
+    job = _get_owned_job(db, job_id, current_user)
+    user = current_user
+    kwargs = {
+        "user_name": user.full_name or user.email.split('@')[0],
+        "user_skills": user.skills_list,
+        "target_role": user.target_role or "Professional",
+        "job_title": job.title,
+        "company": job.company,
+        "job_description": job.description,
+    }
+
+    async def events():
+        parts = []
+        try:
+            async for fragment in generate_cover_letter_stream(**kwargs):
+                parts.append(fragment)
+                yield f"data: {json.dumps(fragment)}\n\n"
+        except Exception as e:
+            logger.error(f"Cover letter stream failed for job {job_id}: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': 'Cover letter generation failed'})}\n\n"
+            return
+
+        # The request's session is closed by the time the stream finishes, and the
+        # save is sync DB work, so it gets its own session on a worker thread
+        await run_in_threadpool(_save_cover_letter, db.get_bind(), job_id, "".join(parts).strip())
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@router.post("/users/{user_id}/jobs/cover-letters", response_model=List[CoverLetterResponse])
+async def generate_job_cover_letters(
+    user_id: int,
+    body: CoverLetterBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Generate cover letters for several of the user's jobs at once.
+    
+    The OpenAI requests run concurrently, so the response arrives in roughly the
+    time of a single letter. Free users are charged one cover-letter use per job,
+    and a batch that would exceed the daily limit is rejected without charge.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to generate cover letters for this user",
+        )
+
+    job_ids = list(dict.fromkeys(body.job_ids))
+    # Only the part of the description the prompt uses is read from the database
+    jobs = db.query(
+        Job.id,
+        Job.title,
+        Job.company,
+        func.substr(Job.description, 1, COVER_LETTER_DESCRIPTION_CHARS).label("description"),
+    ).filter(
+        Job.id.in_(job_ids), Job.user_id == user_id
+    ).all()
+    found = {job.id for job in jobs}
+    missing = [job_id for job_id in job_ids if job_id not in found]
+    if missing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Jobs not found: {missing}")
+
+    # Only charge a batch that will actually run; one over the limit costs nothing
+    if getattr(current_user, "subscription_tier", "free") != "pro":
+        if not quota_charge_within_limit(db, user_id, "cover_letter", len(jobs), FREE_DAILY_LIMIT):
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="daily_limit_reached:cover_letter",
+            )
+
+    user = current_user
+    letters = await generate_cover_letters_batch([
+        {
+            "user_name": user.full_name or user.email.split('@')[0],
+            "user_skills": user.skills_list,
+            "target_role": user.target_role or "Professional",
+            "job_title": job.title,
+            "company": job.company,
+            "job_description": job.description,
+        }
+        for job in jobs
+    ])
+
+    db.execute(
+        update(Job),
+        [{"id": job.id, "cover_letter": letter} for job, letter in zip(jobs, letters)],
+    )
+    db.commit()
+
+    return [
+        CoverLetterResponse(job_id=job.id, cover_letter=letter)
+        for job, letter in zip(jobs, letters)
+    ]
+
+
 @router.get("/jobs/{job_id}/interview-questions")
 async def generate_interview_questions(
     job_id: int,
@@ -706,10 +919,7 @@ async def generate_interview_questions(
     - Required skills and experience
     - Company information
     """
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
-    _require_job_ownership(job, current_user)
+    job = _get_owned_job(db, job_id, current_user)
 
     try:
         from app.services.ai import generate_interview_questions
@@ -751,10 +961,7 @@ async def estimate_job_salary(
     - Required experience and skills
     - Market conditions
     """
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
-    _require_job_ownership(job, current_user)
+    job = _get_owned_job(db, job_id, current_user)
 
     try:
         from app.services.ai import estimate_salary
@@ -827,7 +1034,7 @@ async def interview_questions_inline(
 
 
 @router.post("/jobs/scrape-url")
-async def scrape_job_from_url(
+def scrape_job_from_url(
     url: str = Query(..., description="URL of the job posting to scrape"),
     user_id: int = Query(..., description="User ID to associate with the scraped job"),
     db: Session = Depends(get_db),
@@ -853,9 +1060,18 @@ async def scrape_job_from_url(
     
     try:
         from app.services.scrapers import ScraperFactory
+        from app.services.cache import SCRAPED_JOB_CACHE_TTL, make_scraped_job_cache_key
         
-        # Scrape the job data
-        scraped_data = ScraperFactory.scrape_job(url)
+        # Reuse a recent scrape of the same URL; otherwise scrape the job data.
+        # Results only go to Redis; the in-memory fallback has no size bound
+        cache = get_cache()
+        use_cache = cache.redis_client is not None
+        cache_key = make_scraped_job_cache_key(url)
+        scraped_data = cache.get(cache_key) if use_cache else None
+        if scraped_data is None:
+            scraped_data = ScraperFactory.scrape_job(url)
+            if use_cache and scraped_data and scraped_data.get('title'):
+                cache.set(cache_key, scraped_data, ttl=SCRAPED_JOB_CACHE_TTL)
         
         if not scraped_data:
             raise HTTPException(
@@ -2,22 +2,28 @@
 Notifications API router.
 Handles email notification preferences and sending reminders.
 """
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Body
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional
 
 from app.database import get_db
-from app.models import User, Job
+from app.models import User, Job, JobStatus
+from app.routers.admin import verify_admin
 from app.routers.users import get_current_user
 from app.services.notifications import email_service
 
 
 router = APIRouter(prefix="/api/notifications", tags=["notifications"])
 
+# The reminder sweep is meant to run once a day, so each window spans one
+# day and every job falls into exactly one run.
+REMINDER_WINDOW = timedelta(days=1)
+FOLLOW_UP_AFTER_DAYS = 7
+
 
 @router.post("/send-test")
-async def send_test_notification(
+def send_test_notification(
     notification_type: str = Body(..., embed=True),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -63,7 +69,7 @@ async def send_test_notification(
 
 
 @router.post("/jobs/{job_id}/send-reminder")
-async def send_job_reminder(
+def send_job_reminder(
     job_id: int,
     reminder_type: str = Body(..., embed=True),
     current_user: User = Depends(get_current_user),
@@ -112,3 +118,66 @@ async def send_job_reminder(
         "company": job.company,
         "type": reminder_type
     }
+
+
+@router.post("/sweep")
+def sweep_reminders(
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    _: User = Depends(verify_admin),
+):
+    """
+    Queue interview and follow-up reminders for all users (admin / daily cron).
+    
+    - interview: interview scheduled within the next day
+    - follow_up: still "applied" and applied FOLLOW_UP_AFTER_DAYS days ago
+    
+    One joined Job + User query per reminder type; emails are sent in parallel
+    after the response is returned.
+    """
+    now = datetime.now()
+    
+    upcoming_interviews = db.query(
+        Job.title, Job.company, Job.interview_date, User.email, User.full_name
+    ).join(User, User.id == Job.user_id).filter(
+        Job.interview_date > now,
+        Job.interview_date <= now + REMINDER_WINDOW,
+    ).all()
+    
+    sends = [
+        (email_service.send_interview_reminder, dict(
+            user_email=row.email,
+            user_name=row.full_name or "User",
+            job_title=row.title,
+            company=row.company,
+            interview_date=row.interview_date
+        ))
+        for row in upcoming_interviews
+    ]
+    
+    follow_up_cutoff = now - timedelta(days=FOLLOW_UP_AFTER_DAYS)
+    follow_ups_due = db.query(
+        Job.title, Job.company, Job.applied_date, User.email, User.full_name
+    ).join(User, User.id == Job.user_id).filter(
+        Job.status == JobStatus.APPLIED,
+        Job.applied_date > follow_up_cutoff - REMINDER_WINDOW,
+        Job.applied_date <= follow_up_cutoff,
+    ).all()
+    
+    sends += [
+        (email_service.send_follow_up_reminder, dict(
+            user_email=row.email,
+            user_name=row.full_name or "User",
+            job_title=row.title,
+            company=row.company,
+            days_since_applied=(now - row.applied_date).days
+        ))
+        for row in follow_ups_due
+    ]
+    # One background task sending in parallel: separate tasks would run one by one
+    background_tasks.add_task(email_service.send_concurrently, sends)
+    
+    return {
+        "interview_reminders": len(upcoming_interviews),
+        "follow_up_reminders": len(follow_ups_due)
+    }
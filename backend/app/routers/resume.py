@@ -1,4 +1,4 @@
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Dict, Optional
@@ -7,6 +7,7 @@ import docx
 from docx.shared import Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 import io
+import os
 import re
 import json
 import difflib
@@ -20,57 +21,187 @@ _gate_rewrite    = make_usage_gate("resume_rewrite")
 _gate_gaps       = make_usage_gate("resume_gaps")
 _gate_rewrite_diff = make_usage_gate("resume_rewrite")
 from app.config import settings
+from app.services.keyword_match import AHOCORASICK_AVAILABLE, build_automaton, iter_whole_word_matches
 from app.services.usage_logger import log_ai_usage
 from openai import OpenAI
 
+# PyMuPDF's native parser is far faster than PyPDF2's pure-Python one;
+# PyPDF2 stays as the fallback when it is not installed.
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
 router = APIRouter(prefix="/api/resume", tags=["resume"])
 
 _openai = OpenAI(api_key=settings.openai_api_key)
 
 
+MAX_RESUME_BYTES = 5 * 1024 * 1024
+_UPLOAD_CHUNK_SIZE = 64 * 1024
+# Room for the multipart boundary and part headers around the file itself
+_MULTIPART_OVERHEAD = 64 * 1024
+
+
+async def _read_resume_upload(request: Request, file: UploadFile) -> bytes:
+    """
+    Read an uploaded resume, rejecting anything over MAX_RESUME_BYTES with 413.
+
+    The declared Content-Length and the spooled file's size are checked before
+    reading; the read itself goes in chunks and stops as soon as the cap is
+    passed, so an oversize upload is never held in memory in full.
+    """
+    too_large = HTTPException(status_code=413, detail="File size must be less than 5MB")
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_RESUME_BYTES + _MULTIPART_OVERHEAD:
+        raise too_large
+    if file.size is not None and file.size > MAX_RESUME_BYTES:
+        raise too_large
+
+    buf = io.BytesIO()
+    while chunk := await file.read(_UPLOAD_CHUNK_SIZE):
+        buf.write(chunk)
+        if buf.tell() > MAX_RESUME_BYTES:
+            raise too_large
+    return buf.getvalue()
+
+
+RESUME_EXTENSIONS = (".pdf", ".docx")
+
+
+def _resume_extension(filename: Optional[str]) -> str:
+    """Return the lowercased extension of a supported resume file, else raise 400."""
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext not in RESUME_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
+    return ext
+
+
+def _extract_pdf_text(file_content: bytes) -> str:
+    if PYMUPDF_AVAILABLE:
+        with fitz.open(stream=file_content, filetype="pdf") as pdf_doc:
+            parts = [page.get_text("text") for page in pdf_doc]
+    else:
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+        parts = [page.extract_text() or "" for page in pdf_reader.pages]
+    return "\n".join(parts) + "\n"
+
+
+def _extract_docx_text(file_content: bytes) -> str:
+    doc = docx.Document(io.BytesIO(file_content))
+    parts = [paragraph.text for paragraph in doc.paragraphs]
+    # Also extract text from tables
+    for table in doc.tables:
+        parts.extend(" ".join(cell.text for cell in row.cells) for row in table.rows)
+    return "\n".join(parts) + "\n"
+
+
+_TEXT_EXTRACTORS = {".pdf": _extract_pdf_text, ".docx": _extract_docx_text}
+
+
 def extract_text_from_resume(file_content: bytes, filename: str) -> str:
     """
     Extract text from resume file (PDF or DOCX)
     Returns: extracted text as string
     """
+    extractor = _TEXT_EXTRACTORS.get(os.path.splitext(filename)[1].lower())
+    if extractor is None:
+        raise HTTPException(status_code=400, detail="Unsupported file format")
     try:
-        if filename.endswith('.pdf'):
-            # Parse PDF
-            pdf_file = io.BytesIO(file_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text
-        
-        elif filename.endswith('.docx'):
-            # Parse DOCX
-            doc_file = io.BytesIO(file_content)
-            doc = docx.Document(doc_file)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            # Also extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        text += cell.text + " "
-                    text += "\n"
-            return text
-        
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file format")
-    
+        return extractor(file_content)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to read file: {str(e)}")
 
 
+# ── Resume parsing patterns (compiled once at import) ────────────────────────
+# Up to four words of letters/digits/.'- starting with a letter; a first line
+# with other punctuation (emails, "|" separators, headings with ":") is not a name
+_NAME_RE = re.compile(r"[^\W\d_][\w.'-]*(?:\s+[\w.'-]+){0,3}")
+
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+
+_TITLE_KEYWORDS = [
+    "Software Engineer", "Developer", "Data Scientist", "Product Manager",
+    "Designer", "Analyst", "Marketing", "Sales", "Manager", "Director",
+    "Frontend", "Backend", "Full Stack", "DevOps", "ML Engineer",
+    "UX Designer", "UI Designer", "Project Manager", "QA Engineer"
+]
+
+_SKILL_KEYWORDS = (
+    # Programming languages
+    "Python", "JavaScript", "Java", "C++", "C#", "Ruby", "PHP", "Swift",
+    "Kotlin", "Go", "Rust", "TypeScript",
+    # Frameworks/Libraries
+    "React", "Angular", "Vue", "Node.js", "Nodejs", "Django", "Flask", "Spring",
+    ".NET", "Laravel", "Rails",
+    # Databases
+    "SQL", "MySQL", "PostgreSQL", "MongoDB", "Redis", "Oracle", "SQLite",
+    # Cloud/DevOps
+    "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Jenkins", "Git", "CI/CD",
+    # Other tech
+    "HTML", "CSS", "REST", "GraphQL", "API", "Agile", "Scrum",
+    "Machine Learning", "AI", "Data Analysis",
+)
+
+# One alternation so the text is scanned once rather than once per category.
+# Lowercase literals: it runs against the already-lowercased text.
+_SKILLS_RE = re.compile(
+    r'\b(?:' + '|'.join(re.escape(kw.lower()) for kw in _SKILL_KEYWORDS) + r')\b'
+)
+
+
+# Aho–Corasick finds every title/skill keyword in one pass over the text; the
+# precompiled regex and substring loop are used when it is not installed.
+if AHOCORASICK_AVAILABLE:
+    _TITLE_AC = build_automaton(_TITLE_KEYWORDS)
+    _SKILL_AC = build_automaton(_SKILL_KEYWORDS)
+
+
+def _find_target_role(text_lower: str) -> Optional[str]:
+    """Return the earliest-listed title keyword that appears anywhere in the text."""
+    if AHOCORASICK_AVAILABLE:
+        hits = [index for _, (index, _) in _TITLE_AC.iter(text_lower)]
+        return _TITLE_KEYWORDS[min(hits)] if hits else None
+    for keyword in _TITLE_KEYWORDS:
+        if keyword.lower() in text_lower:
+            return keyword
+    return None
+
+
+def _find_skills(text: str, text_lower: str) -> set:
+    """Return the skill keywords in the text, spelled as they appear in it."""
+    # Some characters change length when lowercased, which would misalign offsets
+    if len(text_lower) != len(text):
+        return {match.group(0) for match in _SKILLS_RE.finditer(text_lower)}
+    if AHOCORASICK_AVAILABLE:
+        return {text[start:end] for start, end, _ in iter_whole_word_matches(_SKILL_AC, text_lower)}
+    return {text[match.start():match.end()] for match in _SKILLS_RE.finditer(text_lower)}
+
+
+_LOCATION_RE = re.compile(
+    r'\b(new york|san francisco|los angeles|chicago|boston|seattle|austin|denver|remote|usa|united states)\b'
+)
+
+
+def _find_location(text: str, text_lower: str) -> Optional[str]:
+    """Return the first known location in the text, spelled as it appears in it."""
+    match = _LOCATION_RE.search(text_lower)
+    if not match:
+        return None
+    if len(text_lower) != len(text):
+        return match.group(0)
+    return text[match.start():match.end()]
+
+
 def parse_resume_text(text: str) -> Dict[str, any]:
     """
     Parse resume text and extract relevant information
     Returns: dict with extracted fields
     """
     try:
+        text_lower = text.lower()
+
         # Initialize result
         result = {
             "full_name": None,
@@ -81,60 +212,23 @@ def parse_resume_text(text: str) -> Dict[str, any]:
         
         # Extract name (usually in first few lines, capitalized)
         lines = [line.strip() for line in text.split('\n') if line.strip()]
-        if lines:
-            # First line is often the name
-            potential_name = lines[0]
-            if len(potential_name.split()) <= 4 and potential_name[0].isupper():
-                result["full_name"] = potential_name
+        # First line is often the name
+        if lines and lines[0][0].isupper() and _NAME_RE.fullmatch(lines[0]):
+            result["full_name"] = lines[0]
         
         # Extract email (for validation)
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
+        emails = _EMAIL_RE.findall(text)
         
         # Extract job titles (common patterns)
-        title_keywords = [
-            "Software Engineer", "Developer", "Data Scientist", "Product Manager",
-            "Designer", "Analyst", "Marketing", "Sales", "Manager", "Director",
-            "Frontend", "Backend", "Full Stack", "DevOps", "ML Engineer",
-            "UX Designer", "UI Designer", "Project Manager", "QA Engineer"
-        ]
-        
-        text_lower = text.lower()
-        for keyword in title_keywords:
-            if keyword.lower() in text_lower:
-                result["target_role"] = keyword
-                break
+        result["target_role"] = _find_target_role(text_lower)
         
         # Extract skills (common tech skills)
-        skill_patterns = [
-            # Programming languages
-            r'\b(Python|JavaScript|Java|C\+\+|C#|Ruby|PHP|Swift|Kotlin|Go|Rust|TypeScript)\b',
-            # Frameworks/Libraries
-            r'\b(React|Angular|Vue|Node\.?js|Django|Flask|Spring|\.NET|Laravel|Rails)\b',
-            # Databases
-            r'\b(SQL|MySQL|PostgreSQL|MongoDB|Redis|Oracle|SQLite)\b',
-            # Cloud/DevOps
-            r'\b(AWS|Azure|GCP|Docker|Kubernetes|Jenkins|Git|CI/CD)\b',
-            # Other tech
-            r'\b(HTML|CSS|REST|GraphQL|API|Agile|Scrum|Machine Learning|AI|Data Analysis)\b',
-        ]
-        
-        skills_set = set()
-        for pattern in skill_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Normalize skill name
-                skill = match.strip()
-                if skill:
-                    skills_set.add(skill)
+        skills_set = _find_skills(text, text_lower)
         
         result["skills"] = list(skills_set)[:20]  # Limit to 20 skills
         
         # Extract location (cities/states pattern)
-        location_pattern = r'\b(New York|San Francisco|Los Angeles|Chicago|Boston|Seattle|Austin|Denver|Remote|USA|United States)\b'
-        locations = re.findall(location_pattern, text, re.IGNORECASE)
-        if locations:
-            result["location_preference"] = locations[0]
+        result["location_preference"] = _find_location(text, text_lower)
         
         return result
         
@@ -144,6 +238,7 @@ def parse_resume_text(text: str) -> Dict[str, any]:
 
 @router.post("/upload")
 async def upload_resume(
+    request: Request,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -152,13 +247,10 @@ async def upload_resume(
     Upload and parse resume (PDF or DOCX), return extracted information
     """
     # Validate file type
-    if not (file.filename.endswith('.pdf') or file.filename.endswith('.docx')):
-        raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
+    _resume_extension(file.filename)
     
     # Validate file size (max 5MB)
-    content = await file.read()
-    if len(content) > 5 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File size must be less than 5MB")
+    content = await _read_resume_upload(request, file)
     
     # Extract text from file
     text = extract_text_from_resume(content, file.filename)
@@ -166,8 +258,9 @@ async def upload_resume(
     # Parse resume text
     parsed_data = parse_resume_text(text)
     
-    # Update user profile with parsed data (if fields are empty)
-    user = db.query(User).filter(User.id == current_user.id).first()
+    # Update user profile with parsed data (if fields are empty).
+    # current_user is already attached to this request's session.
+    user = current_user
     
     updated_fields = []
     
@@ -201,10 +294,8 @@ async def upload_resume(
         user.resume_content = content
     updated_fields.append("resume")
 
-    db.commit()
-    db.refresh(user)
-
-    return {
+    # Built before commit, which would expire the instance and force a reload
+    response = {
         "message": "Resume parsed successfully",
         "parsed_data": parsed_data,
         "updated_fields": updated_fields,
@@ -216,6 +307,9 @@ async def upload_resume(
             "resume_filename": user.resume_filename,
         }
     }
+    db.commit()
+
+    return response
 
 
 @router.get("/saved")
@@ -238,7 +332,7 @@ async def get_saved_resume(
 
     # Derive the display filename from the blob path (may be "user_1/resume.pdf")
     display_name = user.resume_filename.split("/")[-1]
-    media_type = "application/pdf" if display_name.endswith(".pdf") else \
+    media_type = "application/pdf" if display_name.lower().endswith(".pdf") else \
                  "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
 
     return StreamingResponse(
@@ -529,6 +623,7 @@ def _build_rewritten_docx(sections: list) -> bytes:
 
 @router.post("/rewrite")
 async def rewrite_resume(
+    request: Request,
     file: UploadFile = File(...),
     job_description: str = Form(...),
     current_user: User = Depends(_gate_rewrite),
@@ -538,18 +633,15 @@ async def rewrite_resume(
     Returns a .docx file preserving the original resume structure.
     Only uses skills and experience present in the original resume — nothing is fabricated.
     """
-    if not (file.filename.endswith(".pdf") or file.filename.endswith(".docx")):
-        raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
+    ext = _resume_extension(file.filename)
 
-    content = await file.read()
-    if len(content) > 5 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File size must be less than 5MB")
+    content = await _read_resume_upload(request, file)
 
     if not job_description.strip():
         raise HTTPException(status_code=400, detail="Job description is required")
 
     # Extract resume text
-    if file.filename.endswith(".docx"):
+    if ext == ".docx":
         resume_text, _ = _extract_docx_structure(content)
     else:
         resume_text = extract_text_from_resume(content, file.filename)
@@ -572,6 +664,7 @@ async def rewrite_resume(
 
 @router.post("/analyze-gaps")
 async def analyze_resume_gaps(
+    request: Request,
     file: UploadFile = File(...),
     job_description: str = Form(...),
     current_user: User = Depends(_gate_gaps),
@@ -581,17 +674,14 @@ async def analyze_resume_gaps(
     Returns missing requirements and targeted questions to uncover hidden experience.
     Response: { summary: str, gaps: [{requirement: str, question: str}] }
     """
-    if not (file.filename.endswith(".pdf") or file.filename.endswith(".docx")):
-        raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
+    ext = _resume_extension(file.filename)
 
-    content = await file.read()
-    if len(content) > 5 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File size must be less than 5MB")
+    content = await _read_resume_upload(request, file)
 
     if not job_description.strip():
         raise HTTPException(status_code=400, detail="Job description is required")
 
-    if file.filename.endswith(".docx"):
+    if ext == ".docx":
         resume_text, _ = _extract_docx_structure(content)
     else:
         resume_text = extract_text_from_resume(content, file.filename)
@@ -649,6 +739,7 @@ Return at most 5 gaps. Focus on the most important gaps that would affect gettin
 
 @router.post("/rewrite-diff")
 async def rewrite_resume_diff(
+    request: Request,
     file: UploadFile = File(...),
     job_description: str = Form(...),
     extra_context: Optional[str] = Form(None),
@@ -660,18 +751,15 @@ async def rewrite_resume_diff(
     - docx_b64: base64-encoded .docx of the final approved version
     extra_context: optional candidate Q&A answers from gap analysis to enrich the rewrite.
     """
-    if not (file.filename.endswith(".pdf") or file.filename.endswith(".docx")):
-        raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
+    ext = _resume_extension(file.filename)
 
-    content = await file.read()
-    if len(content) > 5 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File size must be less than 5MB")
+    content = await _read_resume_upload(request, file)
 
     if not job_description.strip():
         raise HTTPException(status_code=400, detail="Job description is required")
 
     # Extract original text
-    if file.filename.endswith(".docx"):
+    if ext == ".docx":
         original_text, _ = _extract_docx_structure(content)
     else:
         original_text = extract_text_from_resume(content, file.filename)
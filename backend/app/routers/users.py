@@ -4,9 +4,11 @@ Handles user registration, profile management, and authentication.
 """
 import logging
 import secrets
+import time
 from fastapi import APIRouter, Depends, HTTPException, Request, status, BackgroundTasks
 from pydantic import BaseModel
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from typing import List
 import bcrypt
@@ -30,21 +32,15 @@ security = HTTPBearer()
 def hash_password(password: str) -> str:
     """Hash a plaintext password using bcrypt."""
     # Bcrypt has a 72-byte password limit
-    password_bytes = password.encode('utf-8')
-    if len(password_bytes) > 72:
-        password_bytes = password_bytes[:72]
-    
-    salt = bcrypt.gensalt()
+    password_bytes = password.encode('utf-8')[:72]
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    password_bytes = plain_password.encode('utf-8')
-    if len(password_bytes) > 72:
-        password_bytes = password_bytes[:72]
-    
+    password_bytes = plain_password.encode('utf-8')[:72]
     return bcrypt.checkpw(password_bytes, hashed_password.encode('utf-8'))
 
 
@@ -57,6 +53,13 @@ def create_access_token(data: dict) -> str:
     return encoded_jwt
 
 
+# Validated bearer token -> (user_id, email, expires_at). Lets hot callers skip
+# the JWT decode and the lookup by email; hits reload the row by primary key.
+_TOKEN_CACHE: dict = {}
+TOKEN_CACHE_TTL = 60  # seconds
+TOKEN_CACHE_MAX_SIZE = 10_000
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -72,6 +75,14 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    now = time.time()
+    cached = _TOKEN_CACHE.get(token)
+    if cached and cached[2] > now:
+        user = db.get(User, cached[0])
+        # A deleted user or changed email falls through to full validation
+        if user is not None and user.email == cached[1]:
+            return user
+    
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         email: str = payload.get("sub")
@@ -84,15 +95,21 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
 
+    if len(_TOKEN_CACHE) >= TOKEN_CACHE_MAX_SIZE:
+        _TOKEN_CACHE.clear()
+    # Never cache past the token's own expiry
+    expires_at = min(now + TOKEN_CACHE_TTL, payload.get("exp", now + TOKEN_CACHE_TTL))
+    _TOKEN_CACHE[token] = (user.id, email, expires_at)
+
     return user
 
 
 FREE_DAILY_LIMIT = 5
 
 
-def _quota_increment(db: Session, user_id: int, feature: str) -> int:
+def _quota_increment(db: Session, user_id: int, feature: str, amount: int = 1) -> int:
     """
-    Atomically increment today's usage count for (user_id, feature).
+    Atomically increment today's usage count for (user_id, feature) by amount.
     Returns the NEW count after incrementing.
     Uses an upsert pattern that works on both SQLite and PostgreSQL.
     """
@@ -110,9 +127,9 @@ def _quota_increment(db: Session, user_id: int, feature: str) -> int:
         .first()
     )
     if row:
-        row.count += 1
+        row.count += amount
     else:
-        row = UsageQuota(user_id=user_id, feature=feature, date=today, count=1)
+        row = UsageQuota(user_id=user_id, feature=feature, date=today, count=amount)
         db.add(row)
     db.commit()
     return row.count
@@ -142,6 +159,35 @@ def make_usage_gate(feature: str):
     return _check
 
 
+def quota_charge_within_limit(db: Session, user_id: int, feature: str, amount: int, limit: int) -> bool:
+    """
+    Charge amount uses of today's (user_id, feature) quota only if the new total
+    stays within limit. Returns False, leaving the count untouched, when it would not;
+    the row lock is then released whenever the caller's transaction ends.
+    """
+    from datetime import date as _date
+    from app.models import UsageQuota
+    today = _date.today().isoformat()
+    row = (
+        db.query(UsageQuota)
+        .filter(
+            UsageQuota.user_id == user_id,
+            UsageQuota.feature == feature,
+            UsageQuota.date == today,
+        )
+        .with_for_update()
+        .first()
+    )
+    if (row.count if row else 0) + amount > limit:
+        return False
+    if row:
+        row.count += amount
+    else:
+        db.add(UsageQuota(user_id=user_id, feature=feature, date=today, count=amount))
+    db.commit()
+    return True
+
+
 @router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 @limiter.limit("10/hour")
 def create_user(request: Request, user_data: UserCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
@@ -156,44 +202,47 @@ def create_user(request: Request, user_data: UserCreate, background_tasks: Backg
     - **location_preference**: Preferred work location
     - **work_mode_preference**: remote/hybrid/onsite
     """
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
     # Generate verification token
     verification_token = secrets.token_urlsafe(32)
 
-    # Create new user (unverified)
-    db_user = User(
-        email=user_data.email,
-        password_hash=hash_password(user_data.password),
-        full_name=user_data.full_name,
-        target_role=user_data.target_role,
-        skills=",".join(user_data.skills) if user_data.skills else None,
-        location_preference=user_data.location_preference,
-        work_mode_preference=user_data.work_mode_preference,
-        is_verified=False,
-        verification_token=verification_token,
+    # Create new user (unverified). ON CONFLICT folds the duplicate-email check
+    # into the INSERT, so concurrent signups get a 400 instead of an IntegrityError.
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = (
+        insert(User)
+        .values(
+            email=user_data.email,
+            password_hash=hash_password(user_data.password),
+            full_name=user_data.full_name,
+            target_role=user_data.target_role,
+            skills=user_data.skills or None,
+            location_preference=user_data.location_preference,
+            work_mode_preference=user_data.work_mode_preference,
+            is_verified=False,
+            verification_token=verification_token,
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
     )
+    db_user = db.scalars(stmt).first()
+    if db_user is None:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
 
-    db.add(db_user)
+    response = UserResponse.model_validate(db_user)
     db.commit()
-    db.refresh(db_user)
 
     # Send verification email in the background so registration returns immediately
     background_tasks.add_task(
         send_verification_email,
-        db_user.email,
-        db_user.full_name or "",
+        response.email,
+        response.full_name or "",
         verification_token,
     )
 
-    response = UserResponse.model_validate(db_user)
-    response.skills = db_user.skills_list
     return response
 
 
@@ -257,9 +306,7 @@ def get_user(
             detail="Not authorized to access this profile",
         )
 
-    response = UserResponse.model_validate(current_user)
-    response.skills = current_user.skills_list
-    return response
+    return UserResponse.model_validate(current_user)
 
 
 @router.put("/{user_id}", response_model=UserResponse)
@@ -282,17 +329,19 @@ def update_user(
     # Update fields if provided
     update_data = user_data.model_dump(exclude_unset=True)
     
-    # Handle skills specially (convert list to comma-separated string)
-    if "skills" in update_data and update_data["skills"] is not None:
-        update_data["skills"] = ",".join(update_data["skills"])
+    # An empty skills list is stored as NULL
+    if "skills" in update_data:
+        update_data["skills"] = update_data["skills"] or None
     
     for field, value in update_data.items():
         setattr(user, field, value)
 
     user.updated_at = datetime.utcnow()
 
+    # Serialize before commit: commit expires the instance, and reading it
+    # afterwards would reload the row
+    response = UserResponse.model_validate(user)
     db.commit()
-    db.refresh(user)
 
     # Invalidate the per-user top-matches cache whenever a profile field that
     # affects job matching has changed.
@@ -311,9 +360,6 @@ def update_user(
                 if cleared:
                     logger.info(f"Cleared {cleared} role-level cache entries for source '{source}' due to profile change by user {user_id}")
 
-    response = UserResponse.model_validate(user)
-    response.skills = user.skills_list
-
     return response
 
 
@@ -155,6 +155,11 @@ class CoverLetterResponse(BaseModel):
     cover_letter: str
 
 
+class CoverLetterBatchRequest(BaseModel):
+    """Jobs to generate cover letters for in one request."""
+    job_ids: List[int] = Field(..., min_length=1, max_length=10)
+
+
 # Auth Schemas
 class LoginRequest(BaseModel):
     """Login request schema."""
@@ -2,17 +2,41 @@
 AI services for JobMate AI.
 Provides match scoring and cover letter generation using OpenAI GPT.
 """
-from typing import List, Optional, Tuple, Dict, Any
-from openai import OpenAI
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from app.config import settings
+from app.services.cache import AI_RESPONSE_CACHE_TTL, get_cache, make_ai_cache_key
+from app.services.keyword_match import AHOCORASICK_AVAILABLE, build_automaton, iter_whole_word_matches
 from app.services.usage_logger import log_ai_usage
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+import numpy as np
+import orjson
 import re
 
+logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = OpenAI(api_key=settings.openai_api_key)
+
+@lru_cache(maxsize=1)
+def _openai_client() -> AsyncOpenAI:
+    """
+    Shared async OpenAI client, built on first use so code that only imports this
+    module for match scoring doesn't pay for client/TLS setup.
+
+    Its pooled HTTP client keeps idle connections for 30s (the SDK default is 5s)
+    so bursts reuse them, and reads time out after 60s rather than 10 minutes.
+    """
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        http_client=DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30.0),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        ),
+    )
 
 
 def _user_seniority_bucket(years: int) -> int:
@@ -78,6 +102,142 @@ def _experience_multiplier(user_years: Optional[int], job_title: str, job_descri
     return {0: 1.00, 1: 0.82, 2: 0.60}.get(diff, 0.38)
 
 
+# scikit-learn's default token pattern, compiled once and shared by every fit
+_TOKEN_RE = re.compile(r'(?u)\b\w\w+\b')
+
+
+# Stateless feature hasher for one-job scoring: same tokens, stop words and
+# bigrams as the TF-IDF path, but nothing to fit.
+_HASHER = HashingVectorizer(
+    n_features=1 << 18,
+    alternate_sign=False,
+    norm=None,
+    stop_words='english',
+    ngram_range=(1, 2),
+    tokenizer=_TOKEN_RE.findall,
+    token_pattern=None,
+)
+
+
+def _hashed_rows(texts: List[str]):
+    """Sublinear-TF hashed features, L2-normalised per row."""
+    mat = _HASHER.transform(texts)
+    mat.data = 1.0 + np.log(mat.data)
+    return normalize(mat)
+
+
+@lru_cache(maxsize=1024)
+def _hashed_profile_vector(profile_text: str):
+    """
+    Hashed vector of a user profile. The hasher is stateless, so the vector only
+    depends on the text and can be reused for every job the user is scored against.
+    Callers must not mutate the returned matrix.
+    """
+    return _hashed_rows([profile_text])
+
+
+def _hashed_similarity(profile_text: str, job_text: str) -> float:
+    """Cosine similarity of sublinear-TF hashed features (no IDF)."""
+    profile_vec = _hashed_profile_vector(profile_text)
+    return float(profile_vec.multiply(_hashed_rows([job_text])).sum())
+
+
+@lru_cache(maxsize=512)
+def _skill_matcher(skills: Tuple[str, ...]) -> Tuple[re.Pattern, Dict[str, re.Pattern]]:
+    """
+    Compile one whole-word alternation over a (lowercase, sorted) skill set.
+
+    The alternation sits in a lookahead so every start position is tried and
+    overlapping skills are all found. Longest skills are tried first, so the
+    only ones it can still hide are prefixes of a longer skill starting at the
+    same spot ("react" vs "react native"); those also get their own pattern.
+    """
+    longest_first = sorted(skills, key=len, reverse=True)
+    alternation = re.compile(r'(?=\b(' + '|'.join(re.escape(s) for s in longest_first) + r')\b)')
+    prefixes = {
+        s: re.compile(r'\b' + re.escape(s) + r'\b')
+        for s in skills
+        if any(other != s and other.startswith(s) for other in skills)
+    }
+    return alternation, prefixes
+
+
+@lru_cache(maxsize=512)
+def _skill_automaton(skills: Tuple[str, ...]):
+    """Aho–Corasick automaton over a (lowercase, sorted) skill set."""
+    return build_automaton(skills)
+
+
+def _skills_in_text(skills: Tuple[str, ...], text: str) -> set:
+    """Return the subset of ``skills`` that occur as whole words in lowercase ``text``."""
+    if not skills:
+        return set()
+    if AHOCORASICK_AVAILABLE:
+        # One linear pass; overlapping skills are all reported, no prefix fallback needed
+        automaton = _skill_automaton(skills)
+        return {skills[index] for _, _, index in iter_whole_word_matches(automaton, text)}
+    alternation, prefixes = _skill_matcher(skills)
+    hits = {m.group(1) for m in alternation.finditer(text)}
+    hits.update(s for s, pattern in prefixes.items() if s not in hits and pattern.search(text))
+    return hits
+
+
+def _match_texts(target_role: str, user_skills: List[str], jobs: list) -> Tuple[str, List[str]]:
+    """Profile text and lowercased job texts as both scorers compare them."""
+    user_profile_text = f"{target_role} {target_role} {' '.join(user_skills)}"
+    job_texts = [
+        f"{j.get('title', '')} {j.get('title', '')} {j.get('description', '')}".lower()
+        for j in jobs
+    ]
+    return user_profile_text, job_texts
+
+
+def _comparable(user_profile_text: str, job_texts: List[str]) -> bool:
+    """False when the profile or every job is too short to share a term (nothing to compare)."""
+    return bool(_TOKEN_RE.search(user_profile_text)) and any(
+        len(_TOKEN_RE.findall(t)) >= 2 for t in job_texts
+    )
+
+
+def _combine_scores(
+    user_skills: List[str],
+    target_role: str,
+    jobs: list,
+    job_texts: List[str],
+    similarities,
+    years_of_experience: Optional[int],
+) -> List[Tuple[float, List[str], List[str]]]:
+    """Blend skill overlap, text similarity, role bonus and experience fit per job."""
+    role_keywords = [w for w in target_role.lower().split() if len(w) > 3]
+    lowered_skills = [(s, s.lower()) for s in user_skills]
+    skill_keys = tuple(sorted({key for _, key in lowered_skills if key}))
+
+    results = []
+    for i, job in enumerate(jobs):
+        job_text = job_texts[i]
+        title = (job.get("title") or "").lower()
+        description = job.get("description") or ""
+
+        # Direct skill matching — one scan of the job text for all skills
+        hits = _skills_in_text(skill_keys, job_text)
+        matched_skills = [s for s, key in lowered_skills if key in hits]
+        missing_skills = [s for s, key in lowered_skills if key not in hits]
+        skill_match_ratio = len(matched_skills) / len(user_skills)
+
+        # Role-title bonus
+        matched_role_words = sum(1 for w in role_keywords if w in title)
+        role_bonus = (matched_role_words / len(role_keywords) * 0.10) if role_keywords else 0.0
+
+        # Experience multiplier
+        exp_mult = _experience_multiplier(years_of_experience, job.get("title", ""), description)
+
+        base = skill_match_ratio * 0.45 + float(similarities[i]) * 0.45 + role_bonus
+        score = min(round(base * exp_mult * 100, 2), 100.0)
+        results.append((score, matched_skills, missing_skills))
+
+    return results
+
+
 def calculate_match_score(
     user_skills: List[str],
     target_role: str,
@@ -90,7 +250,10 @@ def calculate_match_score(
 
     Four-component hybrid:
     1. Direct skill matching (45%) — whole-word regex, no hardcoded tech whitelist.
-    2. TF-IDF cosine similarity with bigrams (45%) — semantic overlap.
+    2. Hashed-feature cosine similarity with bigrams (45%) — semantic overlap.
+       IDF over a two-document corpus carries almost no signal, so a single job
+       is compared on stateless hashed features: its score never depends on
+       what other jobs happen to be scored alongside it.
     3. Role-title bonus (10%) — rewards jobs whose title matches target role words.
     4. Experience-level multiplier — applied to the base score.
        A junior applying to a senior role can drop to ~38% of base score;
@@ -99,12 +262,17 @@ def calculate_match_score(
     Returns:
         Tuple of (match_score 0-100, matched_skills, missing_skills)
     """
-    results = calculate_match_scores_batch(
-        user_skills, target_role,
-        [{"title": job_title, "description": job_description}],
-        years_of_experience=years_of_experience,
-    )
-    return results[0]
+    if not user_skills:
+        return (0.0, [], [])
+
+    jobs = [{"title": job_title, "description": job_description}]
+    user_profile_text, job_texts = _match_texts(target_role, user_skills, jobs)
+    similarity = 0.0
+    if _comparable(user_profile_text, job_texts):
+        similarity = _hashed_similarity(user_profile_text, job_texts[0])
+    return _combine_scores(
+        user_skills, target_role, jobs, job_texts, [similarity], years_of_experience
+    )[0]
 
 
 def calculate_match_scores_batch(
@@ -118,7 +286,10 @@ def calculate_match_scores_batch(
 
     Fits TfidfVectorizer once on the user profile + all job texts, then
     computes cosine similarities for every job in a single matrix operation.
-    Dramatically faster than calling calculate_match_score() in a loop.
+    Every batch size, including one job, uses this same method, so scores
+    within and across batches share a scale. IDF is fitted over the batch, so
+    these scores rank jobs against each other and can differ from the
+    stable single-job calculate_match_score().
 
     Returns:
         List of (match_score 0-100, matched_skills, missing_skills) — one per job.
@@ -126,55 +297,119 @@ def calculate_match_scores_batch(
     if not user_skills or not jobs:
         return [(0.0, [], []) for _ in jobs]
 
-    user_profile_text = f"{target_role} {target_role} {' '.join(user_skills)}"
-    job_texts = [
-        f"{j.get('title', '')} {j.get('title', '')} {j.get('description', '')}".lower()
-        for j in jobs
-    ]
+    user_profile_text, job_texts = _match_texts(target_role, user_skills, jobs)
+
+    # Single vectorizer fit over all texts at once, skipped when nothing can match
+    similarities = [0.0] * len(jobs)
+    if _comparable(user_profile_text, job_texts):
+        try:
+            vectorizer = TfidfVectorizer(
+                stop_words='english',
+                ngram_range=(1, 2),
+                min_df=1,
+                sublinear_tf=True,
+                analyzer='word',
+                tokenizer=_TOKEN_RE.findall,
+                token_pattern=None,
+                dtype=np.float32,
+            )
+            tfidf_matrix = vectorizer.fit_transform([user_profile_text] + job_texts)
+            user_vec = tfidf_matrix[0:1]
+            job_vecs = tfidf_matrix[1:]
+            # Rows are already L2-normalised, so one sparse product gives every cosine
+            similarities = (job_vecs @ user_vec.T).toarray().ravel()  # shape: (n_jobs,)
+        except ValueError:
+            # Every token was a stop word — empty vocabulary
+            pass
+
+    return _combine_scores(
+        user_skills, target_role, jobs, job_texts, similarities, years_of_experience
+    )
 
-    # Single vectorizer fit over all texts at once
-    try:
-        vectorizer = TfidfVectorizer(
-            stop_words='english',
-            ngram_range=(1, 2),
-            min_df=1,
-            sublinear_tf=True,
-        )
-        tfidf_matrix = vectorizer.fit_transform([user_profile_text] + job_texts)
-        user_vec = tfidf_matrix[0:1]
-        job_vecs = tfidf_matrix[1:]
-        similarities = cosine_similarity(user_vec, job_vecs)[0]  # shape: (n_jobs,)
-    except Exception:
-        similarities = [0.0] * len(jobs)
 
-    role_keywords = [w for w in target_role.lower().split() if len(w) > 3]
+COVER_LETTER_DESCRIPTION_CHARS = 1000
+COVER_LETTER_MAX_SKILLS = 15
+INTERVIEW_DESCRIPTION_CHARS = 1500
+# Upper bound on OpenAI requests a single batch keeps in flight
+COVER_LETTER_CONCURRENCY = 8
 
-    results = []
-    for i, job in enumerate(jobs):
-        job_text = job_texts[i]
-        title = (job.get("title") or "").lower()
-        description = job.get("description") or ""
 
-        # Direct skill matching
-        matched_skills = [
-            s for s in user_skills
-            if re.search(r'\b' + re.escape(s.lower()) + r'\b', job_text)
-        ]
-        missing_skills = [s for s in user_skills if s not in matched_skills]
-        skill_match_ratio = len(matched_skills) / len(user_skills)
+def _cover_letter_request(
+    user_name: str,
+    user_skills: List[str],
+    target_role: str,
+    job_title: str,
+    company: str,
+    job_description: str
+) -> Tuple[Dict[str, Any], str]:
+    """Build the chat-completion arguments for a cover letter, plus the skills line."""
+    # Bound the prompt: long scraped descriptions and skill lists only add tokens
+    description = (job_description or "")[:COVER_LETTER_DESCRIPTION_CHARS]
+    skills = user_skills[:COVER_LETTER_MAX_SKILLS] if user_skills else []
+    skills_str = ", ".join(skills) if skills else "various technical skills"
+    
+    prompt = f"""Write a professional cover letter for the following job application:
 
-        # Role-title bonus
-        matched_role_words = sum(1 for w in role_keywords if w in title)
-        role_bonus = (matched_role_words / len(role_keywords) * 0.10) if role_keywords else 0.0
+Job Title: {job_title}
+Company: {company}
+Job Description: {description}...  
 
-        # Experience multiplier
-        exp_mult = _experience_multiplier(years_of_experience, job.get("title", ""), description)
+Applicant Profile:
+- Name: {user_name}
+- Target Role: {target_role}
+- Key Skills: {skills_str}
 
-        base = skill_match_ratio * 0.45 + float(similarities[i]) * 0.45 + role_bonus
-        score = min(round(base * exp_mult * 100, 2), 100.0)
-        results.append((score, matched_skills, missing_skills))
+Requirements:
+1. Keep it concise (250-300 words)
+2. Highlight relevant skills that match the job description
+3. Show enthusiasm for the company and role
+4. Use a professional but warm tone
+5. Include a strong opening and closing
+6. Do NOT use placeholder text like [Your Name] - use the actual name provided
+7. Format as a proper business letter
 
-    return results
+Generate the cover letter:"""
+
+    request = {
+        "model": "gpt-4o-mini",  # Using the cost-effective model
+        "messages": [
+            {
+                "role": "system",
+                "content": "You are an expert career coach and professional writer specializing in cover letters. Write compelling, authentic cover letters that showcase candidates' strengths."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        "temperature": 0.7,
+        "max_tokens": 600,
+    }
+    return request, skills_str
+
+
+def _fallback_cover_letter(
+    user_name: str,
+    target_role: str,
+    job_title: str,
+    company: str,
+    skills_str: str,
+    error: Exception
+) -> str:
+    """Template letter used when the OpenAI request fails."""
+    return f"""Dear Hiring Manager,
+
+I am writing to express my strong interest in the {job_title} position at {company}. With my background in {target_role} and expertise in {skills_str}, I am confident in my ability to contribute to your team.
+
+My experience aligns well with the requirements outlined in your job posting. I am particularly excited about the opportunity to work at {company} and apply my skills to drive meaningful impact.
+
+I would welcome the opportunity to discuss how my background and skills would benefit your team. Thank you for considering my application.
+
+Best regards,
+{user_name}
+
+Note: This is a fallback cover letter. For a more tailored letter, please ensure the OpenAI API key is configured correctly.
+Error: {str(error)}"""
 
 
 async def generate_cover_letter(
@@ -199,46 +434,12 @@ async def generate_cover_letter(
     Returns:
         Generated cover letter as a string
     """
-    skills_str = ", ".join(user_skills) if user_skills else "various technical skills"
-    
-    prompt = f"""Write a professional cover letter for the following job application:
-
-Job Title: {job_title}
-Company: {company}
-Job Description: {job_description[:1000]}...  
-
-Applicant Profile:
-- Name: {user_name}
-- Target Role: {target_role}
-- Key Skills: {skills_str}
-
-Requirements:
-1. Keep it concise (250-300 words)
-2. Highlight relevant skills that match the job description
-3. Show enthusiasm for the company and role
-4. Use a professional but warm tone
-5. Include a strong opening and closing
-6. Do NOT use placeholder text like [Your Name] - use the actual name provided
-7. Format as a proper business letter
-
-Generate the cover letter:"""
+    request, skills_str = _cover_letter_request(
+        user_name, user_skills, target_role, job_title, company, job_description
+    )
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # Using the cost-effective model
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert career coach and professional writer specializing in cover letters. Write compelling, authentic cover letters that showcase candidates' strengths."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.7,
-            max_tokens=600
-        )
+        response = await _openai_client().chat.completions.create(**request)
         
         log_ai_usage(response.usage, feature="cover_letter")
         cover_letter = response.choices[0].message.content.strip()
@@ -246,19 +447,63 @@ Generate the cover letter:"""
         
     except Exception as e:
         # Fallback if OpenAI API fails
-        return f"""Dear Hiring Manager,
+        return _fallback_cover_letter(user_name, target_role, job_title, company, skills_str, e)
 
-I am writing to express my strong interest in the {job_title} position at {company}. With my background in {target_role} and expertise in {skills_str}, I am confident in my ability to contribute to your team.
 
-My experience aligns well with the requirements outlined in your job posting. I am particularly excited about the opportunity to work at {company} and apply my skills to drive meaningful impact.
+async def generate_cover_letter_stream(
+    user_name: str,
+    user_skills: List[str],
+    target_role: str,
+    job_title: str,
+    company: str,
+    job_description: str
+) -> AsyncIterator[str]:
+    """
+    Stream a tailored cover letter as OpenAI generates it.
+    
+    Takes the same arguments and prompt as generate_cover_letter but yields text
+    fragments as they arrive, so the client can show the letter from the first
+    token instead of waiting for the whole completion. If the request fails before
+    anything was sent, the fallback letter is yielded instead.
+    """
+    request, skills_str = _cover_letter_request(
+        user_name, user_skills, target_role, job_title, company, job_description
+    )
 
-I would welcome the opportunity to discuss how my background and skills would benefit your team. Thank you for considering my application.
+    started = False
+    try:
+        stream = await _openai_client().chat.completions.create(
+            **request, stream=True, stream_options={"include_usage": True}
+        )
+        async for chunk in stream:
+            # The final chunk carries usage and no choices
+            if chunk.usage:
+                log_ai_usage(chunk.usage, feature="cover_letter")
+            if chunk.choices and chunk.choices[0].delta.content:
+                started = True
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        if started:
+            raise
+        yield _fallback_cover_letter(user_name, target_role, job_title, company, skills_str, e)
 
-Best regards,
-{user_name}
 
-Note: This is a fallback cover letter. For a more tailored letter, please ensure the OpenAI API key is configured correctly.
-Error: {str(e)}"""
+async def generate_cover_letters_batch(inputs: List[Dict[str, Any]]) -> List[str]:
+    """
+    Generate several cover letters concurrently.
+    
+    Each item holds the keyword arguments of generate_cover_letter. Up to
+    COVER_LETTER_CONCURRENCY OpenAI requests are in flight at once, so the batch
+    takes roughly as long as its slowest letters rather than their sum; a failed
+    request falls back to the template for that item only.
+    """
+    semaphore = asyncio.Semaphore(COVER_LETTER_CONCURRENCY)
+
+    async def _generate(kwargs: Dict[str, Any]) -> str:
+        async with semaphore:
+            return await generate_cover_letter(**kwargs)
+
+    return list(await asyncio.gather(*(_generate(kwargs) for kwargs in inputs)))
 
 
 async def generate_cover_letter_simple(
@@ -309,7 +554,7 @@ EN: [sentence in English]
 HE: [same sentence in Hebrew]"""
 
     try:
-        response = client.chat.completions.create(
+        response = await _openai_client().chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.6,
@@ -324,6 +569,12 @@ HE: [same sentence in Hebrew]"""
         )
 
 
+def _ai_response_cache():
+    """The shared cache if Redis backs it, else None (the in-memory fallback has no size bound)."""
+    cache = get_cache()
+    return cache if cache.redis_client is not None else None
+
+
 async def generate_interview_questions(
     job_title: str,
     company: str,
@@ -349,12 +600,13 @@ async def generate_interview_questions(
         Dict with categorized questions
     """
     skills_str = ", ".join(user_skills[:10]) if user_skills else "general technical skills"
+    description = (job_description or "")[:INTERVIEW_DESCRIPTION_CHARS]
     
     prompt = f"""Generate comprehensive interview preparation questions for this job:
 
 Job Title: {job_title}
 Company: {company}
-Job Description: {job_description[:1500]}...
+Job Description: {description}...
 Candidate Skills: {skills_str}
 
 Generate the following types of questions (return as JSON):
@@ -383,8 +635,14 @@ Format as JSON with this structure:
 }}"""
 
     lang_instruction = " Respond entirely in Hebrew (עברית)." if language == "he" else ""
+    cache = _ai_response_cache()
+    cache_key = make_ai_cache_key("interview_questions", prompt + lang_instruction)
+    cached = cache.get(cache_key) if cache is not None else None
+    if cached is not None:
+        return cached
+
     try:
-        response = client.chat.completions.create(
+        response = await _openai_client().chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {
@@ -402,8 +660,10 @@ Format as JSON with this structure:
         )
 
         log_ai_usage(response.usage, feature="interview_questions")
-        import json
-        questions = json.loads(response.choices[0].message.content)
+        questions = orjson.loads(response.choices[0].message.content)
+        # Only real responses are cached; fallbacks should retry next time
+        if cache is not None:
+            cache.set(cache_key, questions, ttl=AI_RESPONSE_CACHE_TTL)
         return questions
         
     except Exception as e:
@@ -494,8 +754,14 @@ Return your response as JSON with this structure:
 }}"""
 
     lang_instruction = " Respond entirely in Hebrew (עברית) — all text fields such as insights and factors should be in Hebrew." if language == "he" else ""
+    cache = _ai_response_cache()
+    cache_key = make_ai_cache_key("salary_estimate", prompt + lang_instruction)
+    cached = cache.get(cache_key) if cache is not None else None
+    if cached is not None:
+        return cached
+
     try:
-        response = client.chat.completions.create(
+        response = await _openai_client().chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {
@@ -513,13 +779,14 @@ Return your response as JSON with this structure:
         )
         
         log_ai_usage(response.usage, feature="salary_estimate")
-        import json, logging as _log
-        salary_data = json.loads(response.choices[0].message.content)
-        _log.getLogger(__name__).info(f"salary_estimate raw: {salary_data}")
+        salary_data = orjson.loads(response.choices[0].message.content)
+        logger.info("salary_estimate raw: %s", salary_data)
         # Normalise field names in case GPT uses camelCase
         salary_data.setdefault("min_salary",    salary_data.pop("minSalary",    salary_data.pop("minimum", 0)))
         salary_data.setdefault("median_salary", salary_data.pop("medianSalary", salary_data.pop("median",  0)))
         salary_data.setdefault("max_salary",    salary_data.pop("maxSalary",    salary_data.pop("maximum", 0)))
+        if cache is not None:
+            cache.set(cache_key, salary_data, ttl=AI_RESPONSE_CACHE_TTL)
         return salary_data
         
     except Exception as e:
@@ -3,8 +3,10 @@ Caching service for JobMate AI.
 Supports Redis with automatic fallback to in-memory cache.
 Azure-compatible (works with Azure Cache for Redis).
 """
+import hashlib
 import json
 import logging
+import os
 from typing import Optional, Any
 from datetime import timedelta
 import time
@@ -187,3 +189,52 @@ def make_jobs_cache_key(source: str, category: str) -> str:
 def make_job_cache_key(source: str, job_id: str) -> str:
     """Generate cache key for individual job."""
     return f"job:{source}:{job_id}"
+
+
+# Analytics aggregates change only when the user's tracked jobs do, and
+# every such write invalidates them, so the TTL is just a safety net.
+ANALYTICS_CACHE_TTL = 120
+
+
+def make_analytics_cache_key(user_id: int, view: str) -> str:
+    """Generate cache key for one of a user's analytics views."""
+    return f"analytics:{user_id}:{view}"
+
+
+def invalidate_analytics_cache(user_id: int) -> None:
+    """Drop every cached analytics view for a user after their jobs change."""
+    get_cache().delete_pattern(f"analytics:{user_id}:")
+
+
+# Generated interview questions and salary estimates are a function of their
+# prompt alone, so identical prompts can share one OpenAI response for a day.
+AI_RESPONSE_CACHE_TTL = 86400
+
+
+def make_ai_cache_key(feature: str, prompt: str) -> str:
+    """Generate cache key for an AI response from a hash of its full prompt."""
+    digest = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+    return f"ai:{feature}:{digest}"
+
+
+# A posting rarely changes within an hour, and a repeat scrape of the same URL
+# would otherwise pay the full per-host delay and retries again.
+SCRAPED_JOB_CACHE_TTL = 3600
+
+
+def make_scraped_job_cache_key(url: str) -> str:
+    """Generate cache key for the scraped details of a job posting URL."""
+    digest = hashlib.blake2b(url.strip().encode(), digest_size=16).hexdigest()
+    return f"scrape:{digest}"
+
+
+# Fetched job-board pages are served from cache for an hour, then kept for the
+# rest of the day so a refetch can revalidate with If-None-Match.
+SCRAPED_PAGE_FRESH_SECONDS = 3600
+SCRAPED_PAGE_CACHE_TTL = 86400
+
+
+def make_scraped_page_cache_key(url: str) -> str:
+    """Generate cache key for the raw HTML of a fetched page."""
+    digest = hashlib.blake2b(url.strip().encode(), digest_size=16).hexdigest()
+    return f"scrape:html:{digest}"
@@ -0,0 +1,44 @@
+"""
+Multi-keyword whole-word matching.
+
+Uses a pyahocorasick automaton when the package is installed, so any number
+of keywords is found in one linear pass over the text. Callers keep a regex
+fallback for when it is not (check AHOCORASICK_AVAILABLE).
+"""
+from typing import Iterable, Iterator, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+def build_automaton(keywords: Iterable[str]):
+    """Build an automaton mapping each lowercased keyword to (index, length)."""
+    automaton = ahocorasick.Automaton()
+    for index, keyword in enumerate(keywords):
+        automaton.add_word(keyword.lower(), (index, len(keyword)))
+    automaton.make_automaton()
+    return automaton
+
+
+def is_word_boundary(text: str, pos: int) -> bool:
+    """Same test as regex \\b: exactly one side of ``pos`` is a word character."""
+    before = pos > 0 and (text[pos - 1].isalnum() or text[pos - 1] == "_")
+    after = pos < len(text) and (text[pos].isalnum() or text[pos] == "_")
+    return before != after
+
+
+def iter_whole_word_matches(automaton, text: str) -> Iterator[Tuple[int, int, int]]:
+    """
+    Yield (start, end, keyword_index) for every keyword occurrence in ``text``
+    that sits on word boundaries at both ends (``text[start:end]`` is the hit).
+
+    Overlapping occurrences are all reported. ``text`` must already be
+    lowercased, since the automaton holds lowercased keywords.
+    """
+    for last, (index, length) in automaton.iter(text):
+        start = last - length + 1
+        if is_word_boundary(text, start) and is_word_boundary(text, last + 1):
+            yield start, last + 1, index
@@ -2,87 +2,136 @@
 Email notification service for JobMate AI.
 Sends reminders for interviews, follow-ups, and deadlines.
 """
-from typing import List
+from typing import Any, Callable, Dict, List, Tuple
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import atexit
+import html
+import logging
+import queue
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.config import settings
 
+logger = logging.getLogger(__name__)
 
-class EmailNotificationService:
-    """Service for sending email notifications."""
+SMTP_TIMEOUT = 10  # seconds
+# Providers close long sessions (SendGrid after 5000 messages), so reconnect well before
+MAX_MESSAGES_PER_CONNECTION = 100
+
+
+class _PooledConnection:
+    """An authenticated SMTP connection and how many messages it has sent."""
+    __slots__ = ("server", "uses")
+
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.uses = 0
+
+
+def _quit(server: smtplib.SMTP):
+    """Close a connection, politely if it is still up."""
+    try:
+        server.quit()
+    except Exception:
+        server.close()
+
+
+class SMTPConnectionPool:
+    """
+    Bounded pool of authenticated SMTP connections.
     
-    def __init__(self):
-        self.smtp_server = getattr(settings, 'smtp_server', 'smtp.gmail.com')
-        self.smtp_port = getattr(settings, 'smtp_port', 587)
-        self.smtp_username = getattr(settings, 'smtp_username', None)
-        self.smtp_password = getattr(settings, 'smtp_password', None)
-        self.from_email = getattr(settings, 'from_email', 'noreply@jobmate.ai')
+    Each smtplib.SMTP is used by one sender at a time (it isn't thread-safe), and
+    reminders are sent from several background-task threads, so up to `size`
+    messages go out in parallel. Slots are filled lazily; a reused connection is
+    NOOP-checked and recycled after `max_messages_per_conn` messages.
+    """
     
-    def send_email(self, to_email: str, subject: str, body: str, html: str = None):
+    def __init__(self, connect: Callable[[], smtplib.SMTP], size: int,
+                 max_messages_per_conn: int = MAX_MESSAGES_PER_CONNECTION,
+                 acquire_timeout: float = SMTP_TIMEOUT):
+        self._connect = connect
+        self._max_messages = max_messages_per_conn
+        self._acquire_timeout = acquire_timeout
+        # LIFO keeps handing out the most recently used (still warm) connection;
+        # None marks a free slot with no connection yet.
+        self._slots = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            self._slots.put(None)
+    
+    def acquire(self) -> _PooledConnection:
         """
-        Send an email notification.
-        
-        Args:
-            to_email: Recipient email address
-            subject: Email subject
-            body: Plain text body
-            html: Optional HTML body
+        Take a healthy connection, blocking up to acquire_timeout for a free slot
+        (queue.Empty if none frees up).
         """
-        if not self.smtp_username or not self.smtp_password:
-            print(f"[Email Service] Would send email to {to_email}: {subject}")
-            print(f"[Email Service] SMTP not configured. Set SMTP_USERNAME and SMTP_PASSWORD in .env")
-            return False
-        
+        conn = self._slots.get(timeout=self._acquire_timeout)
         try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-            
-            # Add plain text part
-            text_part = MIMEText(body, 'plain')
-            msg.attach(text_part)
-            
-            # Add HTML part if provided
-            if html:
-                html_part = MIMEText(html, 'html')
-                msg.attach(html_part)
-            
-            # Connect to SMTP server and send
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
-            
-            print(f"[Email Service] Successfully sent email to {to_email}: {subject}")
-            return True
-            
-        except Exception as e:
-            print(f"[Email Service] Failed to send email: {str(e)}")
-            return False
+            if conn is not None and (conn.uses >= self._max_messages or not self._is_alive(conn)):
+                _quit(conn.server)
+                conn = None
+            if conn is None:
+                conn = _PooledConnection(self._connect())
+        except Exception:
+            self._slots.put(None)
+            raise
+        return conn
     
-    def send_interview_reminder(self, user_email: str, user_name: str, job_title: str, 
-                                company: str, interview_date: datetime):
-        """Send interview reminder email."""
-        subject = f"Interview Reminder: {job_title} at {company}"
-        
-        body = f"""Hi {user_name},
+    def release(self, conn: _PooledConnection, healthy: bool):
+        """Return a connection to the pool; unhealthy ones are closed and their slot freed."""
+        if healthy:
+            conn.uses += 1
+            self._slots.put(conn)
+        else:
+            _quit(conn.server)
+            self._slots.put(None)
+    
+    def close(self):
+        """Quit every idle connection (registered with atexit)."""
+        drained = []
+        while True:
+            try:
+                drained.append(self._slots.get_nowait())
+            except queue.Empty:
+                break
+        for conn in drained:
+            if conn is not None:
+                _quit(conn.server)
+            self._slots.put(None)
+    
+    @staticmethod
+    def _is_alive(conn: _PooledConnection) -> bool:
+        """NOOP health check: servers drop idle sessions between reminder runs."""
+        try:
+            return conn.server.noop()[0] == 250
+        except Exception:
+            return False
+
+
+# Email bodies, built once at import and filled per message. HTML values are
+# escaped, since job titles, companies and alert keywords are user-supplied.
+
+def _render_html(template: str, **values) -> str:
+    """Fill an HTML template with HTML-escaped values."""
+    return template.format(**{key: html.escape(str(value)) for key, value in values.items()})
+
+
+_INTERVIEW_REMINDER_TEXT = """Hi {user_name},
 
 This is a friendly reminder about your upcoming interview:
 
 Position: {job_title}
 Company: {company}
-Date: {interview_date.strftime('%B %d, %Y at %I:%M %p')}
+Date: {interview_date}
 
 Good luck with your interview!
 
 Best regards,
 JobMate AI Team
 """
-        
-        html = f"""
+
+_INTERVIEW_REMINDER_HTML = """
 <html>
 <body style="font-family: Arial, sans-serif; color: #333; line-height: 1.6;">
     <h2 style="color: #4F46E5;">Interview Reminder</h2>
@@ -91,7 +140,7 @@ JobMate AI Team
     <div style="background: #F3F4F6; padding: 20px; border-radius: 8px; margin: 20px 0;">
         <p style="margin: 5px 0;"><strong>Position:</strong> {job_title}</p>
         <p style="margin: 5px 0;"><strong>Company:</strong> {company}</p>
-        <p style="margin: 5px 0;"><strong>Date:</strong> {interview_date.strftime('%B %d, %Y at %I:%M %p')}</p>
+        <p style="margin: 5px 0;"><strong>Date:</strong> {interview_date}</p>
     </div>
     <p>Good luck with your interview! 🎉</p>
     <p style="color: #666; font-size: 12px; margin-top: 30px;">
@@ -101,15 +150,8 @@ JobMate AI Team
 </body>
 </html>
 """
-        
-        return self.send_email(user_email, subject, body, html)
-    
-    def send_follow_up_reminder(self, user_email: str, user_name: str, job_title: str, 
-                                company: str, days_since_applied: int):
-        """Send follow-up reminder for application."""
-        subject = f"Time to Follow Up: {job_title} at {company}"
-        
-        body = f"""Hi {user_name},
+
+_FOLLOW_UP_REMINDER_TEXT = """Hi {user_name},
 
 It's been {days_since_applied} days since you applied to {company} for the {job_title} position.
 
@@ -125,8 +167,8 @@ Good luck!
 Best regards,
 JobMate AI Team
 """
-        
-        html = f"""
+
+_FOLLOW_UP_REMINDER_HTML = """
 <html>
 <body style="font-family: Arial, sans-serif; color: #333; line-height: 1.6;">
     <h2 style="color: #4F46E5;">Follow-Up Reminder</h2>
@@ -146,34 +188,27 @@ JobMate AI Team
 </body>
 </html>
 """
-        
-        return self.send_email(user_email, subject, body, html)
-    
-    def send_deadline_reminder(self, user_email: str, user_name: str, job_title: str, 
-                              company: str, deadline_date: datetime):
-        """Send application deadline reminder."""
-        subject = f"Application Deadline Approaching: {job_title} at {company}"
-        
-        body = f"""Hi {user_name},
+
+_DEADLINE_REMINDER_TEXT = """Hi {user_name},
 
 The application deadline for {job_title} at {company} is approaching:
 
-Deadline: {deadline_date.strftime('%B %d, %Y')}
+Deadline: {deadline_date}
 
 Make sure to submit your application before the deadline!
 
 Best regards,
 JobMate AI Team
 """
-        
-        html = f"""
+
+_DEADLINE_REMINDER_HTML = """
 <html>
 <body style="font-family: Arial, sans-serif; color: #333; line-height: 1.6;">
     <h2 style="color: #DC2626;">Application Deadline Approaching</h2>
     <p>Hi {user_name},</p>
     <p>The application deadline for <strong>{job_title}</strong> at <strong>{company}</strong> is approaching:</p>
     <div style="background: #FEF2F2; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #DC2626;">
-        <p style="margin: 5px 0;"><strong>Deadline:</strong> {deadline_date.strftime('%B %d, %Y')}</p>
+        <p style="margin: 5px 0;"><strong>Deadline:</strong> {deadline_date}</p>
     </div>
     <p>Make sure to submit your application before the deadline! ⏰</p>
     <p style="color: #666; font-size: 12px; margin-top: 30px;">
@@ -183,17 +218,10 @@ JobMate AI Team
 </body>
 </html>
 """
-        
-        return self.send_email(user_email, subject, body, html)
-    
-    def send_job_alert(self, user_email: str, user_name: str, keywords: str, 
-                       matches_found: int, alert_url: str):
-        """Send job alert notification when matching jobs are found."""
-        subject = f"🎯 {matches_found} New Job{'s' if matches_found > 1 else ''} Matching Your Alert"
-        
-        body = f"""Hi {user_name},
 
-Great news! We found {matches_found} new job{'s' if matches_found > 1 else ''} matching your alert criteria:
+_JOB_ALERT_TEXT = """Hi {user_name},
+
+Great news! We found {matches_found} new job{plural} matching your alert criteria:
 
 Keywords: {keywords}
 
@@ -204,13 +232,13 @@ Don't miss out on these opportunities!
 Best regards,
 JobMate AI Team
 """
-        
-        html = f"""
+
+_JOB_ALERT_HTML = """
 <html>
 <body style="font-family: Arial, sans-serif; color: #333; line-height: 1.6;">
     <h2 style="color: #10B981;">🎯 New Job Alert!</h2>
     <p>Hi {user_name},</p>
-    <p>Great news! We found <strong>{matches_found} new job{'s' if matches_found > 1 else ''}</strong> matching your alert criteria:</p>
+    <p>Great news! We found <strong>{matches_found} new job{plural}</strong> matching your alert criteria:</p>
     <div style="background: #ECFDF5; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #10B981;">
         <p style="margin: 5px 0;"><strong>Keywords:</strong> {keywords}</p>
         <p style="margin: 5px 0;"><strong>Matches Found:</strong> {matches_found}</p>
@@ -228,8 +256,171 @@ JobMate AI Team
 </body>
 </html>
 """
+
+
+class EmailNotificationService:
+    """Service for sending email notifications."""
+    
+    def __init__(self):
+        self.smtp_server = getattr(settings, 'smtp_server', 'smtp.gmail.com')
+        self.smtp_port = getattr(settings, 'smtp_port', 587)
+        self.smtp_username = getattr(settings, 'smtp_username', None)
+        self.smtp_password = getattr(settings, 'smtp_password', None)
+        self.from_email = getattr(settings, 'from_email', 'noreply@jobmate.ai')
+        
+        self._pool_size = settings.smtp_pool_size
+        self._pool = SMTPConnectionPool(self._connect, self._pool_size)
+        atexit.register(self.close)
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open a connection and run STARTTLS + LOGIN."""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=SMTP_TIMEOUT)
+        server.starttls()
+        server.login(self.smtp_username, self.smtp_password)
+        return server
+    
+    @contextmanager
+    def _get_conn(self):
+        """
+        Yield a pooled connection for one message. A send error drops that
+        connection so its slot reconnects on next use.
+        """
+        conn = self._pool.acquire()
+        healthy = False
+        try:
+            yield conn.server
+            healthy = True
+        finally:
+            self._pool.release(conn, healthy)
+    
+    def close(self):
+        """Close the pooled SMTP connections (registered with atexit)."""
+        self._pool.close()
+    
+    def send_concurrently(self, sends: List[Tuple[Callable[..., bool], Dict[str, Any]]]) -> List[bool]:
+        """
+        Run several send_* calls in parallel, one worker per pooled connection,
+        so a batch of reminders takes about as long as its slowest few messages
+        rather than the sum of their round trips.
+        
+        Args:
+            sends: (bound send method, keyword arguments) pairs
+        
+        Returns:
+            Each call's result, in order
+        """
+        if not sends:
+            return []
+        with ThreadPoolExecutor(max_workers=min(len(sends), self._pool_size)) as executor:
+            futures = [executor.submit(send, **kwargs) for send, kwargs in sends]
+            return [future.result() for future in futures]
+    
+    def send_email(self, to_email: str, subject: str, body: str, html: str = None):
+        """
+        Send an email notification.
+        
+        Args:
+            to_email: Recipient email address
+            subject: Email subject
+            body: Plain text body
+            html: Optional HTML body
+        """
+        if not self.smtp_username or not self.smtp_password:
+            logger.info("Would send email to %s: %s", to_email, subject)
+            logger.warning("SMTP not configured. Set SMTP_USERNAME and SMTP_PASSWORD in .env")
+            return False
         
-        return self.send_email(user_email, subject, body, html)
+        try:
+            msg = MIMEMultipart('alternative')
+            msg['Subject'] = subject
+            msg['From'] = self.from_email
+            msg['To'] = to_email
+            
+            # Add plain text part
+            text_part = MIMEText(body, 'plain')
+            msg.attach(text_part)
+            
+            # Add HTML part if provided
+            if html:
+                html_part = MIMEText(html, 'html')
+                msg.attach(html_part)
+            
+            # Send over the shared connection; TLS + AUTH happen once per connection
+            with self._get_conn() as server:
+                server.send_message(msg)
+            
+            logger.info("Successfully sent email to %s: %s", to_email, subject)
+            return True
+            
+        except Exception as e:
+            logger.error("Failed to send email to %s: %s", to_email, e)
+            return False
+    
+    def send_interview_reminder(self, user_email: str, user_name: str, job_title: str, 
+                                company: str, interview_date: datetime):
+        """Send interview reminder email."""
+        subject = f"Interview Reminder: {job_title} at {company}"
+        values = dict(
+            user_name=user_name,
+            job_title=job_title,
+            company=company,
+            interview_date=interview_date.strftime('%B %d, %Y at %I:%M %p'),
+        )
+        return self.send_email(
+            user_email, subject,
+            _INTERVIEW_REMINDER_TEXT.format(**values),
+            _render_html(_INTERVIEW_REMINDER_HTML, **values),
+        )
+    
+    def send_follow_up_reminder(self, user_email: str, user_name: str, job_title: str, 
+                                company: str, days_since_applied: int):
+        """Send follow-up reminder for application."""
+        subject = f"Time to Follow Up: {job_title} at {company}"
+        values = dict(
+            user_name=user_name,
+            job_title=job_title,
+            company=company,
+            days_since_applied=days_since_applied,
+        )
+        return self.send_email(
+            user_email, subject,
+            _FOLLOW_UP_REMINDER_TEXT.format(**values),
+            _render_html(_FOLLOW_UP_REMINDER_HTML, **values),
+        )
+    
+    def send_deadline_reminder(self, user_email: str, user_name: str, job_title: str, 
+                              company: str, deadline_date: datetime):
+        """Send application deadline reminder."""
+        subject = f"Application Deadline Approaching: {job_title} at {company}"
+        values = dict(
+            user_name=user_name,
+            job_title=job_title,
+            company=company,
+            deadline_date=deadline_date.strftime('%B %d, %Y'),
+        )
+        return self.send_email(
+            user_email, subject,
+            _DEADLINE_REMINDER_TEXT.format(**values),
+            _render_html(_DEADLINE_REMINDER_HTML, **values),
+        )
+    
+    def send_job_alert(self, user_email: str, user_name: str, keywords: str, 
+                       matches_found: int, alert_url: str):
+        """Send job alert notification when matching jobs are found."""
+        plural = 's' if matches_found > 1 else ''
+        subject = f"🎯 {matches_found} New Job{plural} Matching Your Alert"
+        values = dict(
+            user_name=user_name,
+            keywords=keywords,
+            matches_found=matches_found,
+            plural=plural,
+            alert_url=alert_url,
+        )
+        return self.send_email(
+            user_email, subject,
+            _JOB_ALERT_TEXT.format(**values),
+            _render_html(_JOB_ALERT_HTML, **values),
+        )
 
 
 # Singleton instance
@@ -3,14 +3,28 @@ Web scraping service for extracting job details from various job boards.
 Supports LinkedIn, Indeed, Glassdoor, and Israeli job sites.
 Uses Crawl4AI for JavaScript-rendered content.
 """
+import base64
 import re
+import zlib
+from html import unescape
+import orjson
 import requests
 from bs4 import BeautifulSoup
-from typing import Dict, Optional, List
+from requests.adapters import HTTPAdapter
+from typing import Dict, Optional, List, Tuple
 import logging
 from urllib.parse import urlparse, parse_qs
 import time
 import asyncio
+import threading
+
+from app.services.cache import (
+    SCRAPED_PAGE_CACHE_TTL,
+    SCRAPED_PAGE_FRESH_SECONDS,
+    get_cache,
+    make_scraped_page_cache_key,
+)
+from app.services.keyword_match import AHOCORASICK_AVAILABLE, build_automaton
 
 try:
     from crawl4ai import AsyncWebCrawler, CacheMode
@@ -21,6 +35,127 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+# Patterns compiled once at import; scrapers run them (and BeautifulSoup matches
+# class_ patterns against every tag) many times per page.
+_WS_RE = re.compile(r'\s+')
+_ILS_RANGE_RE = re.compile(r'₪?\s*(\d+(?:,\d{3})*(?:\.\d+)?)\s*(?:-|to|–)\s*₪?\s*(\d+(?:,\d{3})*(?:\.\d+)?)')
+_USD_RANGE_RE = re.compile(r'\$\s*(\d+(?:,\d{3})*(?:\.\d+)?)\s*(?:-|to|–)\s*\$?\s*(\d+(?:,\d{3})*(?:\.\d+)?)')
+_SINGLE_SALARY_RE = re.compile(r'₪?\s*(\d+(?:,\d{3})*)')
+_COMMA_STRIP = str.maketrans('', '', ',')
+_SKILL_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    # Programming languages
+    r'\b(Python|JavaScript|Java|C\+\+|C#|Ruby|PHP|Swift|Kotlin|Go|Rust|TypeScript|Scala|R)\b',
+    # Frameworks/Libraries
+    r'\b(React|Angular|Vue|Node\.?js|Django|Flask|Spring|\.NET|Laravel|Rails|Express|FastAPI|Next\.js)\b',
+    # Databases
+    r'\b(SQL|MySQL|PostgreSQL|MongoDB|Redis|Oracle|SQLite|Cassandra|DynamoDB|Elasticsearch)\b',
+    # Cloud/DevOps
+    r'\b(AWS|Azure|GCP|Docker|Kubernetes|Jenkins|Git|CI/CD|Terraform|Ansible)\b',
+    # Other tech
+    r'\b(HTML|CSS|REST|GraphQL|API|Agile|Scrum|Machine Learning|AI|Data Analysis|Linux|JIRA)\b',
+))
+
+# class_/id patterns for soup.find, shared where scrapers use the same one
+_COMPANY_CLS_RE = re.compile('company')
+_LOCATION_CLS_RE = re.compile('location')
+_LI_TITLE_CLS_RE = re.compile('job.*title|top-card.*title')
+_LI_COMPANY_CLS_RE = re.compile('company.*name|topcard.*org-name')
+_LI_LOCATION_CLS_RE = re.compile('job.*location|topcard.*location')
+_LI_DESC_CLS_RE = re.compile('description|show-more-less')
+_LI_DESC_ID_RE = re.compile('job.*description')
+_INDEED_TITLE_CLS_RE = re.compile('jobsearch-JobInfoHeader-title')
+_INDEED_SALARY_CLS_RE = re.compile('salary')
+_INDEED_DESC_CLS_RE = re.compile('jobsearch-jobDescriptionText')
+_GLASSDOOR_DESC_CLS_RE = re.compile('desc|jobDescriptionContent')
+_ALLJOBS_LOCATION_CLS_RE = re.compile('location|area')
+_ALLJOBS_DESC_CLS_RE = re.compile('content|description')
+_GOTFRIENDS_DESC_CLS_RE = re.compile('job.*content|description')
+
+_DRUSHIM_SUBCAT_RE = re.compile(r'/subcat/(\d+)')
+_LOCATION_LABEL_RE = re.compile(r'^(מיקום:|אזור:)\s*')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_LI_JOB_ID_RE = re.compile(r'/jobs/view/(\d+)')
+
+
+# Skill list used by the LinkedIn-style extractor, in reporting order
+_COMMON_SKILLS = (
+    'Python', 'Java', 'JavaScript', 'TypeScript', 'React', 'Angular', 'Vue',
+    'Node.js', 'Django', 'Flask', 'FastAPI', 'Spring', 'SQL', 'PostgreSQL',
+    'MySQL', 'MongoDB', 'Redis', 'Docker', 'Kubernetes', 'AWS', 'Azure', 'GCP',
+    'Git', 'CI/CD', 'REST', 'API', 'GraphQL', 'Microservices', 'Agile', 'Scrum',
+    'C++', 'C#', '.NET', 'Ruby', 'PHP', 'Go', 'Rust', 'Swift', 'Kotlin',
+    'HTML', 'CSS', 'Tailwind', 'Bootstrap', 'Redux', 'Next.js', 'Express'
+)
+_COMMON_SKILL_INDEX = {skill.lower(): index for index, skill in enumerate(_COMMON_SKILLS)}
+# A skill counts only when not inside a longer word ("Go" in "Google", "Java" in
+# "JavaScript"). Lookarounds rather than \b, which fails after "C++" / before ".NET".
+_COMMON_SKILLS_RE = re.compile(
+    r'(?<!\w)(?:'
+    + '|'.join(re.escape(skill) for skill in sorted(_COMMON_SKILL_INDEX, key=len, reverse=True))
+    + r')(?!\w)'
+)
+if AHOCORASICK_AVAILABLE:
+    _COMMON_SKILLS_AC = build_automaton(_COMMON_SKILLS)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+def _extract_common_skills(text: str, limit: int = 10) -> List[str]:
+    """
+    Return up to `limit` of _COMMON_SKILLS that stand alone in the text, in list
+    order. One Aho–Corasick pass when available, else one regex scan.
+    """
+    text_lower = text.lower()
+    if AHOCORASICK_AVAILABLE:
+        hits = {
+            index
+            for end, (index, length) in _COMMON_SKILLS_AC.iter(text_lower)
+            if (end < length or not _is_word_char(text_lower[end - length]))
+            and (end + 1 == len(text_lower) or not _is_word_char(text_lower[end + 1]))
+        }
+    else:
+        hits = {_COMMON_SKILL_INDEX[match.group(0)] for match in _COMMON_SKILLS_RE.finditer(text_lower)}
+    return [_COMMON_SKILLS[index] for index in sorted(hits)[:limit]]
+
+
+def _iter_jsonld(value):
+    """Yield every JSON-LD object in a parsed block (lists and @graph included)."""
+    if isinstance(value, list):
+        for item in value:
+            yield from _iter_jsonld(item)
+    elif isinstance(value, dict):
+        yield value
+        yield from _iter_jsonld(value.get('@graph'))
+
+
+def _find_job_posting(soup) -> Optional[Dict]:
+    """Return the first schema.org JobPosting embedded as JSON-LD in the page."""
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = orjson.loads(script.get_text())
+        except orjson.JSONDecodeError:
+            continue
+        for item in _iter_jsonld(data):
+            types = item.get('@type')
+            if types == 'JobPosting' or (isinstance(types, list) and 'JobPosting' in types):
+                return item
+    return None
+
+
+def _first(value):
+    """JSON-LD fields may hold one value or a list of them."""
+    return value[0] if isinstance(value, list) and value else value
+
+
+def _salary_number(value) -> Optional[int]:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
 def _is_linkedin_login_wall(soup, result_url: str = "") -> bool:
     """
     Detect LinkedIn login-wall regardless of page language (EN / HE / etc).
@@ -42,27 +177,86 @@ def _is_linkedin_login_wall(soup, result_url: str = "") -> bool:
     return False
 
 
+_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+
+def _build_session() -> requests.Session:
+    """
+    Build the HTTP session shared by every sync scraper, so back-to-back scrapes
+    of the same site reuse pooled keep-alive connections instead of each scraper
+    paying its own TCP + TLS handshakes.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(_HEADERS)
+    return session
+
+
+_SESSION = _build_session()
+
+# Per-host time of the last request, so rate limiting only waits when the same
+# site was hit moments ago instead of sleeping before every fetch.
+_last_request_at: Dict[str, float] = {}
+_rate_limit_lock = threading.Lock()
+
+
+def _cache_page(cache_key: str, content: bytes, etag: Optional[str]) -> None:
+    """Store a fetched page body (zlib-compressed, base64 for the JSON cache)."""
+    get_cache().set(cache_key, {
+        "body": base64.b64encode(zlib.compress(content, 1)).decode("ascii"),
+        "etag": etag,
+        "fetched_at": time.time(),
+    }, ttl=SCRAPED_PAGE_CACHE_TTL)
+
+
+def _cached_page_content(entry: Dict) -> bytes:
+    """Inverse of _cache_page: the original page bytes."""
+    return zlib.decompress(base64.b64decode(entry["body"]))
+
+
+def _keep_scraped_page(page: Optional[Tuple[str, bytes, Optional[str]]], job_data: Optional[Dict]) -> Optional[Dict]:
+    """
+    Cache a page from fetch_page once its scrape produced a titled job, so login
+    walls and error pages served with a 200 are never cached. Returns job_data.
+    """
+    if page and job_data and job_data.get('title'):
+        _cache_page(*page)
+    return job_data
+
+
+def _wait_for_host(url: str, min_interval: float) -> None:
+    """Space requests to one host at least min_interval seconds apart."""
+    host = urlparse(url).netloc.lower()
+    with _rate_limit_lock:
+        now = time.monotonic()
+        start = max(now, _last_request_at.get(host, 0.0) + min_interval)
+        _last_request_at[host] = start
+    if start > now:
+        time.sleep(start - now)
+
+
 class JobScraper:
     """Base class for job scraping with common utilities."""
     
     def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.headers = _HEADERS
+        self.session = _SESSION
     
     def clean_text(self, text: str) -> str:
         """Clean extracted text by removing extra whitespace and special characters."""
         if not text:
             return ""
-        text = re.sub(r'\s+', ' ', text)
+        text = _WS_RE.sub(' ', text)
         text = text.strip()
         return text
     
@@ -71,27 +265,24 @@ class JobScraper:
         salary_info = {"min": None, "max": None, "currency": "ILS"}
         
         # Pattern for Israeli Shekels
-        ils_pattern = r'₪?\s*(\d+(?:,\d{3})*(?:\.\d+)?)\s*(?:-|to|–)\s*₪?\s*(\d+(?:,\d{3})*(?:\.\d+)?)'
-        match = re.search(ils_pattern, text)
+        match = _ILS_RANGE_RE.search(text)
         if match:
-            salary_info["min"] = int(match.group(1).replace(',', ''))
-            salary_info["max"] = int(match.group(2).replace(',', ''))
+            salary_info["min"] = int(match.group(1).translate(_COMMA_STRIP))
+            salary_info["max"] = int(match.group(2).translate(_COMMA_STRIP))
             return salary_info
         
-        # Pattern for USD
-        usd_pattern = r'\$\s*(\d+(?:,\d{3})*(?:\.\d+)?)\s*(?:-|to|–)\s*\$?\s*(\d+(?:,\d{3})*(?:\.\d+)?)'
-        match = re.search(usd_pattern, text)
+        # Pattern for USD (skip the regex scan when there is no dollar sign at all)
+        match = _USD_RANGE_RE.search(text) if '$' in text else None
         if match:
-            salary_info["min"] = int(match.group(1).replace(',', ''))
-            salary_info["max"] = int(match.group(2).replace(',', ''))
+            salary_info["min"] = int(match.group(1).translate(_COMMA_STRIP))
+            salary_info["max"] = int(match.group(2).translate(_COMMA_STRIP))
             salary_info["currency"] = "USD"
             return salary_info
         
         # Pattern for single salary value
-        single_pattern = r'₪?\s*(\d+(?:,\d{3})*)'
-        match = re.search(single_pattern, text)
+        match = _SINGLE_SALARY_RE.search(text)
         if match:
-            value = int(match.group(1).replace(',', ''))
+            value = int(match.group(1).translate(_COMMA_STRIP))
             salary_info["min"] = value
             salary_info["max"] = value
         
@@ -99,22 +290,9 @@ class JobScraper:
     
     def extract_skills(self, text: str) -> List[str]:
         """Extract technical skills from job description."""
-        skills_patterns = [
-            # Programming languages
-            r'\b(Python|JavaScript|Java|C\+\+|C#|Ruby|PHP|Swift|Kotlin|Go|Rust|TypeScript|Scala|R)\b',
-            # Frameworks/Libraries
-            r'\b(React|Angular|Vue|Node\.?js|Django|Flask|Spring|\.NET|Laravel|Rails|Express|FastAPI|Next\.js)\b',
-            # Databases
-            r'\b(SQL|MySQL|PostgreSQL|MongoDB|Redis|Oracle|SQLite|Cassandra|DynamoDB|Elasticsearch)\b',
-            # Cloud/DevOps
-            r'\b(AWS|Azure|GCP|Docker|Kubernetes|Jenkins|Git|CI/CD|Terraform|Ansible)\b',
-            # Other tech
-            r'\b(HTML|CSS|REST|GraphQL|API|Agile|Scrum|Machine Learning|AI|Data Analysis|Linux|JIRA)\b',
-        ]
-        
         skills_set = set()
-        for pattern in skills_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in _SKILL_RES:
+            matches = pattern.findall(text)
             for match in matches:
                 skill = match.strip()
                 if skill:
@@ -122,21 +300,111 @@ class JobScraper:
         
         return list(skills_set)[:10]  # Limit to 10 skills
     
-    def fetch_page(self, url: str, retries: int = 3, delay: float = 1.0) -> Optional[BeautifulSoup]:
-        """Fetch and parse a web page with retry logic."""
+    def extract_jsonld_job(self, soup) -> Optional[Dict]:
+        """
+        Build job_data from the page's schema.org JobPosting JSON-LD, which LinkedIn,
+        Indeed and Glassdoor embed for search engines. One JSON parse replaces the
+        DOM probing; returns None when there is no posting with a title, so the
+        caller falls back to its selectors.
+        """
+        posting = _find_job_posting(soup)
+        if not posting or not posting.get('title'):
+            return None
+        
+        organization = _first(posting.get('hiringOrganization'))
+        company = organization.get('name') if isinstance(organization, dict) else organization
+        
+        place = _first(posting.get('jobLocation'))
+        address = place.get('address') if isinstance(place, dict) else None
+        location = None
+        if isinstance(address, dict):
+            location = address.get('addressLocality') or address.get('addressRegion')
+            country = address.get('addressCountry')
+            if isinstance(country, dict):
+                country = country.get('name')
+            if country and location:
+                location = f"{location}, {country}"
+            location = location or country
+        
+        # Descriptions are HTML markup, often entity-escaped a second time
+        description = self.clean_text(
+            BeautifulSoup(unescape(posting.get('description') or ''), 'lxml').get_text(' ')
+        )
+        description_lower = description.lower()
+        
+        employment = posting.get('employmentType') or ''
+        employment = ' '.join(employment) if isinstance(employment, list) else str(employment)
+        if 'PART' in employment.upper():
+            job_type = "Part-time"
+        elif 'CONTRACT' in employment.upper() or 'TEMPORARY' in employment.upper():
+            job_type = "Contract"
+        else:
+            job_type = "Full-time"
+        
+        if posting.get('jobLocationType') == 'TELECOMMUTE' or 'remote' in description_lower:
+            work_mode = "Remote"
+        elif 'hybrid' in description_lower:
+            work_mode = "Hybrid"
+        else:
+            work_mode = "Onsite"
+        
+        salary = _first(posting.get('baseSalary'))
+        amount = salary.get('value') if isinstance(salary, dict) else None
+        if isinstance(amount, dict):
+            salary_min = _salary_number(amount.get('minValue', amount.get('value')))
+            salary_max = _salary_number(amount.get('maxValue', amount.get('value')))
+        else:
+            salary_min = salary_max = _salary_number(amount)
+        
+        return {
+            "title": self.clean_text(str(posting['title'])),
+            "company": self.clean_text(str(company)) if company else None,
+            "location": self.clean_text(str(location)) if location else None,
+            "description": description or None,
+            "job_type": job_type,
+            "work_mode": work_mode,
+            "skills": _extract_common_skills(description) if description else [],
+            "salary_min": salary_min,
+            "salary_max": salary_max
+        }
+    
+    def fetch_page(
+        self, url: str, retries: int = 3, delay: float = 1.0
+    ) -> Tuple[Optional[BeautifulSoup], Optional[Tuple[str, bytes, Optional[str]]]]:
+        """
+        Fetch and parse a web page with retry logic and a shared page cache.
+        
+        Returns (soup, page). page is the (cache_key, content, etag) to store once
+        the caller knows the page held a job (see _keep_scraped_page), or None
+        when there is nothing new to cache.
+        """
+        cache = get_cache()
+        cache_key = make_scraped_page_cache_key(url)
+        # Page bodies only go to Redis; the in-memory fallback has no size bound
+        use_cache = cache.redis_client is not None
+        cached = cache.get(cache_key) if use_cache else None
+        if cached and time.time() - cached["fetched_at"] < SCRAPED_PAGE_FRESH_SECONDS:
+            return BeautifulSoup(_cached_page_content(cached), 'lxml'), None
+        # A stale copy with an ETag lets the site answer 304 instead of resending the page
+        headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else None
+        
         for attempt in range(retries):
             try:
-                time.sleep(delay)  # Rate limiting
-                response = self.session.get(url, timeout=10)
+                _wait_for_host(url, delay)  # Rate limiting
+                response = self.session.get(url, timeout=10, headers=headers)
+                if response.status_code == 304 and cached:
+                    content = _cached_page_content(cached)
+                    return BeautifulSoup(content, 'lxml'), (cache_key, content, cached["etag"])
                 response.raise_for_status()
-                return BeautifulSoup(response.content, 'html.parser')
+                page = (cache_key, response.content, response.headers.get("ETag")) if use_cache else None
+                return BeautifulSoup(response.content, 'lxml'), page
             except requests.RequestException as e:
                 logger.warning(f"Attempt {attempt + 1} failed for {url}: {str(e)}")
                 if attempt == retries - 1:
                     logger.error(f"Failed to fetch {url} after {retries} attempts")
-                    return None
+                    return None, None
                 time.sleep(delay * (attempt + 1))  # Exponential backoff
-        return None
+        return None, None
 
 
 class LinkedInScraper(JobScraper):
@@ -145,10 +413,14 @@ class LinkedInScraper(JobScraper):
     def scrape(self, url: str) -> Optional[Dict]:
         """Extract job details from LinkedIn URL."""
         try:
-            soup = self.fetch_page(url)
+            soup, page = self.fetch_page(url)
             if not soup:
                 return None
             
+            job_data = self.extract_jsonld_job(soup)
+            if job_data:
+                return _keep_scraped_page(page, job_data)
+            
             job_data = {
                 "title": None,
                 "company": None,
@@ -162,55 +434,57 @@ class LinkedInScraper(JobScraper):
             }
             
             # Extract job title
-            title_elem = soup.find('h1', class_=re.compile('job.*title|top-card.*title'))
+            title_elem = soup.find('h1', class_=_LI_TITLE_CLS_RE)
             if not title_elem:
                 title_elem = soup.find('h1')
             if title_elem:
                 job_data["title"] = self.clean_text(title_elem.get_text())
             
             # Extract company name
-            company_elem = soup.find('a', class_=re.compile('company.*name|topcard.*org-name'))
+            company_elem = soup.find('a', class_=_LI_COMPANY_CLS_RE)
             if not company_elem:
-                company_elem = soup.find('span', class_=re.compile('company'))
+                company_elem = soup.find('span', class_=_COMPANY_CLS_RE)
             if company_elem:
                 job_data["company"] = self.clean_text(company_elem.get_text())
             
             # Extract location
-            location_elem = soup.find('span', class_=re.compile('job.*location|topcard.*location'))
+            location_elem = soup.find('span', class_=_LI_LOCATION_CLS_RE)
             if location_elem:
                 job_data["location"] = self.clean_text(location_elem.get_text())
             
             # Extract job description
-            desc_elem = soup.find('div', class_=re.compile('description|show-more-less'))
+            desc_elem = soup.find('div', class_=_LI_DESC_CLS_RE)
             if not desc_elem:
-                desc_elem = soup.find('div', id=re.compile('job.*description'))
+                desc_elem = soup.find('div', id=_LI_DESC_ID_RE)
             if desc_elem:
                 job_data["description"] = self.clean_text(desc_elem.get_text())
             
-            # Extract job type and work mode from description
-            full_text = soup.get_text().lower()
-            if 'remote' in full_text:
+            # Extract job type and work mode from description. Only the description
+            # is searched: the rest of the page (nav, similar jobs, applicant
+            # counts) would cost a full-page text pass and add false hits.
+            description = job_data["description"] or ""
+            description_lower = description.lower()
+            if 'remote' in description_lower:
                 job_data["work_mode"] = "Remote"
-            elif 'hybrid' in full_text:
+            elif 'hybrid' in description_lower:
                 job_data["work_mode"] = "Hybrid"
             
-            if 'part-time' in full_text or 'part time' in full_text:
+            if 'part-time' in description_lower or 'part time' in description_lower:
                 job_data["job_type"] = "Part-time"
-            elif 'contract' in full_text:
+            elif 'contract' in description_lower:
                 job_data["job_type"] = "Contract"
             
             # Extract skills from description
-            if job_data["description"]:
-                skills = self.extract_skills(job_data["description"])
+            if description:
+                skills = self.extract_skills(description)
                 job_data["skills"] = skills
             
             # Extract salary if available
-            salary_text = soup.get_text()
-            salary_info = self.extract_salary(salary_text)
+            salary_info = self.extract_salary(description)
             job_data["salary_min"] = salary_info["min"]
             job_data["salary_max"] = salary_info["max"]
             
-            return job_data
+            return _keep_scraped_page(page, job_data)
             
         except Exception as e:
             logger.error(f"Error scraping LinkedIn URL {url}: {str(e)}")
@@ -218,23 +492,7 @@ class LinkedInScraper(JobScraper):
     
     def extract_skills(self, text: str) -> List[str]:
         """Extract technical skills from job description."""
-        common_skills = [
-            'Python', 'Java', 'JavaScript', 'TypeScript', 'React', 'Angular', 'Vue',
-            'Node.js', 'Django', 'Flask', 'FastAPI', 'Spring', 'SQL', 'PostgreSQL',
-            'MySQL', 'MongoDB', 'Redis', 'Docker', 'Kubernetes', 'AWS', 'Azure', 'GCP',
-            'Git', 'CI/CD', 'REST', 'API', 'GraphQL', 'Microservices', 'Agile', 'Scrum',
-            'C++', 'C#', '.NET', 'Ruby', 'PHP', 'Go', 'Rust', 'Swift', 'Kotlin',
-            'HTML', 'CSS', 'Tailwind', 'Bootstrap', 'Redux', 'Next.js', 'Express'
-        ]
-        
-        found_skills = []
-        text_lower = text.lower()
-        
-        for skill in common_skills:
-            if skill.lower() in text_lower:
-                found_skills.append(skill)
-        
-        return found_skills[:10]  # Limit to top 10 skills
+        return _extract_common_skills(text)
 
 
 class IndeedScraper(JobScraper):
@@ -243,10 +501,14 @@ class IndeedScraper(JobScraper):
     def scrape(self, url: str) -> Optional[Dict]:
         """Extract job details from Indeed URL."""
         try:
-            soup = self.fetch_page(url)
+            soup, page = self.fetch_page(url)
             if not soup:
                 return None
             
+            job_data = self.extract_jsonld_job(soup)
+            if job_data:
+                return _keep_scraped_page(page, job_data)
+            
             job_data = {
                 "title": None,
                 "company": None,
@@ -260,7 +522,7 @@ class IndeedScraper(JobScraper):
             }
             
             # Extract job title
-            title_elem = soup.find('h1', class_=re.compile('jobsearch-JobInfoHeader-title'))
+            title_elem = soup.find('h1', class_=_INDEED_TITLE_CLS_RE)
             if not title_elem:
                 title_elem = soup.find('h1')
             if title_elem:
@@ -271,21 +533,21 @@ class IndeedScraper(JobScraper):
             if not company_elem:
                 company_elem = soup.find('a', {'data-tn-element': 'companyName'})
             if not company_elem:
-                company_elem = soup.find('div', class_=re.compile('company'))
+                company_elem = soup.find('div', class_=_COMPANY_CLS_RE)
             if company_elem:
                 job_data["company"] = self.clean_text(company_elem.get_text())
             
             # Extract location
             location_elem = soup.find('div', {'data-testid': 'job-location'})
             if not location_elem:
-                location_elem = soup.find('div', class_=re.compile('location'))
+                location_elem = soup.find('div', class_=_LOCATION_CLS_RE)
             if location_elem:
                 job_data["location"] = self.clean_text(location_elem.get_text())
             
             # Extract salary
             salary_elem = soup.find('div', {'data-testid': 'job-salary'})
             if not salary_elem:
-                salary_elem = soup.find('span', class_=re.compile('salary'))
+                salary_elem = soup.find('span', class_=_INDEED_SALARY_CLS_RE)
             if salary_elem:
                 salary_info = self.extract_salary(salary_elem.get_text())
                 job_data["salary_min"] = salary_info["min"]
@@ -294,7 +556,7 @@ class IndeedScraper(JobScraper):
             # Extract job description
             desc_elem = soup.find('div', {'id': 'jobDescriptionText'})
             if not desc_elem:
-                desc_elem = soup.find('div', class_=re.compile('jobsearch-jobDescriptionText'))
+                desc_elem = soup.find('div', class_=_INDEED_DESC_CLS_RE)
             if desc_elem:
                 job_data["description"] = self.clean_text(desc_elem.get_text())
             
@@ -307,19 +569,18 @@ class IndeedScraper(JobScraper):
                 elif 'contract' in job_type_text:
                     job_data["job_type"] = "Contract"
             
-            # Check for remote/hybrid
-            full_text = soup.get_text().lower()
-            if 'remote' in full_text:
+            # Check for remote/hybrid in the description rather than the whole page
+            description_lower = (job_data["description"] or "").lower()
+            if 'remote' in description_lower:
                 job_data["work_mode"] = "Remote"
-            elif 'hybrid' in full_text:
+            elif 'hybrid' in description_lower:
                 job_data["work_mode"] = "Hybrid"
             
             # Extract skills
             if job_data["description"]:
-                skills_scraper = LinkedInScraper()
-                job_data["skills"] = skills_scraper.extract_skills(job_data["description"])
+                job_data["skills"] = _extract_common_skills(job_data["description"])
             
-            return job_data
+            return _keep_scraped_page(page, job_data)
             
         except Exception as e:
             logger.error(f"Error scraping Indeed URL {url}: {str(e)}")
@@ -332,10 +593,14 @@ class GlassdoorScraper(JobScraper):
     def scrape(self, url: str) -> Optional[Dict]:
         """Extract job details from Glassdoor URL."""
         try:
-            soup = self.fetch_page(url)
+            soup, page = self.fetch_page(url)
             if not soup:
                 return None
             
+            job_data = self.extract_jsonld_job(soup)
+            if job_data:
+                return _keep_scraped_page(page, job_data)
+            
             job_data = {
                 "title": None,
                 "company": None,
@@ -373,16 +638,15 @@ class GlassdoorScraper(JobScraper):
                 job_data["salary_max"] = salary_info["max"]
             
             # Extract description
-            desc_elem = soup.find('div', class_=re.compile('desc|jobDescriptionContent'))
+            desc_elem = soup.find('div', class_=_GLASSDOOR_DESC_CLS_RE)
             if desc_elem:
                 job_data["description"] = self.clean_text(desc_elem.get_text())
             
             # Extract skills
             if job_data["description"]:
-                skills_scraper = LinkedInScraper()
-                job_data["skills"] = skills_scraper.extract_skills(job_data["description"])
+                job_data["skills"] = _extract_common_skills(job_data["description"])
             
-            return job_data
+            return _keep_scraped_page(page, job_data)
             
         except Exception as e:
             logger.error(f"Error scraping Glassdoor URL {url}: {str(e)}")
@@ -398,8 +662,7 @@ class DrushimScraper(JobScraper):
     @staticmethod
     def _cat_from_url(url: str) -> str:
         """Extract category number from a drushim subcat URL."""
-        import re as _re
-        m = _re.search(r'/subcat/(\d+)', url)
+        m = _DRUSHIM_SUBCAT_RE.search(url)
         return m.group(1) if m else "71"
 
     async def scrape_async(self, url: str) -> Optional[Dict]:
@@ -453,8 +716,8 @@ class DrushimScraper(JobScraper):
         link        = txt("link")
         raw_desc = txt("desc") or txt("description") or ""
         raw_req  = txt("requirements") or ""
-        description  = BeautifulSoup(f"<div>{raw_desc}</div>",  "html.parser").get_text(" ", strip=True)
-        requirements = BeautifulSoup(f"<div>{raw_req}</div>",   "html.parser").get_text(" ", strip=True)
+        description  = BeautifulSoup(f"<div>{raw_desc}</div>",  "lxml").get_text(" ", strip=True)
+        requirements = BeautifulSoup(f"<div>{raw_req}</div>",   "lxml").get_text(" ", strip=True)
         location    = txt("zones")       # e.g. "מרכז", "צפון"
         scopes      = txt("scopes") or ""
         experience  = txt("experience") or ""
@@ -499,7 +762,7 @@ class DrushimScraper(JobScraper):
         except Exception as e:
             logger.error(f"Error in sync scrape wrapper: {str(e)}")
             # Fallback to basic scraping
-            soup = self.fetch_page(url)
+            soup, page = self.fetch_page(url)
             if not soup:
                 return None
             
@@ -519,22 +782,22 @@ class DrushimScraper(JobScraper):
             if title_elem:
                 job_data["title"] = self.clean_text(title_elem.get_text())
             
-            company_elem = soup.find('span', class_=re.compile('company'))
+            company_elem = soup.find('span', class_=_COMPANY_CLS_RE)
             if company_elem:
                 job_data["company"] = self.clean_text(company_elem.get_text())
             
-            location_elem = soup.find('span', class_=re.compile('location|area'))
+            location_elem = soup.find('span', class_=_ALLJOBS_LOCATION_CLS_RE)
             if location_elem:
                 job_data["location"] = self.clean_text(location_elem.get_text())
             
-            desc_elem = soup.find('div', class_=re.compile('content|description'))
+            desc_elem = soup.find('div', class_=_ALLJOBS_DESC_CLS_RE)
             if desc_elem:
                 job_data["description"] = self.clean_text(desc_elem.get_text())
             
             if job_data["description"]:
                 job_data["skills"] = self.extract_skills(job_data["description"])
             
-            return job_data
+            return _keep_scraped_page(page, job_data)
 
 
 class AllJobsScraper(JobScraper):
@@ -543,7 +806,7 @@ class AllJobsScraper(JobScraper):
     def scrape(self, url: str) -> Optional[Dict]:
         """Extract job details from AllJobs URL."""
         try:
-            soup = self.fetch_page(url)
+            soup, page = self.fetch_page(url)
             if not soup:
                 return None
             
@@ -564,20 +827,19 @@ class AllJobsScraper(JobScraper):
             if title_elem:
                 job_data["title"] = self.clean_text(title_elem.get_text())
             
-            company_elem = soup.find('div', class_=re.compile('company'))
+            company_elem = soup.find('div', class_=_COMPANY_CLS_RE)
             if company_elem:
                 job_data["company"] = self.clean_text(company_elem.get_text())
             
-            desc_elem = soup.find('div', class_=re.compile('job.*content|description'))
+            desc_elem = soup.find('div', class_=_GOTFRIENDS_DESC_CLS_RE)
             if desc_elem:
                 job_data["description"] = self.clean_text(desc_elem.get_text())
             
             # Extract skills
             if job_data["description"]:
-                skills_scraper = LinkedInScraper()
-                job_data["skills"] = skills_scraper.extract_skills(job_data["description"])
+                job_data["skills"] = _extract_common_skills(job_data["description"])
             
-            return job_data
+            return _keep_scraped_page(page, job_data)
             
         except Exception as e:
             logger.error(f"Error scraping AllJobs URL {url}: {str(e)}")
@@ -604,7 +866,7 @@ class GotFriendsScraper(JobScraper):
                     logger.error(f"Crawl4AI failed for GotFriends: {url}")
                     return []
                 
-                soup = BeautifulSoup(result.html, 'html.parser')
+                soup = BeautifulSoup(result.html, 'lxml')
                 
                 # Try multiple selectors for GotFriends job cards
                 job_cards = soup.select('div.job-card')
@@ -669,7 +931,7 @@ class GotFriendsScraper(JobScraper):
         if location_elem:
             location_text = self.clean_text(location_elem.get_text())
             # Remove common Hebrew prefixes
-            location_text = re.sub(r'^(מיקום:|אזור:)\s*', '', location_text)
+            location_text = _LOCATION_LABEL_RE.sub('', location_text)
             job_data["location"] = location_text
         
         # Extract description snippet
@@ -833,7 +1095,7 @@ class LinkedInJobSearchScraper(JobScraper):
                         logger.warning(f"LinkedIn guest search returned {resp.status_code}")
                         break
 
-                soup = BeautifulSoup(resp.text, "html.parser")
+                soup = BeautifulSoup(resp.text, "lxml")
                 cards = soup.select("li")
                 logger.info(f"LinkedIn page start={offset}: {len(cards)} cards for '{role}' in '{location}'")
 
@@ -888,7 +1150,7 @@ class LinkedInJobSearchScraper(JobScraper):
                         if resp.status_code != 200:
                             return
 
-                    soup = BeautifulSoup(resp.text, "html.parser")
+                    soup = BeautifulSoup(resp.text, "lxml")
 
                     # Primary description container
                     desc_el = (
@@ -900,7 +1162,7 @@ class LinkedInJobSearchScraper(JobScraper):
                         for el in desc_el.select("button, svg, script, style"):
                             el.decompose()
                         text = desc_el.get_text(separator="\n", strip=True)
-                        text = re.sub(r'\n{3,}', '\n\n', text).strip()
+                        text = _BLANK_LINES_RE.sub('\n\n', text).strip()
                         if len(text) >= 80:
                             job["description"] = text
                             job["skills"] = self.extract_skills(text)
@@ -940,7 +1202,7 @@ class LinkedInJobSearchScraper(JobScraper):
             if not job_id:
                 link = card.select_one("a[href*='/jobs/view/']")
                 if link:
-                    m = re.search(r'/jobs/view/(\d+)', link.get("href", ""))
+                    m = _LI_JOB_ID_RE.search(link.get("href", ""))
                     if m:
                         job_id = m.group(1)
 
@@ -981,26 +1243,36 @@ class LinkedInJobSearchScraper(JobScraper):
 class ScraperFactory:
     """Factory class to get the appropriate scraper based on URL."""
     
+    # Scrapers keep no per-request state, so one instance per class is reused
+    _instances: Dict[type, JobScraper] = {}
+    
+    @classmethod
+    def _instance(cls, scraper_cls: type) -> JobScraper:
+        scraper = cls._instances.get(scraper_cls)
+        if scraper is None:
+            scraper = cls._instances[scraper_cls] = scraper_cls()
+        return scraper
+    
     @staticmethod
     def get_scraper(url: str) -> Optional[JobScraper]:
         """Return the appropriate scraper for the given URL."""
         domain = urlparse(url).netloc.lower()
         
         if 'linkedin.com' in domain:
-            return LinkedInScraper()
+            return ScraperFactory._instance(LinkedInScraper)
         elif 'indeed.com' in domain or 'indeed.co' in domain:
-            return IndeedScraper()
+            return ScraperFactory._instance(IndeedScraper)
         elif 'glassdoor.com' in domain:
-            return GlassdoorScraper()
+            return ScraperFactory._instance(GlassdoorScraper)
         elif 'drushim.co.il' in domain:
-            return DrushimScraper()
+            return ScraperFactory._instance(DrushimScraper)
         elif 'alljobs.co.il' in domain:
-            return AllJobsScraper()
+            return ScraperFactory._instance(AllJobsScraper)
         elif 'gotfriends.co.il' in domain:
-            return GotFriendsScraper()
+            return ScraperFactory._instance(GotFriendsScraper)
         else:
             logger.warning(f"No specific scraper for domain: {domain}, using base scraper")
-            return LinkedInScraper()  # Default fallback
+            return ScraperFactory._instance(LinkedInScraper)  # Default fallback
     
     @staticmethod
     def scrape_job(url: str) -> Optional[Dict]:
@@ -5,31 +5,42 @@ Run this script to add the new tables for Phase 3 features.
 Usage:
     python migrate_add_alerts_analytics.py
 """
+import logging
+
 from sqlalchemy import create_engine
 from app.database import Base
 from app.models import User, Job, JobAlert, Application
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 def main():
-    print("=" * 60)
-    print("JobMate AI - Database Migration: Add Alerts & Analytics")
-    print("=" * 60)
+    logging.basicConfig(format="%(message)s", level=logging.INFO)
+
+    logger.info("=" * 60)
+    logger.info("JobMate AI - Database Migration: Add Alerts & Analytics")
+    logger.info("=" * 60)
     
-    # Create engine
-    engine = create_engine(settings.database_url, echo=True)
+    # Create engine (no statement echo; the summary below is the log)
+    engine = create_engine(settings.database_url, echo=False)
     
-    print("\n📦 Creating new tables...")
-    print("   - job_alerts")
-    print("   - applications")
+    logger.info("\n📦 Creating new tables...")
+    logger.info("   - job_alerts")
+    logger.info("   - applications")
     
-    # Create only new tables (won't recreate existing ones)
-    Base.metadata.create_all(bind=engine)
+    # Create only the two new tables (won't recreate existing ones), in one transaction
+    with engine.begin() as conn:
+        Base.metadata.create_all(
+            bind=conn,
+            tables=[JobAlert.__table__, Application.__table__],
+            checkfirst=True,
+        )
     
-    print("\n✅ Migration completed successfully!")
-    print("\nNew tables added:")
-    print("   ✓ job_alerts - For job alert notifications")
-    print("   ✓ applications - For analytics tracking")
-    print("\n" + "=" * 60)
+    logger.info("\n✅ Migration completed successfully!")
+    logger.info("\nNew tables added:")
+    logger.info("   ✓ job_alerts - For job alert notifications")
+    logger.info("   ✓ applications - For analytics tracking")
+    logger.info("\n" + "=" * 60)
 
 if __name__ == "__main__":
     main()
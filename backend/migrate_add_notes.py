@@ -3,35 +3,38 @@ Migration script to add notes, applied_date, and interview_date to jobs table.
 Run this once to update your existing database.
 """
 from app.database import engine
-from sqlalchemy import text
+from sqlalchemy import DateTime, Text, inspect, text
+
+NEW_COLUMNS = {
+    "notes": Text(),
+    "applied_date": DateTime(),
+    "interview_date": DateTime(),
+}
 
 def migrate():
     print("🔄 Running migration: Add notes and date tracking to jobs...")
-    
-    with engine.connect() as conn:
-        try:
-            # Add notes column
-            conn.execute(text("ALTER TABLE jobs ADD COLUMN notes TEXT"))
-            print("✓ Added 'notes' column")
-        except Exception as e:
-            print(f"  'notes' column already exists or error: {e}")
-        
-        try:
-            # Add applied_date column
-            conn.execute(text("ALTER TABLE jobs ADD COLUMN applied_date DATETIME"))
-            print("✓ Added 'applied_date' column")
-        except Exception as e:
-            print(f"  'applied_date' column already exists or error: {e}")
-        
-        try:
-            # Add interview_date column
-            conn.execute(text("ALTER TABLE jobs ADD COLUMN interview_date DATETIME"))
-            print("✓ Added 'interview_date' column")
-        except Exception as e:
-            print(f"  'interview_date' column already exists or error: {e}")
-        
-        conn.commit()
-    
+
+    # Only add what's missing, so re-running the script is a no-op
+    existing = {c["name"] for c in inspect(engine).get_columns("jobs")}
+    for name in NEW_COLUMNS:
+        if name in existing:
+            print(f"  '{name}' column already exists")
+    missing = [
+        f"ADD COLUMN {name} {col_type.compile(dialect=engine.dialect)}"
+        for name, col_type in NEW_COLUMNS.items()
+        if name not in existing
+    ]
+
+    if missing:
+        with engine.begin() as conn:
+            if engine.dialect.name == "sqlite":
+                # SQLite takes one ADD COLUMN per ALTER TABLE
+                for clause in missing:
+                    conn.execute(text(f"ALTER TABLE jobs {clause}"))
+            else:
+                conn.execute(text(f"ALTER TABLE jobs {', '.join(missing)}"))
+        print(f"✓ Added {len(missing)} column(s)")
+
     print("✅ Migration complete!")
 
 if __name__ == "__main__":
@@ -9,77 +9,198 @@ Usage:
 """
 
 import argparse
+import csv
+import enum
+import io
+import json
+import os
 import sys
-from sqlalchemy import create_engine, inspect, MetaData, Table
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine, func, insert, inspect, literal, MetaData, Table, select, union_all
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 from app.models import Base, User, Job, Application
 from datetime import datetime
 
-def get_table_data(source_session, model):
-    """Fetch all records from a table"""
-    try:
-        return source_session.query(model).all()
-    except Exception as e:
-        print(f"Error fetching {model.__tablename__}: {e}")
+BATCH_ROWS = 10_000
+
+def iter_table_batches(source_session, model, id_range=None, batch_rows=BATCH_ROWS):
+    """Stream a table's rows in batch_rows-sized lists instead of loading it whole"""
+    query = select(model.__table__)
+    if id_range:
+        query = query.where(model.id.between(*id_range))
+    rows = source_session.execute(query.execution_options(yield_per=batch_rows))
+    return rows.partitions()
+
+def count_rows(source_session, model, id_range=None):
+    """Number of source rows in a table, or in one id range of it"""
+    query = select(func.count()).select_from(model.__table__)
+    if id_range:
+        query = query.where(model.id.between(*id_range))
+    return source_session.execute(query).scalar()
+
+def split_id_ranges(source_session, model, parts):
+    """Split a table's id span into up to `parts` contiguous, non-overlapping ranges"""
+    low, high = source_session.execute(select(func.min(model.id), func.max(model.id))).one()
+    if low is None:
         return []
+    step = max(1, -(-(high - low + 1) // parts))  # ceiling division
+    return [(start, min(start + step - 1, high)) for start in range(low, high + 1, step)]
 
-def migrate_table(source_session, target_session, model, dry_run=False):
-    """Migrate data from one table to another"""
+def _range_label(id_range):
+    return f" (ids {id_range[0]}-{id_range[1]})" if id_range else ""
+
+COPY_NULL = r"\N"
+
+def _copy_value(value):
+    """Render one column value as PostgreSQL COPY (csv format) text"""
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, enum.Enum):
+        return value.name  # SQLAlchemy Enum columns store member names
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)  # JSON/JSONB columns (e.g. users.skills)
+    if isinstance(value, bytes):
+        return "\\x" + value.hex()  # bytea hex input format
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+class CopyStream:
+    """File-like reader over table batches rendered as COPY csv text, one batch at a time"""
+    
+    def __init__(self, batches):
+        self._batches = iter(batches)
+        self._chunk = ""
+        self._pos = 0
+        self.rows = 0
+    
+    def _render(self, batch):
+        buf = io.StringIO()
+        writer = csv.writer(buf, delimiter="\t", quoting=csv.QUOTE_MINIMAL, lineterminator="\n")
+        writer.writerows([_copy_value(value) for value in row] for row in batch)
+        self.rows += len(batch)
+        return buf.getvalue()
+    
+    def read(self, size=-1):
+        # Short reads are fine for copy_expert; only an empty string ends the COPY
+        while self._pos >= len(self._chunk):
+            batch = next(self._batches, None)
+            if batch is None:
+                return ""
+            self._chunk, self._pos = self._render(batch), 0
+        end = len(self._chunk) if size is None or size < 0 else self._pos + size
+        data = self._chunk[self._pos:end]
+        self._pos += len(data)
+        return data
+
+def copy_table(source_session, target_session, model, id_range=None, batch_rows=BATCH_ROWS):
+    """Migrate one table with a single PostgreSQL COPY, streaming source rows in batches"""
+    table = model.__table__
     table_name = model.__tablename__
-    print(f"\n📦 Migrating table: {table_name}")
+    columns = [c.name for c in table.columns]
+    print(f"\n📦 Copying table: {table_name}{_range_label(id_range)}")
     
-    # Fetch source data
-    records = get_table_data(source_session, model)
-    print(f"   Found {len(records)} records")
+    copy_sql = (
+        f"COPY {table_name} ({', '.join(columns)}) FROM STDIN "
+        f"WITH (FORMAT csv, DELIMITER E'\\t', NULL '{COPY_NULL}')"
+    )
+    cursor = target_session.connection().connection.cursor()
+    # One COPY per table; the stream renders a batch only when psycopg2 asks for more
+    stream = CopyStream(iter_table_batches(source_session, model, id_range, batch_rows))
     
-    if len(records) == 0:
-        print(f"   ✓ No data to migrate")
-        return 0, 0
+    try:
+        cursor.copy_expert(copy_sql, stream)
+        target_session.commit()
+    except Exception as e:
+        target_session.rollback()
+        print(f"   ✗ Failed to copy: {e}")
+        # The COPY is all-or-nothing, so every row in the range failed, not only
+        # those streamed before the error
+        return 0, count_rows(source_session, model, id_range)
+    
+    print(f"   ✓ Successfully copied {stream.rows} records")
+    return stream.rows, 0
+
+def migrate_table(source_session, target_session, model, dry_run=False, id_range=None, verbose=False,
+                  batch_rows=BATCH_ROWS):
+    """Migrate data from one table to another, committing every batch of batch_rows"""
+    table_name = model.__tablename__
+    print(f"\n📦 Migrating table: {table_name}{_range_label(id_range)}")
     
     migrated = 0
     failed = 0
     
-    for record in records:
-        try:
-            # Create dictionary of record data
-            data = {c.name: getattr(record, c.name) for c in record.__table__.columns}
-            
-            if dry_run:
-                print(f"   [DRY RUN] Would insert: {data.get('id', 'N/A')}")
-                migrated += 1
-            else:
-                # Create new instance and add to target
-                new_record = model(**data)
-                target_session.add(new_record)
-                migrated += 1
-                
-        except Exception as e:
-            print(f"   ✗ Failed to migrate record {record.id}: {e}")
-            failed += 1
-    
-    # Commit after each table
-    if not dry_run:
+    for batch in iter_table_batches(source_session, model, id_range, batch_rows):
+        if dry_run:
+            # Per-row lines only on request; a big table would otherwise spend its time printing
+            if verbose:
+                for row in batch:
+                    print(f"   [DRY RUN] Would insert: {row.id}")
+            migrated += len(batch)
+            print(f"   [DRY RUN] ... {migrated} records")
+            continue
+        
+        # One executemany INSERT per batch; rows are already keyed by column name
         try:
+            target_session.execute(insert(model.__table__), [row._asdict() for row in batch])
             target_session.commit()
-            print(f"   ✓ Successfully migrated {migrated} records")
+            migrated += len(batch)
+            print(f"   ... {migrated} records migrated")
         except SQLAlchemyError as e:
             target_session.rollback()
-            print(f"   ✗ Failed to commit: {e}")
-            return 0, migrated
-    else:
+            print(f"   ✗ Failed to insert batch: {e}")
+            failed += len(batch)
+    
+    if migrated == 0 and failed == 0:
+        print(f"   ✓ No data to migrate")
+    elif dry_run:
         print(f"   ✓ [DRY RUN] Would migrate {migrated} records")
+    else:
+        print(f"   ✓ Successfully migrated {migrated} records")
+    
+    return migrated, failed
+
+def migrate_table_parallel(SourceSession, TargetSession, model, workers, use_copy, batch_rows=BATCH_ROWS):
+    """Migrate one table as id ranges on `workers` threads, each with its own sessions"""
+    def migrate_range(id_range):
+        with SourceSession() as source_session, TargetSession() as target_session:
+            if use_copy:
+                return copy_table(source_session, target_session, model, id_range, batch_rows)
+            return migrate_table(source_session, target_session, model, id_range=id_range, batch_rows=batch_rows)
+    
+    with SourceSession() as source_session:
+        ranges = split_id_ranges(source_session, model, workers)
+    if not ranges:
+        print(f"\n📦 Migrating table: {model.__tablename__}")
+        print(f"   ✓ No data to migrate")
+        return 0, 0
     
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(migrate_range, ranges))
+    migrated = sum(r[0] for r in results)
+    failed = sum(r[1] for r in results)
+    print(f"\n   ✓ {model.__tablename__}: {migrated} records migrated across {len(ranges)} ranges")
     return migrated, failed
 
+def table_counts(session, models):
+    """Row counts for all models in a single UNION ALL query"""
+    query = union_all(*(
+        select(literal(model.__tablename__), func.count()).select_from(model.__table__)
+        for model in models
+    ))
+    return dict(session.execute(query).all())
+
 def verify_migration(source_session, target_session, models):
     """Verify record counts match between source and target"""
     print("\n🔍 Verifying migration...")
     all_match = True
+    source_counts = table_counts(source_session, models)
+    target_counts = table_counts(target_session, models)
     
     for model in models:
-        source_count = source_session.query(model).count()
-        target_count = target_session.query(model).count()
+        source_count = source_counts[model.__tablename__]
+        target_count = target_counts[model.__tablename__]
         
         match = "✓" if source_count == target_count else "✗"
         print(f"   {match} {model.__tablename__}: Source={source_count}, Target={target_count}")
@@ -107,6 +228,9 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Preview changes without committing")
     parser.add_argument("--skip-backup", action="store_true", help="Skip backup step (not recommended)")
     parser.add_argument("--drop-target", action="store_true", help="Drop and recreate target tables (⚠️ DESTRUCTIVE)")
+    parser.add_argument("--verbose", action="store_true", help="List every record in dry-run output")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_ROWS, help="Rows read, written and committed per batch")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel id-range workers per table")
     
     args = parser.parse_args()
     
@@ -116,6 +240,7 @@ def main():
     print(f"Source: {args.source}")
     print(f"Target: {args.target}")
     print(f"Mode: {'DRY RUN (no changes)' if args.dry_run else 'LIVE MIGRATION'}")
+    print(f"Workers: {args.workers}")
     print("=" * 60)
     
     # Confirm if not dry run
@@ -128,8 +253,13 @@ def main():
     try:
         # Create database engines
         print("\n🔌 Connecting to databases...")
-        source_engine = create_engine(args.source, echo=False)
-        target_engine = create_engine(args.target, echo=False)
+        # Every worker holds one source and one target connection at a time
+        pool_size = max(args.workers, 1) + 2
+        source_engine = create_engine(args.source, echo=False, pool_size=pool_size, max_overflow=0)
+        target_engine = create_engine(
+            args.target, echo=False, insertmanyvalues_page_size=args.chunk_size,
+            pool_size=pool_size, max_overflow=0,
+        )
         
         # Test connections
         source_engine.connect()
@@ -152,10 +282,15 @@ def main():
             Base.metadata.drop_all(bind=target_engine)
             print("   ✓ Tables dropped")
         
-        # Create tables in target database
+        # Create missing tables in target database (one table-name lookup, no per-table checks)
         print("\n🏗️  Creating tables in target database...")
-        Base.metadata.create_all(bind=target_engine)
-        print("   ✓ Tables created")
+        existing = set(inspect(target_engine).get_table_names())
+        missing = [t for t in Base.metadata.sorted_tables if t.name not in existing]
+        if missing:
+            Base.metadata.create_all(bind=target_engine, tables=missing, checkfirst=False)
+            print(f"   ✓ Created {len(missing)} tables")
+        else:
+            print("   ✓ All tables already exist")
         
         # Define migration order (respecting foreign keys)
         models_to_migrate = [
@@ -168,8 +303,22 @@ def main():
         total_migrated = 0
         total_failed = 0
         
+        # PostgreSQL targets take a bulk COPY; dry runs and other targets use batched INSERTs
+        use_copy = target_engine.dialect.name == "postgresql" and not args.dry_run
+        
+        # Tables still go in FK order; rows within a table are split across workers
         for model in models_to_migrate:
-            migrated, failed = migrate_table(source_session, target_session, model, args.dry_run)
+            if args.workers > 1 and not args.dry_run:
+                migrated, failed = migrate_table_parallel(
+                    SourceSession, TargetSession, model, args.workers, use_copy, args.chunk_size
+                )
+            elif use_copy:
+                migrated, failed = copy_table(source_session, target_session, model, batch_rows=args.chunk_size)
+            else:
+                migrated, failed = migrate_table(
+                    source_session, target_session, model, args.dry_run,
+                    verbose=args.verbose, batch_rows=args.chunk_size,
+                )
             total_migrated += migrated
             total_failed += failed
         
@@ -14,33 +14,48 @@ TEST_URLS = {
 }
 
 
-def test_scraper(platform, url):
-    """Test a single scraper."""
+def report(platform, url, result):
+    """Print what a scraper extracted (or the error it raised)."""
     print(f"\n{'='*60}")
     print(f"Testing {platform} Scraper")
     print(f"{'='*60}")
     print(f"URL: {url}")
     
+    if isinstance(result, Exception):
+        print(f"\n❌ Error: {str(result)}")
+    elif result:
+        print("\n✅ Scraping Successful!")
+        print(f"\nExtracted Data:")
+        print(f"  Title: {result.get('title', 'N/A')}")
+        print(f"  Company: {result.get('company', 'N/A')}")
+        print(f"  Location: {result.get('location', 'N/A')}")
+        print(f"  Job Type: {result.get('job_type', 'N/A')}")
+        print(f"  Work Mode: {result.get('work_mode', 'N/A')}")
+        print(f"  Salary Min: {result.get('salary_min', 'N/A')}")
+        print(f"  Salary Max: {result.get('salary_max', 'N/A')}")
+        print(f"  Skills: {', '.join(result.get('skills', []))[:100]}")
+        print(f"  Description: {result.get('description', 'N/A')[:150]}...")
+    else:
+        print("\n❌ Scraping Failed - No data extracted")
+
+
+def test_scraper(platform, url):
+    """Test a single scraper."""
     try:
         result = ScraperFactory.scrape_job(url)
-        
-        if result:
-            print("\n✅ Scraping Successful!")
-            print(f"\nExtracted Data:")
-            print(f"  Title: {result.get('title', 'N/A')}")
-            print(f"  Company: {result.get('company', 'N/A')}")
-            print(f"  Location: {result.get('location', 'N/A')}")
-            print(f"  Job Type: {result.get('job_type', 'N/A')}")
-            print(f"  Work Mode: {result.get('work_mode', 'N/A')}")
-            print(f"  Salary Min: {result.get('salary_min', 'N/A')}")
-            print(f"  Salary Max: {result.get('salary_max', 'N/A')}")
-            print(f"  Skills: {', '.join(result.get('skills', []))[:100]}")
-            print(f"  Description: {result.get('description', 'N/A')[:150]}...")
-        else:
-            print("\n❌ Scraping Failed - No data extracted")
-            
     except Exception as e:
-        print(f"\n❌ Error: {str(e)}")
+        result = e
+    report(platform, url, result)
+
+
+async def scrape_all(urls):
+    """Scrape every platform at once; the scrapers are sync, so each runs in a worker thread."""
+    results = await asyncio.gather(
+        *(asyncio.to_thread(ScraperFactory.scrape_job, url) for url in urls.values()),
+        return_exceptions=True,
+    )
+    for (platform, url), result in zip(urls.items(), results):
+        report(platform, url, result)
 
 
 def main():
@@ -58,9 +73,8 @@ def main():
     print("  - Indeed: https://www.indeed.com/viewjob?jk=<job-key>")
     print("  - Glassdoor: https://www.glassdoor.com/job-listing/...")
     
-    # You can uncomment and add real URLs here for testing
-    # for platform, url in TEST_URLS.items():
-    #     test_scraper(platform, url)
+    # You can uncomment and add real URLs here for testing (all sites are scraped concurrently)
+    # asyncio.run(scrape_all(TEST_URLS))
     
     print("\n" + "="*60)
     print("SCRAPER CAPABILITIES:")
@@ -9,11 +9,17 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.config import settings
 from app.database import get_db
 from app.models import Base
+from app.routers.users import _TOKEN_CACHE
+from app.services.cache import get_cache
 
 TEST_DATABASE_URL = "sqlite:///:memory:"
 
+# Minimum bcrypt work factor: tests hash and verify passwords constantly
+settings.bcrypt_rounds = 4
+
 
 @pytest.fixture(scope="function")
 def client():
@@ -38,6 +44,10 @@ def client():
             db.close()
 
     app.dependency_overrides[get_db] = override_get_db
+    # User ids restart with every fresh DB, so drop analytics cached by earlier tests
+    get_cache().delete_pattern("analytics:")
+    # Tokens minted in the same second repeat across tests; don't map them to stale ids
+    _TOKEN_CACHE.clear()
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
@@ -45,6 +55,34 @@ def client():
     engine.dispose()
 
 
+class FakeRedis:
+    """The slice of the redis client CacheService uses, backed by a dict."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def delete(self, *keys):
+        return sum(self.store.pop(k, None) is not None for k in keys)
+
+    def scan_iter(self, pattern):
+        prefix = pattern.rstrip("*")
+        return [k for k in list(self.store) if k.startswith(prefix)]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Back the shared cache with an empty FakeRedis for one test."""
+    redis = FakeRedis()
+    monkeypatch.setattr(get_cache(), "redis_client", redis)
+    return redis
+
+
 # ---------------------------------------------------------------------------
 # Helpers shared across test modules
 # ---------------------------------------------------------------------------
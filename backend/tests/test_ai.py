@@ -0,0 +1,95 @@
+"""
+Tests for the match-scoring helpers in app.services.ai.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.services import ai
+from app.services.ai import calculate_match_score, calculate_match_scores_batch
+from app.services.cache import get_cache
+
+
+def test_match_score_splits_matched_and_missing_skills():
+    score, matched, missing = calculate_match_score(
+        ["Python", "React", "Kubernetes"],
+        "Backend Engineer",
+        "Backend Engineer",
+        "We use python and react every day.",
+    )
+    assert matched == ["Python", "React"]
+    assert missing == ["Kubernetes"]
+    assert 0 < score <= 100
+
+
+def test_match_score_finds_overlapping_skills():
+    _, matched, missing = calculate_match_score(
+        ["React", "React Native", "Machine Learning", "Learning"],
+        "Mobile Engineer",
+        "Mobile Engineer",
+        "React Native apps with on-device machine learning",
+    )
+    assert matched == ["React", "React Native", "Machine Learning", "Learning"]
+    assert missing == []
+
+
+def test_match_score_requires_whole_words():
+    _, matched, missing = calculate_match_score(
+        ["Go", "Java"], "Developer", "Developer", "Google JavaScript role",
+    )
+    assert matched == []
+    assert missing == ["Go", "Java"]
+
+
+def test_batch_without_skills_scores_zero():
+    jobs = [{"title": "Dev", "description": "Python"}, {"title": "QA", "description": "Tests"}]
+    assert calculate_match_scores_batch([], "Developer", jobs) == [(0.0, [], []), (0.0, [], [])]
+
+
+def test_salary_estimate_caches_responses_but_not_fallbacks(monkeypatch, fake_redis):
+    calls = []
+
+    async def failing_create(**kwargs):
+        calls.append(kwargs)
+        raise RuntimeError("OpenAI unavailable")
+
+    monkeypatch.setattr(ai._openai_client().chat.completions, "create", failing_create)
+    assert asyncio.run(ai.estimate_salary("Data Engineer", "Haifa"))["fallback"] is True
+    asyncio.run(ai.estimate_salary("Data Engineer", "Haifa"))
+    assert len(calls) == 2
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        content = json.dumps({"min_salary": 20000, "median_salary": 24000, "max_salary": 28000})
+        return SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=10),
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        )
+
+    monkeypatch.setattr(ai._openai_client().chat.completions, "create", create)
+    first = asyncio.run(ai.estimate_salary("Data Engineer", "Haifa"))
+    second = asyncio.run(ai.estimate_salary("Data Engineer", "Haifa"))
+    assert first == second and first["median_salary"] == 24000
+    assert len(calls) == 3
+    # A different prompt (here the language) is a different cache entry
+    asyncio.run(ai.estimate_salary("Data Engineer", "Haifa", language="he"))
+    assert len(calls) == 4
+
+
+def test_salary_estimate_skips_cache_without_redis(monkeypatch):
+    get_cache().delete_pattern("ai:")
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        content = json.dumps({"min_salary": 20000, "median_salary": 24000, "max_salary": 28000})
+        return SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=10),
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        )
+
+    monkeypatch.setattr(ai._openai_client().chat.completions, "create", create)
+    asyncio.run(ai.estimate_salary("Data Engineer", "Haifa"))
+    asyncio.run(ai.estimate_salary("Data Engineer", "Haifa"))
+    assert len(calls) == 2
+    assert not any(k.startswith("ai:") for k in get_cache().memory_cache)
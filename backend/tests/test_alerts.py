@@ -177,3 +177,152 @@ def test_cannot_delete_other_users_alert(client):
     alert = client.post("/api/alerts", json=_alert_payload(), headers=auth_headers(t_owner)).json()
     resp = client.delete(f"/api/alerts/{alert['id']}", headers=auth_headers(t_other))
     assert resp.status_code in (403, 404)
+
+
+# ---------------------------------------------------------------------------
+# Check
+# ---------------------------------------------------------------------------
+
+def test_check_alert_scores_matching_jobs(client):
+    from tests.conftest import make_job
+    poster = make_user(client, "poster@test.com")
+    t_poster = login(client, "poster@test.com")
+    make_job(client, poster["id"], t_poster, title="Python developer", description="Python and SQL work")
+    make_job(client, poster["id"], t_poster, title="Chef", description="Cooking")
+
+    make_user(client, "seeker@test.com", skills=["Python", "SQL"], target_role="Python developer")
+    t_seeker = login(client, "seeker@test.com")
+    alert = client.post(
+        "/api/alerts",
+        json=_alert_payload(keywords="python", min_match_score=0),
+        headers=auth_headers(t_seeker),
+    ).json()
+
+    resp = client.post(f"/api/alerts/{alert['id']}/check", headers=auth_headers(t_seeker))
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["matching_jobs_found"] == 1
+    assert data["jobs"][0]["title"] == "Python developer"
+    assert data["jobs"][0]["match_score"] is not None
+
+
+def test_check_alert_scores_match_single_job_scorer(client):
+    from app.services.ai import calculate_match_score
+    from tests.conftest import make_job
+    poster = make_user(client, "poster@test.com")
+    t_poster = login(client, "poster@test.com")
+    make_job(client, poster["id"], t_poster, title="Python developer", description="Python and SQL work")
+    make_job(client, poster["id"], t_poster, title="Python tester", description="Pytest suites for python services")
+
+    make_user(client, "seeker@test.com", skills=["Python", "SQL"], target_role="Python developer")
+    t_seeker = login(client, "seeker@test.com")
+    alert = client.post(
+        "/api/alerts",
+        json=_alert_payload(keywords="python", min_match_score=0),
+        headers=auth_headers(t_seeker),
+    ).json()
+
+    data = client.post(f"/api/alerts/{alert['id']}/check", headers=auth_headers(t_seeker)).json()
+    # Each score is the job's own, not shifted by the other candidate
+    expected, _, _ = calculate_match_score(
+        ["Python", "SQL"], "Python developer", "Python developer", "Python and SQL work"
+    )
+    by_title = {j["title"]: j["match_score"] for j in data["jobs"]}
+    assert by_title["Python developer"] == expected
+
+
+def test_check_all_counts_keyword_matches(client):
+    from tests.conftest import make_job
+    poster = make_user(client, "poster@test.com")
+    t_poster = login(client, "poster@test.com")
+    make_job(client, poster["id"], t_poster, title="Backend Engineer", description="Django REST APIs")
+    make_job(client, poster["id"], t_poster, title="Designer", description="Figma")
+
+    make_user(client, "seeker@test.com")
+    t_seeker = login(client, "seeker@test.com")
+    client.post(
+        "/api/alerts",
+        json=_alert_payload(keywords="DJANGO, 100%", frequency="immediate"),
+        headers=auth_headers(t_seeker),
+    )
+
+    resp = client.post("/api/alerts/check-all", headers=auth_headers(t_seeker))
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["checked"] == 1
+    assert data["total_matches"] == 1
+
+
+def test_update_other_users_alert_not_found(client):
+    make_user(client, "owner@test.com")
+    make_user(client, "other@test.com")
+    t_owner = login(client, "owner@test.com")
+    t_other = login(client, "other@test.com")
+
+    alert = client.post("/api/alerts", json=_alert_payload(), headers=auth_headers(t_owner)).json()
+    resp = client.put(
+        f"/api/alerts/{alert['id']}",
+        json={"keywords": "Hijacked"},
+        headers=auth_headers(t_other),
+    )
+    assert resp.status_code == 404
+    alerts = client.get("/api/alerts", headers=auth_headers(t_owner)).json()
+    assert alerts[0]["keywords"] == "Python developer"
+
+
+def test_check_all_respects_daily_frequency(client):
+    make_user(client)
+    token = login(client)
+    client.post("/api/alerts", json=_alert_payload(frequency="daily"), headers=auth_headers(token))
+
+    first = client.post("/api/alerts/check-all", headers=auth_headers(token)).json()
+    assert first["checked"] == 1
+    alert = client.get("/api/alerts", headers=auth_headers(token)).json()[0]
+    assert alert["last_checked"] is not None
+
+    # Checked moments ago — a daily alert is not due again yet
+    second = client.post("/api/alerts/check-all", headers=auth_headers(token)).json()
+    assert second["checked"] == 0
+
+
+def test_check_all_counts_each_alert_separately(client):
+    from tests.conftest import make_job
+    poster = make_user(client, "poster@test.com")
+    t_poster = login(client, "poster@test.com")
+    make_job(client, poster["id"], t_poster, title="Go developer", description="Kubernetes")
+    make_job(client, poster["id"], t_poster, title="Go SRE", description="Kubernetes on-call")
+    make_job(client, poster["id"], t_poster, title="Accountant", description="Excel")
+
+    make_user(client, "seeker@test.com")
+    t_seeker = login(client, "seeker@test.com")
+    kube = client.post(
+        "/api/alerts", json=_alert_payload(keywords="kubernetes", frequency="immediate"),
+        headers=auth_headers(t_seeker),
+    ).json()
+    excel = client.post(
+        "/api/alerts", json=_alert_payload(keywords="excel", frequency="weekly"),
+        headers=auth_headers(t_seeker),
+    ).json()
+
+    data = client.post("/api/alerts/check-all", headers=auth_headers(t_seeker)).json()
+    by_id = {a["alert_id"]: a["matches"] for a in data["alerts"]}
+    assert by_id == {kube["id"]: 2, excel["id"]: 1}
+    assert data["total_matches"] == 3
+
+
+def test_check_alert_previews_first_matches_but_counts_all(client):
+    from tests.conftest import make_job
+    poster = make_user(client, "poster@test.com")
+    t_poster = login(client, "poster@test.com")
+    for i in range(7):
+        make_job(client, poster["id"], t_poster, title=f"Rust engineer {i}", description="Systems")
+
+    make_user(client, "seeker@test.com")
+    t_seeker = login(client, "seeker@test.com")
+    alert = client.post(
+        "/api/alerts", json=_alert_payload(keywords="rust"), headers=auth_headers(t_seeker),
+    ).json()
+
+    data = client.post(f"/api/alerts/{alert['id']}/check", headers=auth_headers(t_seeker)).json()
+    assert data["matching_jobs_found"] == 7
+    assert len(data["jobs"]) == 5
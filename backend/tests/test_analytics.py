@@ -126,3 +126,70 @@ def test_analytics_response_shape(client):
     assert "match_score_distribution" in data
     assert "top_companies" in data
     assert "status_funnel" in data
+
+
+def test_analytics_time_to_interview_in_whole_days(client):
+    user = make_user(client)
+    token = login(client)
+    for applied, interview in [("2024-01-01T09:00:00", "2024-01-04T18:00:00"),   # 3 days
+                               ("2024-01-01T09:00:00", "2024-01-06T08:00:00")]:  # 4 days
+        job = make_job(client, user["id"], token, status="interview")
+        client.put(
+            f"/api/jobs/{job['id']}",
+            json={"applied_date": applied, "interview_date": interview},
+            headers=auth_headers(token),
+        )
+    # Interview before application is ignored
+    job = make_job(client, user["id"], token, status="interview")
+    client.put(
+        f"/api/jobs/{job['id']}",
+        json={"applied_date": "2024-01-05T00:00:00", "interview_date": "2024-01-04T12:00:00"},
+        headers=auth_headers(token),
+    )
+
+    stats = client.get("/api/analytics/dashboard", headers=auth_headers(token)).json()["stats"]
+    assert stats["avg_time_to_interview"] == 3.5
+    assert stats["by_status"] == {"interview": 3}
+
+
+def test_analytics_monthly_trends_group_by_month(client):
+    user = make_user(client)
+    token = login(client)
+    make_job(client, user["id"], token, status="interview")
+    make_job(client, user["id"], token, status="rejected")
+
+    data = client.get("/api/analytics/dashboard", headers=auth_headers(token)).json()
+    assert len(data["monthly_trends"]) == 1
+    trend = data["monthly_trends"][0]
+    assert (trend["applications"], trend["interviews"], trend["offers"], trend["rejections"]) == (2, 1, 0, 1)
+    assert set(data["match_score_distribution"]) == {"0-20", "21-40", "41-60", "61-80", "81-100"}
+
+
+def test_analytics_dashboard_refreshes_after_job_changes(client):
+    user = make_user(client)
+    token = login(client)
+    job = make_job(client, user["id"], token)
+
+    first = client.get("/api/analytics/dashboard", headers=auth_headers(token)).json()
+    assert first["stats"]["by_status"] == {"saved": 1}
+
+    client.put(f"/api/jobs/{job['id']}", json={"status": "offer"}, headers=auth_headers(token))
+    assert client.get("/api/analytics/dashboard", headers=auth_headers(token)).json()["stats"]["by_status"] == {"offer": 1}
+
+    client.delete(f"/api/jobs/{job['id']}", headers=auth_headers(token))
+    assert client.get("/api/analytics/dashboard", headers=auth_headers(token)).json()["stats"]["total_applications"] == 0
+
+
+def test_analytics_trends_and_insights(client):
+    user = make_user(client)
+    token = login(client)
+    make_job(client, user["id"], token, status="interview")
+    make_job(client, user["id"], token)
+
+    trends = client.get("/api/analytics/trends/monthly", headers=auth_headers(token)).json()
+    assert len(trends) == 1
+    assert (trends[0]["applications"], trends[0]["interviews"]) == (2, 1)
+
+    insights = client.get("/api/analytics/insights", headers=auth_headers(token)).json()
+    assert "You have 1 interviews but no offers yet." in insights["insights"]
+    assert "No applications submitted in the last 2 weeks." in insights["insights"]
@@ -2,6 +2,8 @@
 Tests for job CRUD (/api/users/{id}/jobs, /api/jobs/{id}),
 feed jobs (/api/jobs), and today-count endpoint.
 """
+import json
+
 import pytest
 from tests.conftest import make_user, make_job, login, auth_headers
 
@@ -195,6 +197,176 @@ def test_match_score_no_skills(client):
     assert resp.json()["match_score"] == 0
 
 
+def test_match_score_follows_job_description_changes(client):
+    user = make_user(client, skills=["Python", "Go"])
+    token = login(client)
+    job = make_job(client, user["id"], token, description="Requires Python.")
+    first = client.post(f"/api/jobs/{job['id']}/match", headers=auth_headers(token)).json()
+    assert first["matched_skills"] == ["Python"]
+
+    client.put(f"/api/jobs/{job['id']}", json={"description": "Requires Python and Go."}, headers=auth_headers(token))
+    second = client.post(f"/api/jobs/{job['id']}/match", headers=auth_headers(token)).json()
+    assert second["matched_skills"] == ["Python", "Go"]
+
+
+def test_rescore_stores_scores_for_all_jobs(client):
+    user = make_user(client, skills=["Python", "Go"])
+    token = login(client)
+    python_job = make_job(client, user["id"], token, description="Requires Python and Go.")
+    other_job = make_job(client, user["id"], token, description="Requires Excel.")
+
+    resp = client.post(f"/api/users/{user['id']}/jobs/rescore", headers=auth_headers(token))
+    assert resp.status_code == 200
+    scores = {r["job_id"]: r for r in resp.json()}
+    assert scores[python_job["id"]]["matched_skills"] == ["Python", "Go"]
+    assert scores[other_job["id"]]["matched_skills"] == []
+
+    stored = client.get(f"/api/jobs/{python_job['id']}", headers=auth_headers(token)).json()
+    assert stored["match_score"] == scores[python_job["id"]]["match_score"]
+
+
+def test_rescore_other_users_jobs_forbidden(client):
+    user = make_user(client, "a@test.com")
+    make_user(client, "b@test.com")
+    token_b = login(client, "b@test.com")
+    resp = client.post(f"/api/users/{user['id']}/jobs/rescore", headers=auth_headers(token_b))
+    assert resp.status_code == 403
+
+
+def test_batch_cover_letters_rejects_other_users_jobs(client):
+    owner = make_user(client, "a@test.com")
+    token_a = login(client, "a@test.com")
+    job = make_job(client, owner["id"], token_a)
+    other = make_user(client, "b@test.com")
+    token_b = login(client, "b@test.com")
+
+    resp = client.post(
+        f"/api/users/{other['id']}/jobs/cover-letters",
+        json={"job_ids": [job["id"]]},
+        headers=auth_headers(token_b),
+    )
+    assert resp.status_code == 404
+
+
+def test_batch_cover_letters_charges_free_quota_per_job(client, monkeypatch):
+    from app.services import ai
+
+    async def failing_create(**kwargs):
+        raise RuntimeError("OpenAI unavailable")
+
+    monkeypatch.setattr(ai._openai_client().chat.completions, "create", failing_create)
+    user = make_user(client)
+    token = login(client)
+    job_ids = [make_job(client, user["id"], token, title=f"Dev {i}")["id"] for i in range(6)]
+
+    def cover_letter_usage():
+        resp = client.get("/api/users/me/usage-today", headers=auth_headers(token))
+        return resp.json()["usage"]["cover_letter"]
+
+    # Over the limit: rejected without charging anything
+    resp = client.post(
+        f"/api/users/{user['id']}/jobs/cover-letters",
+        json={"job_ids": job_ids},
+        headers=auth_headers(token),
+    )
+    assert resp.status_code == 429
+    assert cover_letter_usage() == 0
+
+    # A batch that fits still runs and is charged per job
+    resp = client.post(
+        f"/api/users/{user['id']}/jobs/cover-letters",
+        json={"job_ids": job_ids[:3]},
+        headers=auth_headers(token),
+    )
+    assert resp.status_code == 200
+    assert [r["job_id"] for r in resp.json()] == job_ids[:3]
+    assert cover_letter_usage() == 3
+
+
+def test_stream_cover_letter_sends_events_and_stores_letter(client, monkeypatch):
+    from app.services import ai
+
+    async def failing_create(**kwargs):
+        raise RuntimeError("OpenAI unavailable")
+
+    monkeypatch.setattr(ai._openai_client().chat.completions, "create", failing_create)
+    user = make_user(client, full_name="Dana Levi")
+    token = login(client)
+    job = make_job(client, user["id"], token, title="Data Engineer", company="Acme")
+
+    resp = client.post(f"/api/jobs/{job['id']}/cover-letter/stream", headers=auth_headers(token))
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = resp.text.split("\n\n")
+    letter = json.loads(events[0].removeprefix("data: "))
+    assert "Data Engineer position at Acme" in letter
+    assert "event: done" in resp.text
+
+    stored = client.get(f"/api/jobs/{job['id']}", headers=auth_headers(token)).json()
+    assert stored["cover_letter"] == letter.strip()
+
+
+def test_stream_cover_letter_reports_error_after_partial_output(client, monkeypatch):
+    from types import SimpleNamespace
+    from app.services import ai
+
+    async def broken_stream():
+        yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content="Dear"))])
+        raise RuntimeError("connection reset")
+
+    async def create(**kwargs):
+        return broken_stream()
+
+    monkeypatch.setattr(ai._openai_client().chat.completions, "create", create)
+    user = make_user(client)
+    token = login(client)
+    job = make_job(client, user["id"], token)
+
+    resp = client.post(f"/api/jobs/{job['id']}/cover-letter/stream", headers=auth_headers(token))
+    assert resp.status_code == 200
+    assert resp.text.startswith('data: "Dear"')
+    assert "event: error" in resp.text
+    assert "event: done" not in resp.text
+
+    stored = client.get(f"/api/jobs/{job['id']}", headers=auth_headers(token)).json()
+    assert stored["cover_letter"] is None
+
+
+def _scrape_twice(client, monkeypatch, url):
+    """POST the same URL to /scrape-url twice; returns the URLs actually scraped."""
+    from app.services.scrapers import ScraperFactory
+
+    calls = []
+
+    def fake_scrape(url):
+        calls.append(url)
+        return {"title": "Backend Dev", "company": "Acme", "skills": ["Python"]}
+
+    monkeypatch.setattr(ScraperFactory, "scrape_job", staticmethod(fake_scrape))
+    user = make_user(client)
+    token = login(client)
+
+    for _ in range(2):
+        resp = client.post(
+            "/api/jobs/scrape-url",
+            params={"url": url, "user_id": user["id"]},
+            headers=auth_headers(token),
+        )
+        assert resp.status_code == 200
+        assert resp.json()["data"]["title"] == "Backend Dev"
+    return calls
+
+
+def test_scrape_url_reuses_recent_result(client, monkeypatch, fake_redis):
+    url = "https://www.linkedin.com/jobs/view/123-scrape-cache-test"
+    assert _scrape_twice(client, monkeypatch, url) == [url]
+
+
+def test_scrape_url_skips_cache_without_redis(client, monkeypatch):
+    url = "https://www.linkedin.com/jobs/view/456-scrape-cache-test"
+    assert _scrape_twice(client, monkeypatch, url) == [url, url]
+
+
 # ---------------------------------------------------------------------------
 # Cross-user ownership enforcement
 # ---------------------------------------------------------------------------
@@ -219,3 +391,23 @@ def test_delete_other_users_job_forbidden(client):
     job = make_job(client, u1["id"], t1)
     resp = client.delete(f"/api/jobs/{job['id']}", headers=auth_headers(t2))
     assert resp.status_code == 403
+
+
+def test_update_job_partial_fields(client):
+    user = make_user(client)
+    token = login(client)
+    job = make_job(client, user["id"], token, title="Old title", company="Keep Corp")
+
+    resp = client.put(
+        f"/api/jobs/{job['id']}",
+        json={"title": "New title", "status": "applied"},
+        headers=auth_headers(token),
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["title"], data["company"], data["status"]) == ("New title", "Keep Corp", "applied")
+
+    # Empty update is a no-op read
+    resp = client.put(f"/api/jobs/{job['id']}", json={}, headers=auth_headers(token))
+    assert resp.status_code == 200
+    assert resp.json()["title"] == "New title"
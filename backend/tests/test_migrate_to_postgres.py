@@ -0,0 +1,65 @@
+"""
+Tests for the COPY serialization in migrate_to_postgres.py.
+"""
+import csv
+import io
+import json
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models import Base, User, WorkModePreference
+from migrate_to_postgres import COPY_NULL, CopyStream, copy_table, iter_table_batches
+
+
+def test_copy_stream_serializes_user_row_for_postgres():
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add(User(
+            email="dana@test.com",
+            password_hash="x",
+            full_name='Dana "D"\tLevi',
+            skills=["python", "sql"],
+            work_mode_preference=WorkModePreference.REMOTE,
+            resume_content=b"\x00\x01",
+        ))
+        session.commit()
+
+        stream = CopyStream(iter_table_batches(session, User, batch_rows=1))
+        text = ""
+        while chunk := stream.read(16):
+            text += chunk
+
+    columns = [c.name for c in User.__table__.columns]
+    rows = list(csv.reader(io.StringIO(text), delimiter="\t"))
+    assert stream.rows == len(rows) == 1
+    row = dict(zip(columns, rows[0]))
+    assert json.loads(row["skills"]) == ["python", "sql"]
+    assert row["full_name"] == 'Dana "D"\tLevi'
+    assert row["work_mode_preference"] == "REMOTE"
+    assert row["resume_content"] == "\\x0001"
+    assert row["target_role"] == COPY_NULL
+
+
+def test_failed_copy_counts_every_row_in_range():
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+
+    def copy_expert(sql, stream):
+        stream.read(1)  # the first batch goes out, then the server errors
+        raise RuntimeError("duplicate key")
+
+    cursor = SimpleNamespace(copy_expert=copy_expert)
+    target = SimpleNamespace(
+        connection=lambda: SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor)),
+        rollback=lambda: None,
+    )
+    with Session(engine) as session:
+        session.add_all(User(email=f"u{i}@test.com", password_hash="x") for i in range(5))
+        session.commit()
+
+        assert copy_table(session, target, User, batch_rows=2) == (0, 5)
+        assert copy_table(session, target, User, id_range=(2, 4), batch_rows=2) == (0, 3)
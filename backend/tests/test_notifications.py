@@ -0,0 +1,145 @@
+"""
+Tests for the /api/notifications reminder sweep.
+"""
+import queue
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import notifications
+from app.services.notifications import SMTPConnectionPool
+from tests.conftest import make_user, make_job, login, auth_headers
+
+ADMIN_EMAIL = "hirematrix.ai@gmail.com"  # in the default admin_emails setting
+
+
+def _set_dates(client, token, job_id, status=None, **dates):
+    payload = {k: v.isoformat() for k, v in dates.items()}
+    if status:
+        payload["status"] = status
+    resp = client.put(f"/api/jobs/{job_id}", json=payload, headers=auth_headers(token))
+    assert resp.status_code == 200, resp.text
+
+
+def test_sweep_requires_admin(client):
+    make_user(client)
+    token = login(client)
+    resp = client.post("/api/notifications/sweep", headers=auth_headers(token))
+    assert resp.status_code == 403
+
+
+def test_sweep_picks_jobs_in_reminder_windows(client):
+    user = make_user(client)
+    token = login(client)
+    now = datetime.now()
+
+    tomorrow = make_job(client, user["id"], token, title="Tomorrow")
+    _set_dates(client, token, tomorrow["id"], interview_date=now + timedelta(hours=20))
+    next_week = make_job(client, user["id"], token, title="Next week")
+    _set_dates(client, token, next_week["id"], interview_date=now + timedelta(days=6))
+
+    due = make_job(client, user["id"], token, title="Due")
+    _set_dates(client, token, due["id"], status="applied", applied_date=now - timedelta(days=7, hours=3))
+    recent = make_job(client, user["id"], token, title="Recent")
+    _set_dates(client, token, recent["id"], status="applied", applied_date=now - timedelta(days=2))
+
+    make_user(client, ADMIN_EMAIL)
+    admin_token = login(client, ADMIN_EMAIL)
+    resp = client.post("/api/notifications/sweep", headers=auth_headers(admin_token))
+    assert resp.status_code == 200
+    assert resp.json() == {"interview_reminders": 1, "follow_up_reminders": 1}
+
+
+class _FakeSMTP:
+    """Records connections and messages instead of talking to a server."""
+    instances = []
+
+    def __init__(self, host, port, timeout=None):
+        self.logins = 0
+        self.sent = []
+        self.closed = False
+        _FakeSMTP.instances.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        self.logins += 1
+
+    def noop(self):
+        return (421, b"closed") if self.closed else (250, b"OK")
+
+    def send_message(self, msg):
+        self.sent.append(msg["To"])
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+def _configured_service(monkeypatch):
+    _FakeSMTP.instances = []
+    monkeypatch.setattr(notifications.smtplib, "SMTP", _FakeSMTP)
+    service = notifications.EmailNotificationService()
+    service.smtp_username = "user"
+    service.smtp_password = "secret"
+    return service
+
+
+def test_email_service_reuses_one_smtp_connection(monkeypatch):
+    service = _configured_service(monkeypatch)
+    for i in range(3):
+        assert service.send_email(f"u{i}@test.com", "Subject", "Body")
+    assert len(_FakeSMTP.instances) == 1
+    assert _FakeSMTP.instances[0].logins == 1
+    assert _FakeSMTP.instances[0].sent == ["u0@test.com", "u1@test.com", "u2@test.com"]
+    service.close()
+    assert _FakeSMTP.instances[0].closed
+
+
+def test_email_service_reconnects_after_server_drops_connection(monkeypatch):
+    service = _configured_service(monkeypatch)
+    assert service.send_email("a@test.com", "Subject", "Body")
+    _FakeSMTP.instances[0].closed = True  # idle timeout on the server side
+    assert service.send_email("b@test.com", "Subject", "Body")
+    assert len(_FakeSMTP.instances) == 2
+    assert _FakeSMTP.instances[1].sent == ["b@test.com"]
+
+
+def test_smtp_pool_is_bounded_and_recycles_slots():
+    _FakeSMTP.instances = []
+    pool = SMTPConnectionPool(lambda: _FakeSMTP("host", 587), size=2, acquire_timeout=0.01)
+    first, second = pool.acquire(), pool.acquire()
+    assert first.server is not second.server
+    with pytest.raises(queue.Empty):
+        pool.acquire()
+
+    pool.release(first, healthy=True)
+    assert pool.acquire().server is first.server
+    pool.release(second, healthy=False)
+    assert second.server.closed
+    assert pool.acquire().server is _FakeSMTP.instances[2]
+
+
+def test_send_concurrently_returns_results_in_order(monkeypatch):
+    service = _configured_service(monkeypatch)
+    results = service.send_concurrently([
+        (service.send_email, dict(to_email=f"u{i}@test.com", subject="Subject", body="Body"))
+        for i in range(4)
+    ])
+    assert results == [True] * 4
+    sent = sorted(to for smtp in _FakeSMTP.instances for to in smtp.sent)
+    assert sent == [f"u{i}@test.com" for i in range(4)]
+    assert len(_FakeSMTP.instances) <= 4
+
+
+def test_reminder_html_escapes_user_supplied_fields(monkeypatch):
+    service = _configured_service(monkeypatch)
+    sent = []
+    monkeypatch.setattr(service, "send_email", lambda *args: sent.append(args))
+    service.send_follow_up_reminder("a@test.com", "Dana", "<b>Dev</b>", "R&D Co", 7)
+    _, subject, body, html = sent[0]
+    assert "&lt;b&gt;Dev&lt;/b&gt;" in html and "R&amp;D Co" in html
+    assert "<b>Dev</b>" in body and "R&D Co" in body
@@ -0,0 +1,112 @@
+"""
+Tests for resume text parsing.
+"""
+import io
+
+import docx
+
+from app.routers.resume import MAX_RESUME_BYTES, extract_text_from_resume, parse_resume_text
+from tests.conftest import make_user, login, auth_headers
+
+
+SAMPLE_RESUME = """Jane Doe
+jane.doe@example.com
+Senior Backend Developer based in Seattle
+
+Skills: python, Django, PostgreSQL, docker, REST, C++, machine learning
+Previously built JavaScript and Node.js services on AWS.
+"""
+
+
+def test_parse_resume_extracts_name_role_and_location():
+    result = parse_resume_text(SAMPLE_RESUME)
+    assert result["full_name"] == "Jane Doe"
+    assert result["target_role"] == "Developer"
+    assert result["location_preference"] == "Seattle"
+
+
+def test_parse_resume_extracts_skills_in_one_pass():
+    skills = set(parse_resume_text(SAMPLE_RESUME)["skills"])
+    assert {
+        "python", "Django", "PostgreSQL", "docker", "REST",
+        "machine learning", "JavaScript", "Node.js", "AWS",
+    } <= skills
+    # Word boundaries keep prefixes of longer names from matching on their own
+    assert "Java" not in skills
+    assert "SQL" not in skills
+
+
+def test_parse_resume_name_heuristic():
+    assert parse_resume_text("JANE DOE\nEngineer")["full_name"] == "JANE DOE"
+    assert parse_resume_text("Jane Doe | Engineer\n")["full_name"] is None
+    assert parse_resume_text("Contact: jane@example.com\n")["full_name"] is None
+
+
+def test_parse_resume_without_matches():
+    result = parse_resume_text("plain text with nothing recognisable")
+    assert result == {
+        "full_name": None,
+        "target_role": None,
+        "skills": [],
+        "location_preference": None,
+    }
+
+
+def test_extract_text_from_docx_includes_tables():
+    doc = docx.Document()
+    doc.add_paragraph("Jane Doe")
+    doc.add_paragraph("Python developer")
+    table = doc.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "AWS"
+    table.cell(0, 1).text = "Docker"
+    buf = io.BytesIO()
+    doc.save(buf)
+
+    text = extract_text_from_resume(buf.getvalue(), "resume.docx")
+    assert text == "Jane Doe\nPython developer\nAWS Docker\n"
+
+
+def _docx_bytes(*paragraphs):
+    doc = docx.Document()
+    for text in paragraphs:
+        doc.add_paragraph(text)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def test_upload_resume_updates_profile(client):
+    make_user(client)
+    token = login(client)
+    content = _docx_bytes("Jane Doe", "Backend Developer", "Python, Docker and AWS")
+    resp = client.post(
+        "/api/resume/upload",
+        files={"file": ("Resume.DOCX", content)},
+        headers=auth_headers(token),
+    )
+    assert resp.status_code == 200, resp.text
+    user = resp.json()["user"]
+    assert user["full_name"] == "Jane Doe"
+    assert {"Python", "Docker", "AWS"} <= set(user["skills"])
+
+
+def test_upload_resume_rejects_oversize_file(client):
+    make_user(client)
+    token = login(client)
+    resp = client.post(
+        "/api/resume/upload",
+        files={"file": ("resume.pdf", b"0" * (MAX_RESUME_BYTES + 1))},
+        headers=auth_headers(token),
+    )
+    assert resp.status_code == 413
+
+
+def test_upload_resume_rejects_unsupported_extension(client):
+    make_user(client)
+    token = login(client)
+    resp = client.post(
+        "/api/resume/upload",
+        files={"file": ("resume.txt", b"Jane Doe")},
+        headers=auth_headers(token),
+    )
+    assert resp.status_code == 400
@@ -37,9 +37,11 @@ def test_register_full_profile(client):
 
 def test_register_duplicate_email_fails(client):
     make_user(client, "dup@test.com", "pass1234")
-    resp = client.post("/api/users", json={"email": "dup@test.com", "password": "pass1234"})
+    resp = client.post("/api/users", json={"email": "dup@test.com", "password": "other999"})
     assert resp.status_code == 400
     assert "already registered" in resp.json()["detail"].lower()
+    # The original account is untouched
+    assert login(client, "dup@test.com", "pass1234")
 
 
 def test_register_invalid_email_fails(client):
@@ -199,6 +201,21 @@ def test_update_skills_as_list(client):
     assert resp.json()["skills"] == ["Go", "Rust"]
 
 
+def test_update_skills_keeps_commas_and_clears(client):
+    user = make_user(client, "skills@test.com", "pass1234")
+    token = login(client, "skills@test.com")
+    resp = client.put(
+        f"/api/users/{user['id']}",
+        json={"skills": ["Testing (unit, e2e)", "SQL"]},
+        headers=auth_headers(token),
+    )
+    assert resp.json()["skills"] == ["Testing (unit, e2e)", "SQL"]
+
+    resp = client.put(f"/api/users/{user['id']}", json={"skills": []}, headers=auth_headers(token))
+    assert resp.status_code == 200
+    assert resp.json()["skills"] == []
+
+
 def test_update_work_mode(client):
     user = make_user(client, "wm@test.com", "pass1234")
     token = login(client, "wm@test.com")
@@ -1,29 +1,76 @@
-"""Update user password in the database."""
+"""Update user password in the database.
+
+Usage:
+    python update_password.py --email user@example.com
+    python update_password.py --user-id 3 --password NewPass123
+    python update_password.py --email a@example.com b@example.com --rounds 12
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import settings
 from app.database import engine
 from app.models import User
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 import bcrypt
 
-# Get the first user (or specify email)
-session = Session(engine)
-user = session.query(User).first()
-
-if user:
-    print(f'Updating password for user: {user.email}')
-    
-    # Hash the new password
-    password = 'Soul1412'
-    password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    
-    # Update the user
-    user.password_hash = hashed.decode('utf-8')
+def hash_password(password, rounds):
+    """bcrypt-hash a password with its own salt"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+def reset_many(session, emails, password, rounds):
+    """Give several users the same password, hashing in parallel; returns how many matched"""
+    # bcrypt releases the GIL while hashing, so threads spread the work across cores
+    with ThreadPoolExecutor() as executor:
+        hashes = list(executor.map(lambda _: hash_password(password, rounds), emails))
+    updated = 0
+    for email, hashed in zip(emails, hashes):
+        result = session.execute(update(User).where(User.email == email).values(password_hash=hashed))
+        updated += result.rowcount
     session.commit()
-    
-    print(f'✓ Password updated successfully for {user.email}')
-    print(f'  New password: {password}')
-else:
-    print('No users found in database')
+    return updated
+
+def main():
+    parser = argparse.ArgumentParser(description="Set a user's password")
+    who = parser.add_mutually_exclusive_group()
+    who.add_argument("--email", nargs="+", help="Email(s) of the user(s) to update")
+    who.add_argument("--user-id", type=int, help="ID of the user to update")
+    parser.add_argument("--password", default="Soul1412", help="New plaintext password")
+    parser.add_argument("--rounds", type=int, default=settings.bcrypt_rounds, help="bcrypt work factor")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        if args.email and len(args.email) > 1:
+            updated = reset_many(session, args.email, args.password, args.rounds)
+            print(f'✓ Password updated for {updated} of {len(args.email)} users')
+            return
+        if args.email:
+            condition = User.email == args.email[0]
+            label = args.email[0]
+        elif args.user_id is not None:
+            condition = User.id == args.user_id
+            label = f"user {args.user_id}"
+        else:
+            # No user given: fall back to the lowest id, as before
+            first_id = session.execute(select(User.id).order_by(User.id).limit(1)).scalar()
+            if first_id is None:
+                print('No users found in database')
+                return
+            condition = User.id == first_id
+            label = f"user {first_id}"
+
+        # Update the user in a single UPDATE, without loading the row
+        result = session.execute(
+            update(User).where(condition).values(password_hash=hash_password(args.password, args.rounds))
+        )
+        session.commit()
+
+    if result.rowcount:
+        print(f'✓ Password updated successfully for {label}')
+        print(f'  New password: {args.password}')
+    else:
+        print('No matching user found in database')
 
-session.close()
+if __name__ == "__main__":
+    main()